@@ -2,50 +2,88 @@ import os
 import uuid
 import json
 import asyncio
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from app.core.database import get_db
 from app.core.config import settings
-from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob, JobStatus
 from app.models.participant import Participant
 from app.models.user import User
-from app.services.openai_service import openai_service
-from app.services.audio_service import audio_service
-from app.services.advanced_audio_service import advanced_audio_service
-from app.services.linguistic_service import linguistic_service
-from app.services.openrouter_service import openrouter_service
-from app.services.report_service import report_service
-from app.services.progress_store import set_progress, get_progress, clear_progress, subscribe, unsubscribe
+from app.services.job_queue import enqueue_job, get_job, get_job_by_progress_id
+from app.services.upload_service import save_upload, UploadTooLargeError
+from app.services.feature_cache import feature_cache
+from app.services.resilience import resilience
+from app.services.progress_store import (
+    ANALYSIS_STEPS, REPORT_DELTA_EVENT, set_progress, get_progress, get_report_text, subscribe, unsubscribe,
+    clear_progress_later
+)
 from app.api.dependencies import get_current_user
 
 router = APIRouter()
 
+# multipart sınır/başlık payı (Content-Length ön kontrolü için)
+MULTIPART_OVERHEAD = 64 * 1024
+
+PROGRESS_ID_CONFLICT = "Bu progress_id başka bir analiz tarafından kullanılıyor; sayfayı yenileyip tekrar deneyin."
+
 os.makedirs(settings.upload_dir, exist_ok=True)
 os.makedirs(settings.reports_dir, exist_ok=True)
 
 
+def _reject_progress(progress_id: str, message: str):
+    """
+    Reddedilen yükleme: hata durumunu yayınla ve kaydı gecikmeli sil. İş
+    worker'a hiç ulaşmadığı için kayıt relay üzerinden temizlenmez (relay
+    kendi gönderdiği mesajları işlemez).
+    """
+    set_progress(progress_id, 0, message, status="error")
+    clear_progress_later(progress_id)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def _sse_message(data: dict, event: str = None) -> str:
+    """SSE mesajı; event verilmezse varsayılan (message) olayı"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @router.get("/progress/{progress_id}/stream")
 async def stream_progress(progress_id: str):
-    """SSE endpoint for real-time progress updates"""
+    """
+    SSE endpoint for real-time progress updates.
+    Klinik rapor üretilirken parçaları ayrıca `report_delta` olayı olarak
+    gönderilir: {"offset", "delta"}; offset 0 istemcideki metni sıfırlar.
+    """
     async def event_generator():
         queue = subscribe(progress_id)
         try:
             # Send current progress immediately
             current = get_progress(progress_id)
             if current:
-                yield f"data: {json.dumps(current)}\n\n"
+                yield _sse_message(current)
+            # Yeniden bağlanan istemciye raporun şimdiye kadarki metni
+            report_text = get_report_text(progress_id)
+            if report_text:
+                yield _sse_message({"offset": 0, "delta": report_text}, REPORT_DELTA_EVENT)
             
             # Wait for updates
             while True:
                 try:
                     # Wait for new progress update with timeout
-                    progress = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(progress)}\n\n"
+                    event, data = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    yield _sse_message(data, event)
                     
                     # Check if analysis is complete
-                    if progress.get("status") in ["completed", "error"]:
+                    if event is None and data.get("status") in ["completed", "error"]:
                         break
                 except asyncio.TimeoutError:
                     # Send heartbeat to keep connection alive
@@ -67,22 +105,87 @@ async def stream_progress(progress_id: str):
 
 
 @router.get("/progress/{progress_id}")
-async def get_analysis_progress(progress_id: str):
+async def get_analysis_progress(progress_id: str, db: AsyncSession = Depends(get_db)):
     """Get current progress for an analysis"""
     progress = get_progress(progress_id)
-    if not progress:
-        return {"current_step": 0, "message": "Analiz bulunamadı veya tamamlandı", "status": "unknown"}
-    return progress
+    if progress:
+        return progress
+    
+    # Bellekte yoksa (ör. yeniden bağlanma) kuyruk kaydından türet
+    job = await get_job_by_progress_id(db, progress_id)
+    if job:
+        return _job_progress(job)
+    return {"current_step": 0, "message": "Analiz bulunamadı veya tamamlandı", "status": "unknown"}
+
+
+def _job_progress(job: AnalysisJob) -> dict:
+    """Kuyruk kaydının durumunu progress formatına çevir"""
+    if job.status == JobStatus.COMPLETED:
+        step, message, status = len(ANALYSIS_STEPS), "Analiz tamamlandı!", "completed"
+    elif job.status == JobStatus.FAILED:
+        step, message, status = 0, f"Hata: {job.error or 'bilinmeyen hata'}", "error"
+    elif job.status == JobStatus.RUNNING:
+        step, message, status = 2, "Analiz yapılıyor...", "running"
+    else:
+        step, message, status = 1, "Analiz sırada bekliyor...", "queued"
+    return {
+        "current_step": step,
+        "total_steps": len(ANALYSIS_STEPS),
+        "message": message,
+        "status": status,
+        "steps": ANALYSIS_STEPS,
+        "job_id": job.id,
+        "analysis_id": job.analysis_id
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Analiz işinin durumunu getir"""
+    job = await get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analiz işi bulunamadı veya erişim izniniz yok")
+    
+    return {
+        "job_id": job.id,
+        "progress_id": job.progress_id,
+        "participant_id": job.participant_id,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "error": job.error,
+        "analysis_id": job.analysis_id,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+@router.get("/cache/stats")
+async def get_feature_cache_stats(current_user: User = Depends(get_current_user)):
+    """Özellik önbelleği isabet/ıska sayaçları"""
+    return await asyncio.to_thread(feature_cache.stats)
 
 
-@router.post("/")
+@router.get("/resilience/stats")
+async def get_resilience_stats(current_user: User = Depends(get_current_user)):
+    """Dış API yeniden deneme / devre kesici sayaçları (tüm process'ler)"""
+    return await asyncio.to_thread(resilience.load_all_stats)
+
+
+@router.post("/", status_code=202)
 async def analyze_audio(
+    request: Request,
     participant_id: int = Form(...),
     file: UploadFile = File(...),
     progress_id: str = Form(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Ses dosyasını kaydet ve analiz işini kuyruğa ekle (analizi worker yapar)"""
     # Dosya formatı kontrolü
     if not file.filename.endswith(('.wav', '.mp3', '.m4a', '.webm')):
         raise HTTPException(
@@ -90,13 +193,11 @@ async def analyze_audio(
             detail="Desteklenmeyen dosya formatı. wav, mp3, m4a veya webm olmalı."
         )
     
-    # Dosya boyutu kontrolü
-    file_content = await file.read()
-    if len(file_content) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Dosya boyutu {settings.max_file_size / 1024 / 1024}MB'dan büyük olamaz."
-        )
+    # Dosya boyutu ön kontrolü (kesin kontrol yazarken yapılır)
+    size_error = f"Dosya boyutu {settings.max_file_size / 1024 / 1024}MB'dan büyük olamaz."
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.max_file_size + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=400, detail=size_error)
     
     # Katılımcı kontrolü - sadece kullanıcının kendi katılımcıları
     result = await db.execute(
@@ -109,8 +210,15 @@ async def analyze_audio(
     if not participant:
         raise HTTPException(status_code=404, detail="Katılımcı bulunamadı veya erişim izniniz yok")
     
-    # Progress ID - frontend'den gelen veya yeni oluştur
-    if not progress_id:
+    # Progress ID - frontend'den gelen (küçük harfli UUID) veya yeni oluştur. Kayıt
+    # tekil olduğu için kullanımdaki id (yinelenen form gönderimi, kopyalanan sekme)
+    # 409 ile reddedilir; mevcut işin ilerleme kaydına dokunulmaz
+    if progress_id:
+        if not _is_uuid(progress_id):
+            raise HTTPException(status_code=400, detail="Geçersiz progress_id (UUID olmalı)")
+        if get_progress(progress_id) is not None or await get_job_by_progress_id(db, progress_id) is not None:
+            raise HTTPException(status_code=409, detail=PROGRESS_ID_CONFLICT)
+    else:
         progress_id = str(uuid.uuid4())
     
     # Dosyayı kaydet
@@ -120,163 +228,50 @@ async def analyze_audio(
     
     set_progress(progress_id, 1, "Dosya yükleniyor...")
     
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    # Parça parça diske yaz; sınır aşılırsa hemen kes
+    try:
+        file_size, audio_sha256 = await save_upload(file, file_path, settings.max_file_size)
+    except UploadTooLargeError:
+        _reject_progress(progress_id, size_error)
+        raise HTTPException(status_code=400, detail=size_error)
+    except Exception as e:
+        _reject_progress(progress_id, f"Hata: {str(e)}")
+        raise
+    print(f"[Upload] {file_size / 1024:.1f} KB kaydedildi, sha256={audio_sha256[:12]}...", flush=True)
     
     try:
-        import time
-        start_time = time.time()
-        
-        # 1. Temel akustik özellikleri çıkar
-        set_progress(progress_id, 2, "Temel akustik özellikler çıkarılıyor...")
-        print(f"[Analiz] 1/9 Temel akustik ozellikler cikariliyor...", flush=True)
-        acoustic_features = audio_service.extract_features(file_path)
-        print(f"[Analiz] 1/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        
-        # 2. Gelişmiş akustik özellikleri çıkar
-        set_progress(progress_id, 3, "Gelişmiş akustik analiz yapılıyor...")
-        print(f"[Analiz] 2/9 Gelismis akustik ozellikler cikariliyor...", flush=True)
-        advanced_acoustic = advanced_audio_service.extract_advanced_features(file_path)
-        print(f"[Analiz] 2/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        
-        # 3. Transkripsiyon
-        set_progress(progress_id, 4, "Konuşma metne dönüştürülüyor (Whisper)...")
-        print(f"[Analiz] 3/9 Transkripsiyon yapiliyor (OpenAI Whisper)...", flush=True)
-        transcript = await openai_service.transcribe_audio(file_path, language="tr")
-        print(f"[Analiz] 3/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        
-        # 4. Dilbilimsel analiz
-        set_progress(progress_id, 5, "Dilbilimsel analiz yapılıyor...")
-        print(f"[Analiz] 4/9 Dilbilimsel analiz yapiliyor...", flush=True)
-        linguistic_analysis = linguistic_service.analyze_text(transcript)
-        print(f"[Analiz] 4/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        
-        # 5. GPT-4 ile duygu ve içerik analizi
-        set_progress(progress_id, 6, "Duygu ve içerik analizi yapılıyor...")
-        print(f"[Analiz] 5/9 Duygu ve icerik analizi yapiliyor...", flush=True)
-        analysis_result = await openai_service.analyze_content_and_emotion(
-            transcript, acoustic_features
-        )
-        print(f"[Analiz] 5/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        
-        # 6. Katılımcı bilgilerini hazırla
-        participant_info = {
-            "name": participant.name,
-            "age": participant.age,
-            "gender": participant.gender,
-            "group_type": participant.group_type.value,
-            "mmse_score": participant.mmse_score
-        }
-        
-        # 7. OpenRouter ile kapsamlı klinik rapor oluştur
-        set_progress(progress_id, 7, "AI klinik raporu oluşturuluyor...")
-        clinical_report = None
-        try:
-            print(f"[Analiz] 6/9 Klinik rapor olusturuluyor (OpenRouter)...", flush=True)
-            clinical_report = await openrouter_service.generate_clinical_report(
-                participant_info=participant_info,
-                transcript=transcript,
-                acoustic_features=acoustic_features,
-                advanced_acoustic=advanced_acoustic,
-                linguistic_analysis=linguistic_analysis,
-                emotion_analysis=analysis_result.get("emotion_analysis", {}),
-                content_analysis=analysis_result.get("content_analysis", {})
-            )
-            print(f"[Analiz] 6/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        except Exception as report_error:
-            print(f"[Analiz] 6/9 Klinik rapor olusturulamadi: {report_error}", flush=True)
-            clinical_report = None
-        
-        # 8. PDF rapor oluştur
-        set_progress(progress_id, 8, "PDF raporu hazırlanıyor...")
-        pdf_path = None
-        try:
-            print(f"[Analiz] 7/9 PDF rapor olusturuluyor...", flush=True)
-            pdf_path = report_service.create_pdf_report(
-                participant_info=participant_info,
-                transcript=transcript,
-                acoustic_features=acoustic_features,
-                advanced_acoustic=advanced_acoustic,
-                linguistic_analysis=linguistic_analysis,
-                emotion_analysis=analysis_result.get("emotion_analysis", {}),
-                content_analysis=analysis_result.get("content_analysis", {}),
-                gemini_report=clinical_report
-            )
-            print(f"[Analiz] 7/9 Tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
-        except Exception as pdf_error:
-            print(f"[Analiz] 7/9 PDF raporu olusturulamadi: {pdf_error}", flush=True)
-            pdf_path = None
-        
-        # 9. Veritabanına kaydet
-        set_progress(progress_id, 9, "Veritabanına kaydediliyor...")
-        print(f"[Analiz] 8/9 Veritabanina kaydediliyor...", flush=True)
-        db_analysis = Analysis(
+        job = await enqueue_job(
+            db,
+            progress_id=progress_id,
             user_id=current_user.id,
             participant_id=participant_id,
             audio_path=file_path,
-            transcript=transcript,
-            acoustic_features=acoustic_features,
-            emotion_analysis=analysis_result.get("emotion_analysis"),
-            content_analysis=analysis_result.get("content_analysis"),
-            advanced_acoustic=advanced_acoustic,
-            linguistic_analysis=linguistic_analysis,
-            gemini_report=clinical_report,
-            report_pdf_path=pdf_path
+            audio_sha256=audio_sha256
         )
-        db.add(db_analysis)
-        await db.commit()
-        await db.refresh(db_analysis)
-        
-        total_time = time.time() - start_time
-        print(f"[Analiz] TAMAMLANDI! Toplam sure: {total_time:.1f}s", flush=True)
-        
-        # Progress tamamlandı
-        set_progress(progress_id, 9, "Analiz tamamlandı!", status="completed")
-        
-        # Kısa gecikme ile progress'i temizle
-        await asyncio.sleep(1)
-        clear_progress(progress_id)
-        
-        return {
-            "id": db_analysis.id,
-            "participant_id": participant_id,
-            "transcript": transcript,
-            "acoustic_features": acoustic_features,
-            "advanced_acoustic": advanced_acoustic,
-            "linguistic_analysis": linguistic_analysis,
-            "emotion_analysis": analysis_result.get("emotion_analysis"),
-            "content_analysis": analysis_result.get("content_analysis"),
-            "gemini_report": clinical_report,
-            "report_pdf_path": pdf_path,
-            "created_at": db_analysis.created_at.isoformat(),
-            "progress_id": progress_id
-        }
-    
-    except HTTPException:
-        set_progress(progress_id, 0, "Hata oluştu", status="error")
-        clear_progress(progress_id)
-        raise
     except Exception as e:
-        # Hata durumunda dosyayı sil
+        # Kuyruğa eklenemezse dosyayı sil
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
             except:
                 pass
         
-        set_progress(progress_id, 0, f"Hata: {str(e)}", status="error")
-        clear_progress(progress_id)
+        if isinstance(e, IntegrityError):
+            # Aynı progress_id ile eşzamanlı gönderim: kayıt diğer işindir, hata yayınlanmaz
+            await db.rollback()
+            raise HTTPException(status_code=409, detail=PROGRESS_ID_CONFLICT)
+        _reject_progress(progress_id, f"Hata: {str(e)}")
         
         import traceback
-        error_trace = traceback.format_exc()
-        print(f"Analiz hatası: {error_trace}")
-        
-        # Veritabanı hatası kontrolü
-        error_msg = str(e)
-        if "does not exist" in error_msg or "column" in error_msg.lower():
-            raise HTTPException(
-                status_code=500, 
-                detail="Veritabani hatasi: Tablo veya kolon eksik. Lutfen backend'i yeniden baslatin."
-            )
-        
-        raise HTTPException(status_code=500, detail=f"Analiz hatasi: {error_msg}")
+        print(f"Analiz kuyruk hatası: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Analiz kuyruğa eklenemedi: {str(e)}")
+    
+    set_progress(progress_id, 1, "Dosya yüklendi, analiz sırada bekliyor...", status="queued", job_id=job.id)
+    print(f"[Analiz] Kuyruga eklendi: job={job.id} progress={progress_id[:8]}...", flush=True)
+    
+    return {
+        "job_id": job.id,
+        "progress_id": progress_id,
+        "participant_id": participant_id,
+        "status": job.status.value
+    }
@@ -138,6 +138,7 @@ async def download_report_pdf(
         # PDF yoksa oluştur
         try:
             from app.services.report_service import report_service
+            from app.services.process_pool import process_pool
             
             # Katılımcıyı bul
             result_participant = await db.execute(
@@ -157,7 +158,8 @@ async def download_report_pdf(
             }
             
             # PDF oluştur
-            new_file_path = report_service.create_pdf_report(
+            new_file_path = await process_pool.run(
+                report_service.create_pdf_report,
                 participant_info=participant_info,
                 transcript=analysis.transcript,
                 acoustic_features=analysis.acoustic_features,
@@ -1,15 +1,36 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Dict, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, delete, func
 from app.core.database import get_db
 from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
 from app.models.user import User
 from app.api.dependencies import get_current_user
+from app.services.track_store import track_store, TRACK_DTYPES
+from app.services.advanced_audio_service import AdvancedAudioService
 
 router = APIRouter()
 
 
+async def _analysis_tracks(db: AsyncSession, analysis_id: int, user_id: int) -> Tuple[str, Dict[str, str]]:
+    """
+    Analizin ses içeriği SHA-256'sı ve izlerin yazıldığı sürümler (iz adı -> sürüm).
+    Sürümleri kaydedilmemiş eski analizler için geçerli ayarların sürümleri kullanılır.
+    """
+    result = await db.execute(
+        select(AnalysisJob.audio_sha256, Analysis.track_versions)
+        .join(Analysis, Analysis.id == AnalysisJob.analysis_id)
+        .where(Analysis.id == analysis_id, Analysis.user_id == user_id)
+    )
+    row = result.first()
+    if not row or not row[0]:
+        raise HTTPException(status_code=404, detail="Bu analiz için kayıtlı kare izi bulunamadı")
+    return row[0], row[1] or AdvancedAudioService.track_versions()
+
+
 @router.get("/")
 async def get_all_analyses(
     db: AsyncSession = Depends(get_db),
@@ -121,6 +142,40 @@ async def get_participant_analyses(
     ]
 
 
+@router.get("/{analysis_id}/tracks")
+async def list_analysis_tracks(
+    analysis_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Analiz için kayıtlı kare izleri (F0, intensity, RMS, formant, duraklama)"""
+    audio_sha256, versions = await _analysis_tracks(db, analysis_id, current_user.id)
+    tracks = await asyncio.to_thread(track_store.list_tracks, audio_sha256, versions)
+    return {"analysis_id": analysis_id, "tracks": tracks}
+
+
+@router.get("/{analysis_id}/tracks/{name}")
+async def get_analysis_track(
+    analysis_id: int,
+    name: str,
+    start: Optional[float] = Query(None, ge=0, description="Başlangıç (sn)"),
+    end: Optional[float] = Query(None, ge=0, description="Bitiş (sn)"),
+    max_points: int = Query(1000, ge=10, le=20000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Bir izin [start, end) aralığını en fazla max_points noktaya seyreltilmiş olarak döndür"""
+    if name not in TRACK_DTYPES:
+        raise HTTPException(status_code=404, detail=f"Bilinmeyen iz: {name}")
+    audio_sha256, versions = await _analysis_tracks(db, analysis_id, current_user.id)
+    if name not in versions:
+        raise HTTPException(status_code=404, detail=f"Bu analiz için '{name}' izi bulunamadı")
+    track = await asyncio.to_thread(track_store.read_slice, audio_sha256, versions[name], name, start, end, max_points)
+    if track is None:
+        raise HTTPException(status_code=404, detail=f"Bu analiz için '{name}' izi bulunamadı")
+    return {"analysis_id": analysis_id, **track}
+
+
 @router.delete("/{analysis_id}")
 async def delete_analysis(
     analysis_id: int,
@@ -148,10 +203,25 @@ async def delete_analysis(
         if analysis.report_pdf_path and os.path.exists(analysis.report_pdf_path):
             files_to_delete.append(analysis.report_pdf_path)
         
+        # Kare izleri ses içeriğine göre paylaşılır; aynı sesi kullanan başka analiz yoksa silinir
+        audio_sha256 = (await db.execute(
+            select(AnalysisJob.audio_sha256).where(AnalysisJob.analysis_id == analysis_id)
+        )).scalars().first()
+        shared = 0
+        if audio_sha256:
+            shared = (await db.execute(
+                select(func.count()).select_from(AnalysisJob)
+                .join(Analysis, Analysis.id == AnalysisJob.analysis_id)
+                .where(AnalysisJob.audio_sha256 == audio_sha256, Analysis.id != analysis_id)
+            )).scalar_one()
+        
         # Veritabanından sil
         await db.execute(delete(Analysis).where(Analysis.id == analysis_id))
         await db.commit()
         
+        if audio_sha256 and not shared:
+            await asyncio.to_thread(track_store.delete, audio_sha256)
+        
         # Dosyaları sil
         for file_path in files_to_delete:
             try:
@@ -28,18 +28,81 @@ class Settings(BaseSettings):
     openai_chat_model: str = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o")
     openai_whisper_model: str = os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
     openai_timeout_seconds: int = int(os.getenv("OPENAI_TIMEOUT_SECONDS", "900"))
+    # Paylaşılan bağlantı havuzu (AsyncOpenAI) ve chat uç noktası eşzamanlılık sınırı
+    openai_max_connections: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    openai_max_keepalive_connections: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    openai_keepalive_seconds: float = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "30"))
+    openai_chat_max_concurrency: int = int(os.getenv("OPENAI_CHAT_MAX_CONCURRENCY", "4"))
+    # Uzun kayıtlar sessizliklerden bölünüp parça parça, eşzamanlı transkribe edilir (0 = kapalı)
+    whisper_chunk_min_seconds: float = float(os.getenv("WHISPER_CHUNK_MIN_SECONDS", "300"))
+    whisper_chunk_seconds: float = float(os.getenv("WHISPER_CHUNK_SECONDS", "120"))
+    whisper_chunk_overlap_seconds: float = float(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "1.5"))
+    whisper_max_concurrency: int = int(os.getenv("WHISPER_MAX_CONCURRENCY", "4"))
 
     # OpenRouter (AI Model Provider)
     openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
     openrouter_model: str = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
     openrouter_base_url: str = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
     openrouter_timeout_seconds: int = int(os.getenv("OPENROUTER_TIMEOUT_SECONDS", "900"))
+    openrouter_stream: bool = os.getenv("OPENROUTER_STREAM", "True").lower() == "true"  # rapor parçaları SSE ile iletilir
+    report_stream_flush_seconds: float = float(os.getenv("REPORT_STREAM_FLUSH_SECONDS", "0.25"))
+    # Duygu/içerik analizi + klinik rapor tek yapılandırılmış OpenRouter çağrısında (hata olursa iki çağrı).
+    # OPENROUTER_STREAM açıksa JSON yanıtı akışla alınır; rapor bölümleri yine report_delta olarak iletilir
+    llm_single_call: bool = os.getenv("LLM_SINGLE_CALL", "False").lower() == "true"
+    # LLM istemleri: transkript token bütçesi (aşan kısım ortadan kısaltılır) ve float anlamlı basamağı
+    prompt_transcript_token_budget: int = int(os.getenv("PROMPT_TRANSCRIPT_TOKEN_BUDGET", "8000"))
+    prompt_float_digits: int = int(os.getenv("PROMPT_FLOAT_DIGITS", "4"))
 
     upload_dir: str = "uploads"
     PROJECT_NAME: str = "KNOWHY Alzheimer Analiz"
     reports_dir: str = "reports"
     max_file_size: int = 25 * 1024 * 1024  # 25MB
     
+    # Analiz kuyruğu (python -m app.worker)
+    analysis_worker_concurrency: int = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "2"))
+    analysis_worker_poll_seconds: float = float(os.getenv("ANALYSIS_WORKER_POLL_SECONDS", "2"))
+    analysis_job_lease_seconds: int = int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "120"))  # Kira bu süre yenilenmezse iş yeniden kuyruğa alınır
+    analysis_job_heartbeat_seconds: float = float(os.getenv("ANALYSIS_JOB_HEARTBEAT_SECONDS", "30"))
+    analysis_job_max_attempts: int = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "2"))
+    
+    # CPU yoğun adımlar (DSP, PDF) için process havuzu boyutu
+    cpu_pool_size: int = int(os.getenv("CPU_POOL_SIZE", "2"))
+    
+    # Özellik önbelleği (ses SHA-256 + çıkarıcı sürümü ile adreslenir, 0 = kapalı)
+    feature_cache_dir: str = os.getenv("FEATURE_CACHE_DIR", "uploads/feature_cache")
+    feature_cache_max_mb: int = int(os.getenv("FEATURE_CACHE_MAX_MB", "512"))
+    
+    # Kare bazlı özellik izleri (F0, intensity, RMS, formant, duraklama) - mmap ile okunur
+    features_dir: str = os.getenv("FEATURES_DIR", "uploads/features")
+    # Boyut sınırı aşılınca en uzun süredir okunmayan izler silinir (0 = sınırsız)
+    features_max_mb: int = int(os.getenv("FEATURES_MAX_MB", "2048"))
+    
+    # Duraklama analizi (eşik stratejisi: mean_std, percentile, relative_db)
+    pause_min_duration: float = float(os.getenv("PAUSE_MIN_DURATION", "0.1"))
+    pause_threshold_strategy: str = os.getenv("PAUSE_THRESHOLD_STRATEGY", "mean_std")
+    
+    # Pitch (F0) motoru: praat (varsayılan), yin, pyin; konuşma için F0 aralığı
+    pitch_engine: str = os.getenv("PITCH_ENGINE", "praat")
+    pitch_floor: float = float(os.getenv("PITCH_FLOOR", "75"))
+    pitch_ceiling: float = float(os.getenv("PITCH_CEILING", "500"))
+    pitch_parallel_chunks: int = int(os.getenv("PITCH_PARALLEL_CHUNKS", "0"))  # >1: parçalı paralel takip
+    
+    # Uzun kayıtlar pencere pencere (sınırlı bellekle) analiz edilir (0 = kapalı)
+    streaming_min_seconds: float = float(os.getenv("STREAMING_MIN_SECONDS", "600"))
+    streaming_window_seconds: float = float(os.getenv("STREAMING_WINDOW_SECONDS", "60"))
+    
+    # Yükleme bir kez kanonik PCM'e (16 kHz mono WAV/FLAC) dönüştürülür (ffmpeg)
+    audio_normalize_enabled: bool = os.getenv("AUDIO_NORMALIZE_ENABLED", "True").lower() == "true"
+    audio_normalize_format: str = os.getenv("AUDIO_NORMALIZE_FORMAT", "flac")  # flac (kayıpsız, küçük), wav
+    audio_normalize_sample_rate: int = int(os.getenv("AUDIO_NORMALIZE_SAMPLE_RATE", "16000"))
+    audio_normalize_concurrency: int = int(os.getenv("AUDIO_NORMALIZE_CONCURRENCY", "2"))
+    audio_normalize_timeout_seconds: float = float(os.getenv("AUDIO_NORMALIZE_TIMEOUT_SECONDS", "300"))
+    
+    # Enerji tabanlı VAD ön geçişi: Whisper'a kırpılmış ses, Praat analizleri sadece konuşma bölgelerinde
+    vad_enabled: bool = os.getenv("VAD_ENABLED", "True").lower() == "true"
+    vad_margin_db: float = float(os.getenv("VAD_MARGIN_DB", "12"))
+    vad_min_trim_seconds: float = float(os.getenv("VAD_MIN_TRIM_SECONDS", "1.0"))
+    
     # JWT Authentication
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "dev-secret-key-change-in-production")
     jwt_algorithm: str = os.getenv("JWT_ALGORITHM", "HS256")
@@ -48,6 +111,20 @@ class Settings(BaseSettings):
     # Email Webhook
     email_webhook_url: str = os.getenv("EMAIL_WEBHOOK_URL", "")
     
+    # Paylaşılan dış HTTP istemcileri (OpenRouter, email webhook; OpenAI kendi havuz ayarlarını kullanır)
+    http_http2: bool = os.getenv("HTTP_HTTP2", "True").lower() == "true"
+    http_max_connections_per_host: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "5"))
+    http_keepalive_seconds: float = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+    
+    # Dış API çağrıları için yeniden deneme ve devre kesici (Whisper, GPT, OpenRouter)
+    resilience_max_attempts: int = int(os.getenv("RESILIENCE_MAX_ATTEMPTS", "4"))
+    resilience_base_delay_seconds: float = float(os.getenv("RESILIENCE_BASE_DELAY_SECONDS", "1.0"))
+    resilience_max_delay_seconds: float = float(os.getenv("RESILIENCE_MAX_DELAY_SECONDS", "30"))
+    resilience_breaker_failures: int = int(os.getenv("RESILIENCE_BREAKER_FAILURES", "5"))
+    resilience_breaker_reset_seconds: float = float(os.getenv("RESILIENCE_BREAKER_RESET_SECONDS", "60"))
+    resilience_stats_dir: str = os.getenv("RESILIENCE_STATS_DIR", "uploads/resilience")
+    
     # Rate Limiting
     login_max_attempts: int = int(os.getenv("LOGIN_MAX_ATTEMPTS", "5"))
     login_window_minutes: int = int(os.getenv("LOGIN_WINDOW_MINUTES", "15"))
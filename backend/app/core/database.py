@@ -21,3 +21,9 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
+
+async def init_models():
+    """Tabloları oluştur (API ve worker başlangıcında çağrılır)"""
+    import app.models  # noqa: F401 - modellerin Base'e kaydolması için
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
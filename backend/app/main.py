@@ -1,14 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import participants, analyze, results, reports, auth
-from app.core.database import engine, Base
+from app.core.database import init_models
 from app.core.config import settings
-from app.models import User, EmailVerification, RateLimit, Participant, Analysis
+from app.services.progress_relay import progress_relay
+from app.services.process_pool import process_pool
+from app.services.http_clients import http_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await init_models()
+        print("✓ Veritabani tablolari basariyla olusturuldu")
+    except Exception as e:
+        print(f"✗ Veritabani tablolari olusturulurken hata: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    
+    # Worker'dan gelen progress güncellemelerini dinle
+    await progress_relay.start(listen=True)
+    # CPU yoğun işler (PDF yeniden oluşturma vb.) için process havuzu
+    process_pool.start()
+    # Dış servisler (OpenRouter, email webhook, OpenAI) için paylaşılan bağlantı havuzları
+    http_clients.start()
+    
+    yield
+    
+    process_pool.shutdown()
+    await http_clients.aclose()
+    await progress_relay.stop()
+
 
 app = FastAPI(
     title="KNOWHY Alzheimer Analiz API",
     description="Ses analizi ile Alzheimer ve MCI tespiti için API (Powered by KNOWHY)",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Parse CORS origins from settings
@@ -33,19 +63,6 @@ app.include_router(results.router, prefix="/api/results", tags=["results"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 
 
-@app.on_event("startup")
-async def startup():
-    try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        print("✓ Veritabani tablolari basariyla olusturuldu")
-    except Exception as e:
-        print(f"✗ Veritabani tablolari olusturulurken hata: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
-
-
 @app.get("/")
 async def root():
     return {"message": "TUBITAK Voice Analyzer API"}
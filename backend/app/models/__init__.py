@@ -1,7 +1,8 @@
 from app.models.participant import Participant
 from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob, JobStatus
 from app.models.user import User
 from app.models.email_verification import EmailVerification
 from app.models.rate_limit import RateLimit
 
-__all__ = ["Participant", "Analysis", "User", "EmailVerification", "RateLimit"]
+__all__ = ["Participant", "Analysis", "AnalysisJob", "JobStatus", "User", "EmailVerification", "RateLimit"]
@@ -19,6 +19,8 @@ class Analysis(Base):
     linguistic_analysis = Column(JSON, nullable=True)
     gemini_report = Column(Text, nullable=True)
     report_pdf_path = Column(String, nullable=True)
+    # Kare izlerinin yazıldığı sürümler (iz adı -> track_store sürümü)
+    track_versions = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="analyses")
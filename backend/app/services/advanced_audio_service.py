@@ -1,63 +1,163 @@
 import librosa
 import numpy as np
 import parselmouth
-from typing import Dict
+from typing import Dict, Iterable, Optional
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import signal
+from app.services.audio_buffer import AudioBuffer
+from app.services.feature_cache import feature_cache
+from app.services.track_store import track_store, TRACK_DTYPES
+from app.services.praat_tracks import align_track, extract_formant_tracks, masked_track_means
+from app.services.pause_analysis import rms_threshold, find_pauses, summarize_pauses, first_frame_above
+from app.services.spectral_frontend import SPECTRAL_SR, HOP_LENGTH
+from app.services.streaming_features import should_stream, native_windows, spectral_windows, RunningStats, AudioWindow
+from app.services.pitch_tracker import track_pitch, cache_version as pitch_cache_version
+from app.services.syllable_nuclei import detect_syllable_nuclei, speech_rate_metrics
+from app.services.vad import speech_windows, in_regions
+from app.services.audio_normalizer import audio_normalizer
+from app.core.config import settings
+
+
+def _perturbation_quotient(values: np.ndarray, window: int, mean_value: float) -> float:
+    """
+    Kayan `window` noktalı ortalamadan ortadaki değerin ortalama mutlak sapması / mean_value.
+    RAP (3), PPQ5 (5), APQ3 (3), APQ5 (5) için ortak, döngüsüz hesap.
+    """
+    if len(values) < window:
+        return 0.0
+    local_avg = sliding_window_view(values, window).mean(axis=1)
+    half = window // 2
+    center = values[half:len(values) - half]
+    return float(np.mean(np.abs(center - local_avg)) / mean_value)
+
+
+def _valid_hnr(values: np.ndarray) -> np.ndarray:
+    """Praat harmonicity karelerinden tanımlı ve mantıklı (> -50 dB) olanlar"""
+    values = values[~np.isnan(values)]
+    return values[values > -50]
+
+
+def _empty_features() -> Dict:
+    """Ses analiz edilemediğinde dönen sıfır değerli özellikler"""
+    return {
+        "jitter": {"local": 0.0, "rap": 0.0, "ppq5": 0.0},
+        "shimmer": {"local": 0.0, "apq3": 0.0, "apq5": 0.0},
+        "hnr": 0.0,
+        "formants": {"F1": 0.0, "F2": 0.0, "F3": 0.0, "F4": 0.0},
+        "speech_rate_audio": 0.0,
+        "syllable_rate": {
+            "syllable_count": 0,
+            "speech_rate": 0.0,
+            "articulation_rate": 0.0,
+            "phonation_time": 0.0
+        },
+        "voiced_ratio": 0.0,
+        "pause_analysis": {
+            "total_pause_time": 0.0,
+            "pause_count": 0,
+            "avg_pause_duration": 0.0,
+            "pause_percentage": 0.0,
+            "longest_pause": 0.0,
+            "segments": []
+        },
+        "voice_onset_time": 0.0
+    }
 
 
 class AdvancedAudioService:
+    # Çıktıyı değiştiren her değişiklikte artırılmalı (önbellek anahtarı)
+    FEATURE_VERSION = "9"
+    
     @staticmethod
-    def extract_advanced_features(audio_path: str) -> Dict:
-        """Gelişmiş akustik özellikler çıkar: jitter, shimmer, HNR, formantlar"""
-        try:
-            y, sr = librosa.load(audio_path, sr=None)
-            duration = librosa.get_duration(y=y, sr=sr)
-        except Exception as e:
-            # Librosa yükleme hatası
-            return {
-                "jitter": {"local": 0.0, "rap": 0.0, "ppq5": 0.0},
-                "shimmer": {"local": 0.0, "apq3": 0.0, "apq5": 0.0},
-                "hnr": 0.0,
-                "formants": {"F1": 0.0, "F2": 0.0, "F3": 0.0, "F4": 0.0},
-                "speech_rate_audio": 0.0,
-                "voiced_ratio": 0.0,
-                "pause_analysis": {
-                    "total_pause_time": 0.0,
-                    "pause_count": 0,
-                    "avg_pause_duration": 0.0,
-                    "pause_percentage": 0.0
-                },
-                "voice_onset_time": 0.0
-            }
+    def cache_version(vad: bool) -> str:
+        """Önbellek anahtarı: çıkarıcı sürümü + çıktıyı etkileyen ayarlar (pitch, duraklama, VAD)"""
+        parts = [
+            AdvancedAudioService.FEATURE_VERSION, settings.pitch_engine,
+            f"{settings.pitch_floor:g}", f"{settings.pitch_ceiling:g}",
+            settings.pause_threshold_strategy, f"{settings.pause_min_duration:g}"
+        ]
+        if vad:
+            parts += ["vad", f"{settings.vad_margin_db:g}", f"{settings.vad_min_trim_seconds:g}"]
+        else:
+            parts.append("full")
+        parts.append(audio_normalizer.cache_tag())
+        return "-".join(parts)
+    
+    @staticmethod
+    def track_versions() -> Dict[str, str]:
+        """Geçerli ayarlarla üretilen kare izlerinin iz deposu sürümleri (iz adı -> sürüm)"""
+        version = AdvancedAudioService.cache_version(settings.vad_enabled)
+        versions = {name: version for name in TRACK_DTYPES}
+        versions["pitch"] = pitch_cache_version(settings.pitch_engine)
+        return versions
+    
+    @staticmethod
+    def extract_advanced_features(
+        audio: AudioBuffer,
+        audio_sha256: Optional[str] = None,
+        pitch_track: Optional[Dict] = None,
+        speech: Optional[Dict] = None
+    ) -> Dict:
+        """Gelişmiş akustik özellikleri önce önbellekten dene, yoksa hesapla"""
+        version = AdvancedAudioService.cache_version(speech is not None)
+        cached = feature_cache.get("advanced_acoustic", audio_sha256, version)
+        # Kare izleri de diskteyse yeniden hesaplamaya gerek yok
+        if cached is not None and (not audio_sha256 or track_store.has(audio_sha256, version, "intensity")):
+            return cached
         
-        # Parselmouth ile ses analizi
+        if pitch_track is None:
+            pitch_track = track_pitch(audio, audio_sha256)
+        tracks: Dict = {}
+        features = AdvancedAudioService._compute_advanced_features(audio, pitch_track, tracks, speech)
+        feature_cache.put("advanced_acoustic", audio_sha256, version, features)
+        track_store.save_all(audio_sha256, version, tracks)
+        return features
+    
+    @staticmethod
+    def _compute_advanced_features(
+        audio: AudioBuffer,
+        pitch_track: Dict,
+        tracks: Optional[Dict] = None,
+        speech: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Gelişmiş akustik özellikler çıkar: jitter, shimmer, HNR, formantlar...
+        pitch_track: pitch_tracker.track_pitch çıktısı (temel özelliklerle paylaşılır)
+        tracks: verilirse kare bazlı izler ({"iz": {"times", "values"}}; intensity,
+        rms, formants, pauses, syllable_nuclei) bu sözlüğe eklenir; sonuç
+        sözlüğü sadece özet değerleri içerir.
+        speech: vad.detect_speech_regions çıktısı. Verilirse Praat izleri sadece
+        konuşma bölgelerinden çıkarılır; duraklama analizi yine tüm kaydın
+        RMS'ini kullanır.
+        """
         try:
-            sound = parselmouth.Sound(audio_path)
+            if speech is not None:
+                frame = AdvancedAudioService._frame_tracks_streaming(
+                    audio, speech_windows(audio, speech["regions"])
+                )
+            elif should_stream(audio):
+                frame = AdvancedAudioService._frame_tracks_streaming(audio)
+            else:
+                frame = AdvancedAudioService._frame_tracks(audio)
         except Exception as e:
-            # Parselmouth başarısız olursa, sadece librosa ile temel özellikler döndür
-            rms = librosa.feature.rms(y=y)[0]
-            return {
-                "jitter": {"local": 0.0, "rap": 0.0, "ppq5": 0.0},
-                "shimmer": {"local": 0.0, "apq3": 0.0, "apq5": 0.0},
-                "hnr": 0.0,
-                "formants": {"F1": 0.0, "F2": 0.0, "F3": 0.0, "F4": 0.0},
-                "speech_rate_audio": 0.0,
-                "voiced_ratio": 0.0,
-                "pause_analysis": {
-                    "total_pause_time": 0.0,
-                    "pause_count": 0,
-                    "avg_pause_duration": 0.0,
-                    "pause_percentage": 0.0
-                },
-                "voice_onset_time": 0.0
-            }
+            # Tampon okunamadı ya da Parselmouth başarısız oldu
+            print(f"[AdvancedAudio] Ses analizi başarısız: {e}", flush=True)
+            return _empty_features()
         
-        # Pitch analizi - Praat standartlarına uygun
-        try:
-            pitch = sound.to_pitch()
-        except Exception:
-            pitch = None
-        pitch_values = pitch.selected_array['frequency']
+        duration = audio.duration
+        rms = frame["rms"]
+        frame_duration = frame["frame_duration"]
+        intensity_times = frame["intensity_times"]
+        intensity_values = frame["intensity_values"]
+        if tracks is not None:
+            tracks["rms"] = {"times": np.arange(len(rms)) * frame_duration, "values": rms}
+            if intensity_values is not None:
+                tracks["intensity"] = {"times": intensity_times, "values": intensity_values}
+        
+        # Pitch analizi - paylaşılan F0 izi (varsayılan motor Praat)
+        pitch_times = pitch_track["times"]
+        pitch_values = pitch_track["f0"]
+        total_frames = len(pitch_values)
         pitch_values = pitch_values[pitch_values > 0]  # Sıfır olmayan değerler
         
         # Jitter (pitch varyasyonu) - Praat metodolojisi
@@ -79,24 +179,10 @@ class AdvancedAudioService:
                     jitter_local = np.mean(period_diffs) / mean_period
                     
                     # RAP (Relative Average Perturbation) - 3 noktalı ortalama
-                    if len(periods) >= 3:
-                        rap_diffs = []
-                        for i in range(len(periods) - 2):
-                            # 3 noktalı ortalama
-                            local_avg = np.mean(periods[i:i+3])
-                            # Ortadaki değerin ortalamadan sapması
-                            rap_diffs.append(abs(periods[i+1] - local_avg))
-                        jitter_rap = np.mean(rap_diffs) / mean_period if len(rap_diffs) > 0 else 0.0
+                    jitter_rap = _perturbation_quotient(periods, 3, mean_period)
                     
                     # PPQ5 (5-point Period Perturbation Quotient)
-                    if len(periods) >= 5:
-                        ppq5_diffs = []
-                        for i in range(len(periods) - 4):
-                            # 5 noktalı ortalama
-                            local_avg = np.mean(periods[i:i+5])
-                            # Ortadaki (3.) değerin ortalamadan sapması
-                            ppq5_diffs.append(abs(periods[i+2] - local_avg))
-                        jitter_ppq5 = np.mean(ppq5_diffs) / mean_period if len(ppq5_diffs) > 0 else 0.0
+                    jitter_ppq5 = _perturbation_quotient(periods, 5, mean_period)
         
         # Shimmer (amplitud varyasyonu) - Praat metodolojisi
         shimmer_local = 0.0
@@ -104,23 +190,14 @@ class AdvancedAudioService:
         shimmer_apq5 = 0.0
         
         try:
-            # Intensity değerlerini al (dB cinsinden)
-            intensity = sound.to_intensity()
-            intensity_values = intensity.values[0]
-            
             # Pitch frame'leri ile eşleştirmek için zaman bazlı örnekleme
             # Pitch ve intensity aynı zaman noktalarında olmayabilir
-            pitch_times = pitch.ts()
-            intensity_times = intensity.ts()
-            
-            # Pitch zamanlarına karşılık gelen intensity değerlerini bul
-            aligned_intensity = []
-            for pt in pitch_times:
-                # En yakın intensity zamanını bul
-                idx = np.argmin(np.abs(intensity_times - pt))
-                aligned_intensity.append(intensity_values[idx])
-            
-            aligned_intensity = np.array(aligned_intensity)
+            # Pitch zamanlarına karşılık gelen (en yakın) intensity değerleri;
+            # intensity sadece konuşma bölgelerindeyse dışarıdaki kareler atlanır
+            shimmer_times = pitch_times
+            if speech is not None:
+                shimmer_times = pitch_times[in_regions(pitch_times, speech["regions"])]
+            aligned_intensity = align_track(intensity_times, intensity_values, shimmer_times)
             aligned_intensity = aligned_intensity[aligned_intensity > 0]  # Pozitif değerler
             
             if len(aligned_intensity) > 1:
@@ -132,107 +209,37 @@ class AdvancedAudioService:
                     shimmer_local = np.mean(amp_diffs) / mean_amp
                     
                     # APQ3 (3-point Amplitude Perturbation Quotient)
-                    if len(aligned_intensity) >= 3:
-                        apq3_diffs = []
-                        for i in range(len(aligned_intensity) - 2):
-                            # 3 noktalı ortalama
-                            local_avg = np.mean(aligned_intensity[i:i+3])
-                            # Ortadaki değerin ortalamadan sapması
-                            apq3_diffs.append(abs(aligned_intensity[i+1] - local_avg))
-                        shimmer_apq3 = np.mean(apq3_diffs) / mean_amp if len(apq3_diffs) > 0 else 0.0
+                    shimmer_apq3 = _perturbation_quotient(aligned_intensity, 3, mean_amp)
                     
                     # APQ5 (5-point Amplitude Perturbation Quotient)
-                    if len(aligned_intensity) >= 5:
-                        apq5_diffs = []
-                        for i in range(len(aligned_intensity) - 4):
-                            # 5 noktalı ortalama
-                            local_avg = np.mean(aligned_intensity[i:i+5])
-                            # Ortadaki (3.) değerin ortalamadan sapması
-                            apq5_diffs.append(abs(aligned_intensity[i+2] - local_avg))
-                        shimmer_apq5 = np.mean(apq5_diffs) / mean_amp if len(apq5_diffs) > 0 else 0.0
+                    shimmer_apq5 = _perturbation_quotient(aligned_intensity, 5, mean_amp)
         except Exception as e:
             # Fallback: basit RMS tabanlı shimmer
             try:
-                rms = librosa.feature.rms(y=y)[0]
-                rms = rms[rms > 0]
-                if len(rms) > 1:
-                    mean_rms = np.mean(rms)
+                voiced_rms = rms[rms > 0]
+                if len(voiced_rms) > 1:
+                    mean_rms = np.mean(voiced_rms)
                     if mean_rms > 0:
-                        amp_diffs = np.abs(np.diff(rms))
+                        amp_diffs = np.abs(np.diff(voiced_rms))
                         shimmer_local = np.mean(amp_diffs) / mean_rms
             except:
                 pass
         
         # HNR (Harmonic-to-Noise Ratio)
-        hnr = 0.0
-        try:
-            hnr_praat = sound.to_harmonicity()
-            hnr_values = hnr_praat.values[0]
-            hnr_values = hnr_values[~np.isnan(hnr_values)]
-            hnr_values = hnr_values[hnr_values > -50]  # Mantıklı değerler
-            if len(hnr_values) > 0:
-                hnr = float(np.mean(hnr_values))
-        except:
-            # Fallback: librosa ile basit HNR hesabı
-            harmonic, percussive = librosa.effects.hpss(y)
-            if np.var(harmonic) > 0:
-                hnr = 10 * np.log10(np.var(harmonic) / (np.var(percussive) + 1e-10))
+        hnr = frame["hnr"]
         
-        # Formantlar (F1-F4)
+        # Formantlar (F1-F4) - tanımlı karelerin ortalaması
         formants = {"F1": 0.0, "F2": 0.0, "F3": 0.0, "F4": 0.0}
-        try:
-            formant = sound.to_formant_burg(time_step=0.01)
-            # Ortalama formant değerlerini al
-            times = formant.ts()
-            f1_values = []
-            f2_values = []
-            f3_values = []
-            f4_values = []
-            
-            for t in times:
-                try:
-                    f1 = formant.get_value_at_time(1, t)
-                    f2 = formant.get_value_at_time(2, t)
-                    f3 = formant.get_value_at_time(3, t)
-                    f4 = formant.get_value_at_time(4, t)
-                    
-                    if f1 > 0:
-                        f1_values.append(f1)
-                    if f2 > 0:
-                        f2_values.append(f2)
-                    if f3 > 0:
-                        f3_values.append(f3)
-                    if f4 > 0:
-                        f4_values.append(f4)
-                except:
-                    continue
-            
-            if f1_values:
-                formants["F1"] = float(np.mean(f1_values))
-            if f2_values:
-                formants["F2"] = float(np.mean(f2_values))
-            if f3_values:
-                formants["F3"] = float(np.mean(f3_values))
-            if f4_values:
-                formants["F4"] = float(np.mean(f4_values))
-        except:
-            pass
+        formant_tracks = frame["formant_tracks"]
+        if formant_tracks is not None:
+            means = masked_track_means(formant_tracks["values"])
+            for k, mean in enumerate(means, start=1):
+                formants[f"F{k}"] = float(mean)
+            if tracks is not None:
+                tracks["formants"] = formant_tracks
         
         # Speech Rate - sesli segmentlerin oranı ve pitch değişim hızı
-        duration = librosa.get_duration(y=y, sr=sr)
-        
-        # Voiced segment sayısı ve toplam süresi
-        try:
-            if pitch is not None:
-                pitch_times = pitch.ts()
-                total_frames = len(pitch.selected_array['frequency'])
-            else:
-                pitch_times = []
-                total_frames = 0
-        except Exception:
-            pitch_times = []
-            total_frames = 0
-        
+        # Voiced segment sayısı
         voiced_frames = len(pitch_values)
         
         # Voiced ratio (sesli segment oranı)
@@ -245,71 +252,45 @@ class AdvancedAudioService:
         else:
             speech_rate_audio = 0.0
         
-        # Pause Analysis - Enerji tabanlı duraklama tespiti
-        rms = librosa.feature.rms(y=y)[0]
-        
-        # Threshold: RMS'in ortalamasının altında kalan bölgeler
-        rms_mean = np.mean(rms)
-        rms_std = np.std(rms)
-        rms_threshold = rms_mean - 0.5 * rms_std  # Ortalamanın altında
-        
-        pause_segments = []
-        in_pause = False
-        pause_start = 0
+        # Pause Analysis - Enerji tabanlı duraklama tespiti (run-length encoding)
+        pause_threshold = rms_threshold(rms, strategy=settings.pause_threshold_strategy)
+        pause_starts, pause_ends = find_pauses(
+            rms, pause_threshold, frame_duration, duration,
+            min_pause=settings.pause_min_duration
+        )
+        pause_analysis = summarize_pauses(pause_starts, pause_ends, duration)
+        if tracks is not None:
+            tracks["pauses"] = {"times": pause_starts, "values": pause_ends}
         
-        # Frame süresini hesapla
-        hop_length = len(y) // len(rms)
-        frame_duration = hop_length / sr
-        
-        for i, energy in enumerate(rms):
-            if energy < rms_threshold and not in_pause:
-                # Duraklama başladı
-                in_pause = True
-                pause_start = i * frame_duration
-            elif energy >= rms_threshold and in_pause:
-                # Duraklama bitti
-                in_pause = False
-                pause_duration = (i * frame_duration) - pause_start
-                if pause_duration > 0.1:  # 100ms'den uzun duraklamalar
-                    pause_segments.append(pause_duration)
-        
-        # Son duraklamayı kontrol et (ses dosyasının sonunda duraklama varsa)
-        if in_pause:
-            pause_duration = duration - pause_start
-            if pause_duration > 0.1:
-                pause_segments.append(pause_duration)
-        
-        total_pause_time = sum(pause_segments)
-        pause_count = len(pause_segments)
-        avg_pause_duration = np.mean(pause_segments) if pause_segments else 0.0
+        # Konuşma / artikülasyon hızı - hece çekirdekleri (de Jong & Wempe)
+        nuclei_times = np.zeros(0)
+        if intensity_values is not None:
+            try:
+                nuclei_times = detect_syllable_nuclei(
+                    intensity_times, intensity_values, pitch_track["times"], pitch_track["f0"]
+                )
+            except Exception as e:
+                print(f"[AdvancedAudio] Hece çekirdeği analizi hatası: {e}", flush=True)
+        syllable_rate = speech_rate_metrics(nuclei_times, duration, pause_analysis["total_pause_time"])
+        if tracks is not None:
+            tracks["syllable_nuclei"] = {"times": nuclei_times}
         
         # Voice Onset Time (VOT) - İlk sesli segmentin başlangıcı
         vot = 0.0
         try:
             # RMS kullanarak ilk sesli bölümü bul
             if len(rms) > 0:
-                rms_threshold_vot = np.percentile(rms, 25)  # Alt %25'in üstü
-                
-                # İlk sesli bölümü bul (threshold'u geçen ilk nokta)
-                for i, energy in enumerate(rms):
-                    if energy > rms_threshold_vot:
-                        # Bu noktadan önceki sessizlik süresini hesapla
-                        vot = i * frame_duration
-                        break
+                # Alt %25'in üstüne çıkan ilk kare
+                vot = first_frame_above(rms, np.percentile(rms, 25), frame_duration)
                 
                 # Alternatif: Pitch'in başladığı nokta
-                if len(pitch_values) > 0 and pitch is not None:
-                    try:
-                        pitch_times = pitch.ts()
-                        if len(pitch_times) > 0:
-                            first_voiced_time = pitch_times[0]
-                            vot = min(vot, float(first_voiced_time)) if vot > 0 else float(first_voiced_time)
-                    except:
-                        pass
+                if len(pitch_values) > 0 and len(pitch_times) > 0:
+                    first_voiced_time = pitch_times[0]
+                    vot = min(vot, float(first_voiced_time)) if vot > 0 else float(first_voiced_time)
         except:
             vot = 0.0
         
-        return {
+        features = {
             "jitter": {
                 "local": float(jitter_local),
                 "rap": float(jitter_rap),
@@ -323,15 +304,125 @@ class AdvancedAudioService:
             "hnr": float(hnr),
             "formants": formants,
             "speech_rate_audio": float(speech_rate_audio),
+            "syllable_rate": syllable_rate,
             "voiced_ratio": float(voiced_ratio),
-            "pause_analysis": {
-                "total_pause_time": float(total_pause_time),
-                "pause_count": pause_count,
-                "avg_pause_duration": float(avg_pause_duration),
-                "pause_percentage": float((total_pause_time / duration * 100) if duration > 0 else 0.0)
-            },
+            "pause_analysis": pause_analysis,
             "voice_onset_time": float(vot)
         }
+        if speech is not None:
+            features["voice_activity"] = {
+                "speech_seconds": speech["speech_seconds"],
+                "skipped_seconds": speech["skipped_seconds"],
+                "leading_silence": speech["leading_silence"],
+                "trailing_silence": speech["trailing_silence"],
+                "region_count": len(speech["regions"])
+            }
+        return features
+
+
+    @staticmethod
+    def _frame_tracks(audio: AudioBuffer) -> Dict:
+        """Tüm dosyadan Praat izleri (intensity, HNR, formant) ve RMS enerji"""
+        # Parselmouth ile ses analizi (diskten değil tampondan)
+        sound = audio.to_sound()
+        
+        # Intensity izi (dB); shimmer ve hece çekirdekleri paylaşır
+        try:
+            intensity = sound.to_intensity()
+            intensity_values = intensity.values[0]
+            intensity_times = intensity.ts()
+        except Exception as e:
+            print(f"[AdvancedAudio] Intensity analizi hatası: {e}", flush=True)
+            intensity_values = None
+            intensity_times = None
+        
+        hnr = 0.0
+        try:
+            hnr_values = _valid_hnr(sound.to_harmonicity().values[0])
+            if len(hnr_values) > 0:
+                hnr = float(np.mean(hnr_values))
+        except:
+            # Fallback: librosa ile basit HNR hesabı
+            y = audio.at_rate(None)
+            harmonic, percussive = librosa.effects.hpss(y)
+            if np.var(harmonic) > 0:
+                hnr = 10 * np.log10(np.var(harmonic) / (np.var(percussive) + 1e-10))
+        
+        try:
+            # F1-F4 izlerini toplu al
+            formant_tracks = extract_formant_tracks(sound, time_step=0.01, max_formant_count=4)
+        except Exception as e:
+            print(f"[AdvancedAudio] Formant analizi hatası: {e}", flush=True)
+            formant_tracks = None
+        
+        # Kare enerjisi: temel özelliklerle aynı spektral ön yüz ve kare ızgarası;
+        # shimmer yedeği, duraklama ve VOT aynı diziyi kullanır
+        spectral = audio.spectral(SPECTRAL_SR)
+        return {
+            "intensity_times": intensity_times,
+            "intensity_values": intensity_values,
+            "hnr": hnr,
+            "formant_tracks": formant_tracks,
+            "rms": spectral.rms,
+            "frame_duration": spectral.frame_duration
+        }
+    
+    @staticmethod
+    def _frame_tracks_streaming(audio: AudioBuffer, windows: Optional[Iterable[AudioWindow]] = None) -> Dict:
+        """
+        _frame_tracks ile aynı çıktı, pencere pencere. Her pencerede float64 Praat
+        sesi sadece pencere kadardır; pencere kendi aralığındaki kareleri tutar.
+        windows: verilmezse tüm kaydı kapsayan pencereler (ör. sadece konuşma
+        bölgeleri için vad.speech_windows). RMS her durumda tüm kayıttandır.
+        """
+        intensity_times, intensity_values = [], []
+        formant_times, formant_values = [], []
+        hnr_stats = RunningStats()
+        intensity_failed = False
+        
+        for window in (windows if windows is not None else native_windows(audio)):
+            sound = window.to_sound()
+            try:
+                intensity = sound.to_intensity()
+                times = intensity.ts() + window.offset
+                keep = window.owns(times)
+                intensity_times.append(times[keep])
+                intensity_values.append(intensity.values[0][keep])
+            except Exception as e:
+                print(f"[AdvancedAudio] Intensity analizi hatası: {e}", flush=True)
+                intensity_failed = True
+            try:
+                harmonicity = sound.to_harmonicity()
+                keep = window.owns(harmonicity.ts() + window.offset)
+                hnr_stats.update(_valid_hnr(harmonicity.values[0][keep]))
+            except Exception as e:
+                print(f"[AdvancedAudio] HNR analizi hatası: {e}", flush=True)
+            try:
+                window_formants = extract_formant_tracks(sound, time_step=0.01, max_formant_count=4)
+                times = window_formants["times"] + window.offset
+                keep = window.owns(times)
+                formant_times.append(times[keep])
+                formant_values.append(window_formants["values"][:, keep])
+            except Exception as e:
+                print(f"[AdvancedAudio] Formant analizi hatası: {e}", flush=True)
+        
+        # Hiç pencere yoksa (konuşma bölgesi bulunamadı) intensity izi de yoktur
+        intensity_failed = intensity_failed or not intensity_times
+        if should_stream(audio):
+            rms = np.concatenate([window.rms for window in spectral_windows(audio)])
+        else:
+            rms = audio.spectral(SPECTRAL_SR).rms
+        return {
+            "intensity_times": None if intensity_failed else np.concatenate(intensity_times),
+            "intensity_values": None if intensity_failed else np.concatenate(intensity_values),
+            "hnr": float(hnr_stats.mean),
+            "formant_tracks": {
+                "times": np.concatenate(formant_times),
+                "values": np.concatenate(formant_values, axis=1)
+            } if formant_values else None,
+            "rms": rms,
+            "frame_duration": HOP_LENGTH / float(SPECTRAL_SR)
+        }
 
 
 advanced_audio_service = AdvancedAudioService()
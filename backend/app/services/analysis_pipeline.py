@@ -0,0 +1,327 @@
+"""Analiz pipeline'ı: worker tarafından kuyruktaki her iş için çalıştırılır"""
+import os
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob
+from app.models.participant import Participant
+from app.services.openai_service import openai_service
+from app.services.audio_service import audio_service
+from app.services.advanced_audio_service import advanced_audio_service
+from app.services.linguistic_service import linguistic_service
+from app.services.openrouter_service import openrouter_service
+from app.services.report_service import report_service
+from app.services.progress_store import ReportStream, register_stages, set_stage_state
+from app.services.process_pool import process_pool
+from app.services.audio_buffer import AudioBuffer, decode_audio, discard_decoded
+from app.services.stage_graph import Stage, run_stage_graph
+from app.services.job_queue import JobLeaseLost, complete_job
+from app.services.pitch_tracker import track_pitch_parallel
+from app.services.vad import CLIP_SAMPLE_RATE, detect_speech_regions, write_speech_clip, speech_clip_path
+from app.services.audio_normalizer import audio_normalizer
+from app.services.transcript_chunks import (
+    needs_chunking, plan_transcript_chunks, write_transcript_chunks, chunk_path_prefix
+)
+from app.core.config import settings
+
+
+async def _normalize_stage(file_path: str) -> str:
+    # Yükleme bir kez kanonik PCM'e dönüştürülür; sonraki adımlar bu dosyayı kullanır
+    return await audio_normalizer.normalize(file_path)
+
+
+async def _decode_stage(audio_path: str) -> AudioBuffer:
+    # Alt process'ten sadece memory-map edilen .npy yolu döner
+    return await process_pool.run(decode_audio, audio_path)
+
+
+async def _speech_regions_stage(audio_buffer: AudioBuffer) -> dict:
+    # Enerji tabanlı VAD: Whisper kırpması ve Praat analizleri için konuşma bölgeleri
+    speech = await process_pool.run(detect_speech_regions, audio_buffer)
+    print(
+        f"[Analiz] VAD: {len(speech['regions'])} konuşma bölgesi, {speech['skipped_seconds']:.1f}s sessizlik atlanacak "
+        f"(baş {speech['leading_silence']:.1f}s, son {speech['trailing_silence']:.1f}s)", flush=True
+    )
+    return speech
+
+
+async def _pitch_stage(audio_buffer: AudioBuffer, audio_sha256: str) -> dict:
+    # F0 izi bir kez çıkarılır; temel ve gelişmiş özellikler paylaşır.
+    # PITCH_PARALLEL_CHUNKS > 1 ise parçalar havuzda paralel takip edilir.
+    return await track_pitch_parallel(audio_buffer, audio_sha256)
+
+
+async def _acoustic_stage(audio_buffer: AudioBuffer, audio_sha256: str, pitch_track: dict) -> dict:
+    return await process_pool.run(audio_service.extract_features, audio_buffer, audio_sha256, pitch_track)
+
+
+async def _advanced_acoustic_stage(audio_buffer: AudioBuffer, audio_sha256: str, pitch_track: dict, speech_regions: dict) -> dict:
+    return await process_pool.run(
+        advanced_audio_service.extract_advanced_features, audio_buffer, audio_sha256, pitch_track,
+        speech_regions if settings.vad_enabled else None
+    )
+
+
+async def _transcript_stage(audio_path: str, audio_sha256: str, audio_buffer: AudioBuffer, speech_regions: dict) -> str:
+    if openai_service.is_transcript_cached(audio_sha256, "tr"):
+        return await openai_service.transcribe_audio(audio_path, language="tr", audio_sha256=audio_sha256)
+
+    # Uzun / boyut sınırını aşan kayıt: sessizliklerden bölünmüş parçalar eşzamanlı
+    # gönderilir; değilse baştaki/sondaki sessizlik kırpılmış tek kopya
+    temp_paths = []
+
+    async def transcribe_chunks(chunks):
+        chunk_paths = await process_pool.run(
+            write_transcript_chunks, audio_buffer, chunks, chunk_path_prefix(audio_path)
+        )
+        temp_paths.extend(chunk_paths)
+        print(f"[Analiz] Whisper: {len(chunks)} parça", flush=True)
+        return await openai_service.transcribe_audio(
+            audio_path, language="tr", audio_sha256=audio_sha256, chunk_paths=chunk_paths
+        )
+
+    try:
+        chunks = []
+        if needs_chunking(audio_path, audio_buffer.duration):
+            chunks = plan_transcript_chunks(speech_regions)
+        if len(chunks) > 1:
+            return await transcribe_chunks(chunks)
+
+        clip_path = await process_pool.run(
+            write_speech_clip, audio_buffer, speech_regions, speech_clip_path(audio_path)
+        )
+        if clip_path:
+            temp_paths.append(clip_path)
+        # Whisper boyut sınırı: audio_path kanonik dosyadır (orijinal silinmiştir),
+        # gönderilecek dosya sınırı aşıyorsa parçalı yola geçilir
+        upload_path = clip_path or audio_path
+        if os.path.getsize(upload_path) > settings.max_file_size:
+            # Parçalar 16 kHz PCM_16 FLAC'tır (en fazla 2 bayt/örnek); son parçanın 1.25
+            # katına uzaması ve örtüşme payıyla da her parça sınırın altında kalsın
+            chunk_seconds = min(
+                settings.whisper_chunk_seconds,
+                0.7 * settings.max_file_size / (2 * CLIP_SAMPLE_RATE)
+            )
+            chunks = plan_transcript_chunks(speech_regions, chunk_seconds)
+            if len(chunks) > 1:
+                print(f"[Analiz] Whisper dosyası boyut sınırını aşıyor, parçalı gönderilecek", flush=True)
+                return await transcribe_chunks(chunks)
+        return await openai_service.transcribe_audio(upload_path, language="tr", audio_sha256=audio_sha256)
+    finally:
+        for path in temp_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+async def _linguistic_stage(transcript: str) -> dict:
+    return await process_pool.run(linguistic_service.analyze_text, transcript)
+
+
+async def _combined_llm_stage(
+    participant_info: dict,
+    transcript: str,
+    acoustic_features: dict,
+    advanced_acoustic: dict,
+    linguistic_analysis: dict,
+    progress_id: str
+) -> dict:
+    # LLM_SINGLE_CALL: duygu/içerik analizi ve klinik rapor tek yapılandırılmış çağrıda.
+    # Opsiyonel stage; başarısız olursa sonraki iki stage ayrı çağrılara düşer.
+    # Rapor bölümleri yanıt geldikçe report_delta olarak iletilir
+    return await openrouter_service.generate_combined_analysis(
+        participant_info=participant_info,
+        transcript=transcript,
+        acoustic_features=acoustic_features,
+        advanced_acoustic=advanced_acoustic,
+        linguistic_analysis=linguistic_analysis,
+        report_stream=ReportStream(progress_id, settings.report_stream_flush_seconds) if progress_id else None
+    )
+
+
+async def _content_emotion_stage(transcript: str, acoustic_features: dict, llm_combined: dict = None) -> dict:
+    if llm_combined:
+        return llm_combined["content_emotion"]
+    return await openai_service.analyze_content_and_emotion(transcript, acoustic_features)
+
+
+async def _clinical_report_stage(
+    participant_info: dict,
+    transcript: str,
+    acoustic_features: dict,
+    advanced_acoustic: dict,
+    linguistic_analysis: dict,
+    content_emotion: dict,
+    progress_id: str,
+    llm_combined: dict = None
+):
+    if llm_combined:
+        return llm_combined["clinical_report"]
+    # Rapor parçaları üretildikçe SSE progress kanalına iletilir (report_delta)
+    return await openrouter_service.generate_clinical_report(
+        participant_info=participant_info,
+        transcript=transcript,
+        acoustic_features=acoustic_features,
+        advanced_acoustic=advanced_acoustic,
+        linguistic_analysis=linguistic_analysis,
+        emotion_analysis=content_emotion.get("emotion_analysis", {}),
+        content_analysis=content_emotion.get("content_analysis", {}),
+        report_stream=ReportStream(progress_id, settings.report_stream_flush_seconds) if progress_id else None
+    )
+
+
+async def _pdf_stage(
+    participant_info: dict,
+    transcript: str,
+    acoustic_features: dict,
+    advanced_acoustic: dict,
+    linguistic_analysis: dict,
+    content_emotion: dict,
+    clinical_report
+):
+    return await process_pool.run(
+        report_service.create_pdf_report,
+        participant_info=participant_info,
+        transcript=transcript,
+        acoustic_features=acoustic_features,
+        advanced_acoustic=advanced_acoustic,
+        linguistic_analysis=linguistic_analysis,
+        emotion_analysis=content_emotion.get("emotion_analysis", {}),
+        content_analysis=content_emotion.get("content_analysis", {}),
+        gemini_report=clinical_report
+    )
+
+
+def build_analysis_stages() -> list:
+    """
+    Analiz stage grafı. step değerleri progress_store.ANALYSIS_STEPS ile eşleşir.
+    Whisper akustik adımlardan bağımsız olduğu için onlarla aynı anda çalışır;
+    sadece kırpma için VAD bölgelerini bekler.
+    LLM_SINGLE_CALL açıksa duygu analizi ve klinik rapor, tüm özellikleri
+    bekleyen tek bir çağrının (llm_combined) sonucundan alınır.
+    """
+    features = ("acoustic_features", "advanced_acoustic", "linguistic_analysis", "content_emotion")
+    combined = ("llm_combined",) if settings.llm_single_call else ()
+    stages = [
+        Stage("audio_path", _normalize_stage, ("file_path",),
+              step=2, message="Ses dosyası dönüştürülüyor..."),
+        Stage("audio_buffer", _decode_stage, ("audio_path",),
+              step=2, message="Ses dosyası çözümleniyor..."),
+        Stage("speech_regions", _speech_regions_stage, ("audio_buffer",),
+              step=2, message="Konuşma bölgeleri belirleniyor (VAD)..."),
+        Stage("pitch_track", _pitch_stage, ("audio_buffer", "audio_sha256"),
+              step=2, message="Temel frekans (F0) izi çıkarılıyor..."),
+        Stage("acoustic_features", _acoustic_stage, ("audio_buffer", "audio_sha256", "pitch_track"),
+              step=2, message="Temel akustik özellikler çıkarılıyor..."),
+        Stage("advanced_acoustic", _advanced_acoustic_stage,
+              ("audio_buffer", "audio_sha256", "pitch_track", "speech_regions"),
+              step=3, message="Gelişmiş akustik analiz yapılıyor..."),
+        Stage("transcript", _transcript_stage, ("audio_path", "audio_sha256", "audio_buffer", "speech_regions"),
+              step=4, message="Konuşma metne dönüştürülüyor (Whisper)..."),
+        Stage("linguistic_analysis", _linguistic_stage, ("transcript",),
+              step=5, message="Dilbilimsel analiz yapılıyor..."),
+        Stage("content_emotion", _content_emotion_stage, ("transcript", "acoustic_features") + combined,
+              step=6, message="Duygu ve içerik analizi yapılıyor..."),
+        Stage("clinical_report", _clinical_report_stage, ("participant_info", "transcript") + features + ("progress_id",) + combined,
+              step=7, message="AI klinik raporu oluşturuluyor...", optional=True),
+        Stage("pdf_path", _pdf_stage, ("participant_info", "transcript") + features + ("clinical_report",),
+              step=8, message="PDF raporu hazırlanıyor...", optional=True),
+    ]
+    if settings.llm_single_call:
+        stages.append(
+            Stage("llm_combined", _combined_llm_stage,
+                  ("participant_info", "transcript", "acoustic_features", "advanced_acoustic", "linguistic_analysis",
+                   "progress_id"),
+                  step=6, message="Duygu analizi ve klinik rapor tek çağrıda oluşturuluyor...", optional=True)
+        )
+    return stages
+
+
+async def run_analysis(db: AsyncSession, job: AnalysisJob) -> Analysis:
+    """Kuyruktaki iş için tüm analiz adımlarını çalıştır, sonucu kaydedip işi tamamla"""
+    progress_id = job.progress_id
+    file_path = job.audio_path
+
+    result = await db.execute(
+        select(Participant).where(
+            Participant.id == job.participant_id,
+            Participant.user_id == job.user_id
+        )
+    )
+    participant = result.scalar_one_or_none()
+    if not participant:
+        raise ValueError("Katılımcı bulunamadı veya erişim izniniz yok")
+
+    participant_info = {
+        "name": participant.name,
+        "age": participant.age,
+        "gender": participant.gender,
+        "group_type": participant.group_type.value,
+        "mmse_score": participant.mmse_score
+    }
+
+    start_time = time.time()
+
+    def on_state(stage: Stage, state: str, message: str):
+        set_stage_state(progress_id, stage.step, state, message if state == "running" else "", stage=stage.name)
+
+    stages = build_analysis_stages()
+    register_stages(progress_id, {stage.name: stage.step for stage in stages})
+    set_stage_state(progress_id, 1, "completed")
+    try:
+        outputs = await run_stage_graph(
+            stages,
+            initial={
+                "file_path": file_path,
+                "audio_sha256": job.audio_sha256,
+                "participant_info": participant_info,
+                "progress_id": progress_id
+            },
+            on_state=on_state
+        )
+    finally:
+        # Geçici PCM tamponunu temizle (kanonik dosyadan ya da orijinalden çözülmüş olabilir)
+        discard_decoded(file_path)
+        if audio_normalizer.enabled:
+            discard_decoded(audio_normalizer.canonical_path_for(file_path))
+
+    # Kayıtta kanonik dosya tutulur (orijinal yükleme dönüşümden sonra silinir)
+    file_path = outputs["audio_path"]
+    transcript = outputs["transcript"]
+    acoustic_features = outputs["acoustic_features"]
+    advanced_acoustic = outputs["advanced_acoustic"]
+    linguistic_analysis = outputs["linguistic_analysis"]
+    analysis_result = outputs["content_emotion"]
+    clinical_report = outputs["clinical_report"]
+    pdf_path = outputs["pdf_path"]
+
+    # 9. Veritabanına kaydet
+    set_stage_state(progress_id, 9, "running", "Veritabanına kaydediliyor...")
+    print(f"[Analiz] Veritabanina kaydediliyor...", flush=True)
+    db_analysis = Analysis(
+        user_id=job.user_id,
+        participant_id=job.participant_id,
+        audio_path=file_path,
+        transcript=transcript,
+        acoustic_features=acoustic_features,
+        emotion_analysis=analysis_result.get("emotion_analysis"),
+        content_analysis=analysis_result.get("content_analysis"),
+        advanced_acoustic=advanced_acoustic,
+        linguistic_analysis=linguistic_analysis,
+        gemini_report=clinical_report,
+        report_pdf_path=pdf_path,
+        # İzler bu process'in ayarlarıyla yazıldı; sonradan ayar değişse de bu sürümlerle okunur
+        track_versions=advanced_audio_service.track_versions()
+    )
+    db.add(db_analysis)
+    await db.flush()
+    # Kayıt ve iş tamamlama tek transaction'da: kira kaybedildiyse (iş başka
+    # worker'a geçtiyse) Analysis satırı da geri alınır
+    if not await complete_job(db, job, db_analysis.id):
+        raise JobLeaseLost(f"Is {job.id} artik bu worker'da degil, sonuc kaydedilmedi")
+    await db.refresh(db_analysis)
+
+    total_time = time.time() - start_time
+    print(f"[Analiz] TAMAMLANDI! Toplam sure: {total_time:.1f}s", flush=True)
+
+    return db_analysis
@@ -0,0 +1,148 @@
+"""Tek seferlik çözümlenen (decode) ses tamponu.
+
+Yüklenen dosya bir kez float32 mono PCM'e çözülür; librosa için yeniden
+örneklenmiş görünümler sample rate'e göre önbelleğe alınır, Praat için
+`parselmouth.Sound` diskten değil numpy dizisinden kurulur.
+
+Tampon `persist()` ile .npy olarak yazıldığında process havuzuna sadece dosya
+yolu gider; alt process'ler aynı diziyi memory-map ile açar. `decode_audio`
+soundfile'ın okuyabildiği dosyaları (wav/flac, kanonik dosyalar) bloklar
+halinde doğrudan .npy'ye yazar; bellek kullanımı kayıt süresiyle büyümez.
+"""
+import os
+from typing import Dict, Optional
+import numpy as np
+from app.core.config import settings
+from app.services.spectral_frontend import SpectralFrontEnd, SPECTRAL_SR
+
+# decode_audio'nun tek seferde okuduğu kare sayısı
+DECODE_BLOCK_FRAMES = 1 << 16
+
+
+class AudioBuffer:
+    def __init__(self, samples: np.ndarray, sample_rate: int, backing_path: Optional[str] = None):
+        if samples.ndim != 1:
+            raise ValueError("AudioBuffer mono (1 boyutlu) sinyal bekler")
+        self.samples = samples
+        self.sample_rate = int(sample_rate)
+        self.backing_path = backing_path
+        self._resampled: Dict[int, np.ndarray] = {}
+        self._spectral: Dict[int, "SpectralFrontEnd"] = {}
+
+    @classmethod
+    def from_file(cls, audio_path: str) -> "AudioBuffer":
+        """Dosyayı native sample rate'te float32 mono olarak bir kez çözümle"""
+        import librosa
+        y, sr = librosa.load(audio_path, sr=None, mono=True, dtype=np.float32)
+        return cls(np.ascontiguousarray(y, dtype=np.float32), sr)
+
+    @classmethod
+    def load(cls, backing_path: str, sample_rate: int) -> "AudioBuffer":
+        """persist() ile yazılmış tamponu memory-map ile aç"""
+        samples = np.load(backing_path, mmap_mode="r")
+        return cls(samples, sample_rate, backing_path=backing_path)
+
+    @staticmethod
+    def pcm_path_for(audio_path: str) -> str:
+        """Yüklenen dosya için PCM tampon dosyasının yolu"""
+        pcm_dir = os.path.join(settings.upload_dir, "pcm")
+        os.makedirs(pcm_dir, exist_ok=True)
+        return os.path.join(pcm_dir, os.path.basename(audio_path) + ".npy")
+
+    def persist(self, backing_path: str) -> "AudioBuffer":
+        """Tamponu .npy olarak yaz ve memory-map edilmiş kopyasını döndür"""
+        np.save(backing_path, np.asarray(self.samples, dtype=np.float32))
+        return AudioBuffer.load(backing_path, self.sample_rate)
+
+    def __reduce__(self):
+        # Diskte karşılığı varsa sadece yolu pickle et (process havuzu için)
+        if self.backing_path:
+            return (AudioBuffer.load, (self.backing_path, self.sample_rate))
+        return (AudioBuffer, (np.asarray(self.samples), self.sample_rate))
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.sample_rate) if self.sample_rate else 0.0
+
+    def at_rate(self, sample_rate: Optional[int]) -> np.ndarray:
+        """Verilen sample rate'te sinyal (None: native). Sonuç önbelleğe alınır."""
+        if sample_rate is None or int(sample_rate) == self.sample_rate:
+            return self.samples
+        sample_rate = int(sample_rate)
+        if sample_rate not in self._resampled:
+            import librosa
+            self._resampled[sample_rate] = librosa.resample(
+                np.asarray(self.samples), orig_sr=self.sample_rate, target_sr=sample_rate
+            )
+        return self._resampled[sample_rate]
+
+    def spectral(self, sample_rate: int = SPECTRAL_SR) -> SpectralFrontEnd:
+        """Bu sample rate için paylaşılan STFT / mel ön yüzü (önbelleğe alınır)"""
+        sample_rate = int(sample_rate)
+        if sample_rate not in self._spectral:
+            self._spectral[sample_rate] = SpectralFrontEnd(self.at_rate(sample_rate), sample_rate)
+        return self._spectral[sample_rate]
+
+    def to_sound(self):
+        """Praat analizi için parselmouth.Sound (diski tekrar okumadan)"""
+        import parselmouth
+        return parselmouth.Sound(
+            np.asarray(self.samples, dtype=np.float64),
+            sampling_frequency=float(self.sample_rate)
+        )
+
+
+def _decode_blocks(audio_path: str, pcm_path: str) -> Optional[int]:
+    """
+    Dosyayı soundfile ile bloklar halinde mono float32 olarak memory-map
+    edilmiş .npy'ye yaz; sample rate'i döndür. soundfile dosyayı okuyamıyorsa
+    ya da kare sayısı bildirilenle tutmuyorsa None.
+    """
+    import soundfile as sf
+    try:
+        info = sf.info(audio_path)
+    except RuntimeError:
+        return None
+    if info.frames <= 0:
+        return None
+
+    out = np.lib.format.open_memmap(pcm_path, mode="w+", dtype=np.float32, shape=(info.frames,))
+    written = 0
+    try:
+        for block in sf.blocks(audio_path, blocksize=DECODE_BLOCK_FRAMES, dtype="float32", always_2d=True):
+            n = min(len(block), info.frames - written)
+            # librosa.load(mono=True) ile aynı: kanalların ortalaması
+            out[written:written + n] = block[:n].mean(axis=1)
+            written += n
+        out.flush()
+    except RuntimeError:
+        written = -1
+    finally:
+        del out
+    if written != info.frames:
+        os.remove(pcm_path)
+        return None
+    return info.samplerate
+
+
+def decode_audio(audio_path: str) -> AudioBuffer:
+    """Dosyayı çözümleyip PCM tamponunu diske yaz (process havuzunda çalışır)"""
+    pcm_path = AudioBuffer.pcm_path_for(audio_path)
+    sample_rate = _decode_blocks(audio_path, pcm_path)
+    if sample_rate is not None:
+        buffer = AudioBuffer.load(pcm_path, sample_rate)
+    else:
+        # soundfile'ın okuyamadığı biçimler (ör. normalizasyon kapalıyken m4a/webm)
+        buffer = AudioBuffer.from_file(audio_path).persist(pcm_path)
+    print(f"[AudioBuffer] Cozumlendi: {buffer.duration:.1f}s @ {buffer.sample_rate} Hz", flush=True)
+    return buffer
+
+
+def discard_decoded(audio_path: str):
+    """decode_audio ile yazılan geçici PCM tamponunu sil"""
+    pcm_path = AudioBuffer.pcm_path_for(audio_path)
+    if os.path.exists(pcm_path):
+        try:
+            os.remove(pcm_path)
+        except OSError:
+            pass
@@ -0,0 +1,147 @@
+"""Yüklenen sesi bir kez kanonik PCM dosyasına (16 kHz mono WAV/FLAC) dönüştürme.
+
+Yüklemeler .webm/.m4a/.mp3/.wav olarak gelir. Sıkıştırılmış formatları her
+tüketici (librosa/audioread, Whisper yüklemesi) yeniden çözmek zorunda
+kalmasın diye analiz başında ffmpeg ile tek seferlik dönüştürülür; sonraki
+tüm adımlar ve `Analysis.audio_path` bu dosyayı kullanır.
+
+ffmpeg alt process'leri event loop'u bloklamadan çalışır ve aynı anda en
+fazla AUDIO_NORMALIZE_CONCURRENCY kadar dönüşüm yapılır. ffmpeg kurulu
+değilse dönüşüm process havuzunda librosa + soundfile ile yapılır.
+"""
+import asyncio
+import os
+import shutil
+import time
+from typing import Optional
+from app.core.config import settings
+from app.services.process_pool import process_pool
+
+NORMALIZE_FORMATS = {
+    # format: (ffmpeg codec, ffmpeg muxer, soundfile formatı)
+    "wav": ("pcm_s16le", "wav", "WAV"),
+    "flac": ("flac", "flac", "FLAC"),
+}
+
+
+def _transcode_with_librosa(src_path: str, dest_path: str, sample_rate: int, fmt: str):
+    """ffmpeg yoksa yedek dönüşüm (process havuzunda çalışır)"""
+    import librosa
+    import soundfile as sf
+    y, _ = librosa.load(src_path, sr=sample_rate, mono=True)
+    sf.write(dest_path, y, sample_rate, format=NORMALIZE_FORMATS[fmt][2], subtype="PCM_16")
+
+
+class AudioNormalizer:
+    def __init__(self):
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ffmpeg = shutil.which("ffmpeg")
+
+    @property
+    def enabled(self) -> bool:
+        return settings.audio_normalize_enabled
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # İlk kullanımda oluşturulur (worker'ın event loop'u içinde)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, settings.audio_normalize_concurrency))
+        return self._semaphore
+
+    @staticmethod
+    def _format() -> str:
+        fmt = settings.audio_normalize_format
+        if fmt not in NORMALIZE_FORMATS:
+            raise ValueError(f"Bilinmeyen kanonik format: {fmt} (geçerli: {tuple(NORMALIZE_FORMATS)})")
+        return fmt
+
+    def cache_tag(self) -> str:
+        """Özellik önbelleği anahtarı için: özellikler hangi sesten çıkarıldı"""
+        if not self.enabled:
+            return "orig"
+        return f"{settings.audio_normalize_sample_rate // 1000}k"
+
+    def canonical_path_for(self, audio_path: str) -> str:
+        """Yükleme için kanonik dosyanın yolu (aynı dizin)"""
+        return f"{os.path.splitext(audio_path)[0]}.canonical.{self._format()}"
+
+    def _is_canonical(self, audio_path: str) -> bool:
+        """Dosya zaten hedef sample rate'te mono PCM mi? (ör. 16 kHz mono WAV yükleme)"""
+        try:
+            import soundfile as sf
+            info = sf.info(audio_path)
+        except Exception:
+            return False
+        return (
+            info.samplerate == settings.audio_normalize_sample_rate
+            and info.channels == 1
+            and info.format == NORMALIZE_FORMATS[self._format()][2]
+            and info.subtype == "PCM_16"
+        )
+
+    async def _run_ffmpeg(self, src_path: str, dest_path: str, sample_rate: int, fmt: str):
+        codec, muxer, _ = NORMALIZE_FORMATS[fmt]
+        proc = await asyncio.create_subprocess_exec(
+            self._ffmpeg, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-i", src_path, "-vn", "-ac", "1", "-ar", str(sample_rate),
+            "-c:a", codec, "-f", muxer, dest_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=settings.audio_normalize_timeout_seconds)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise RuntimeError(f"ffmpeg {settings.audio_normalize_timeout_seconds} sn içinde bitmedi")
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg hata kodu {proc.returncode}: {stderr.decode(errors='replace').strip()[:500]}")
+
+    async def normalize(self, audio_path: str) -> str:
+        """
+        Yüklemeyi kanonik dosyaya dönüştür ve yolunu döndür. Başarılı
+        dönüşümden sonra orijinal yükleme silinir. Dönüşüm başarısız olursa
+        analiz orijinal dosyayla devam eder.
+
+        İş yeniden denendiğinde (orijinal zaten silinmiş) mevcut kanonik
+        dosya döner.
+        """
+        if not self.enabled:
+            return audio_path
+        dest_path = self.canonical_path_for(audio_path)
+        if os.path.exists(dest_path):
+            return dest_path
+        if await asyncio.to_thread(self._is_canonical, audio_path):
+            return audio_path
+
+        sample_rate = settings.audio_normalize_sample_rate
+        fmt = self._format()
+        tmp_path = f"{dest_path}.part"
+        async with self.semaphore:
+            start = time.time()
+            try:
+                if self._ffmpeg:
+                    await self._run_ffmpeg(audio_path, tmp_path, sample_rate, fmt)
+                else:
+                    await process_pool.run(_transcode_with_librosa, audio_path, tmp_path, sample_rate, fmt)
+                os.replace(tmp_path, dest_path)
+            except Exception as e:
+                print(f"[Normalize] Dönüştürülemedi, orijinal dosya kullanılacak: {e}", flush=True)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return audio_path
+
+        src_size = os.path.getsize(audio_path)
+        print(
+            f"[Normalize] {os.path.basename(audio_path)} -> {fmt} {sample_rate} Hz mono: "
+            f"{src_size / 1024:.1f} KB -> {os.path.getsize(dest_path) / 1024:.1f} KB "
+            f"({time.time() - start:.2f}s, {'ffmpeg' if self._ffmpeg else 'librosa'})", flush=True
+        )
+        try:
+            os.remove(audio_path)
+        except OSError:
+            pass
+        return dest_path
+
+
+audio_normalizer = AudioNormalizer()
@@ -1,64 +1,85 @@
 import librosa
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
+from app.services.audio_buffer import AudioBuffer
+from app.services.feature_cache import feature_cache
+from app.services.spectral_frontend import SPECTRAL_SR
+from app.services.pitch_tracker import track_pitch
+from app.services.audio_normalizer import audio_normalizer
+from app.services.streaming_features import should_stream, spectral_windows, RunningStats
+from app.core.config import settings
 
 
 class AudioService:
+    # Çıktıyı değiştiren her değişiklikte artırılmalı (önbellek anahtarı)
+    FEATURE_VERSION = "5"
+    
     @staticmethod
-    def extract_features(audio_path: str) -> Dict:
-        """librosa ile ses dosyasından akustik özellikler çıkar (optimize edilmiş)"""
-        # Sabit sample rate ile yükle (hız optimizasyonu)
-        TARGET_SR = 22050
-        y, sr = librosa.load(audio_path, sr=TARGET_SR, mono=True)
+    def cache_version() -> str:
+        """Önbellek anahtarı: çıkarıcı sürümü + çıktıyı etkileyen ayarlar"""
+        return (
+            f"{AudioService.FEATURE_VERSION}-{settings.pitch_engine}"
+            f"-{settings.pitch_floor:g}-{settings.pitch_ceiling:g}-{audio_normalizer.cache_tag()}"
+        )
+    
+    @staticmethod
+    def extract_features(
+        audio: AudioBuffer,
+        audio_sha256: Optional[str] = None,
+        pitch_track: Optional[Dict] = None
+    ) -> Dict:
+        """Akustik özellikleri önce önbellekten dene, yoksa hesapla"""
+        version = AudioService.cache_version()
+        cached = feature_cache.get("acoustic_features", audio_sha256, version)
+        if cached is not None:
+            return cached
+        
+        if pitch_track is None:
+            pitch_track = track_pitch(audio, audio_sha256)
+        features = AudioService._compute_features(audio, pitch_track)
+        feature_cache.put("acoustic_features", audio_sha256, version, features)
+        return features
+    
+    @staticmethod
+    def _compute_features(audio: AudioBuffer, pitch_track: Dict) -> Dict:
+        """librosa ile ses tamponundan akustik özellikler çıkar (optimize edilmiş)"""
+        if should_stream(audio):
+            return AudioService._compute_features_streaming(audio, pitch_track)
+        
+        # Sabit sample rate görünümü; STFT/mel tüm spektral özellikler için bir kez hesaplanır
+        spectral = audio.spectral(SPECTRAL_SR)
+        y = spectral.y
+        sr = spectral.sr
         
         # Temel özellikler
         duration = librosa.get_duration(y=y, sr=sr)
         print(f"[Audio] Yuklendi: {duration:.1f}s, {len(y)} sample", flush=True)
         
         # Enerji (RMS)
-        rms = librosa.feature.rms(y=y)[0]
+        rms = spectral.rms
         mean_energy = float(np.mean(rms))
         max_energy = float(np.max(rms))
         
-        # Temel frekans (pitch) - pyin daha hızlı ve doğru
-        try:
-            # pyin kullan - daha hızlı
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                y, 
-                fmin=librosa.note_to_hz('C2'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr,
-                frame_length=2048
-            )
-            pitch_values = f0[~np.isnan(f0)] if f0 is not None else np.array([])
-            mean_pitch = float(np.mean(pitch_values)) if len(pitch_values) > 0 else 0.0
-            std_pitch = float(np.std(pitch_values)) if len(pitch_values) > 0 else 0.0
-        except Exception as e:
-            print(f"[Audio] Pitch analizi hatası: {e}", flush=True)
-            mean_pitch = 0.0
-            std_pitch = 0.0
+        # Temel frekans (pitch) - gelişmiş özelliklerle paylaşılan F0 izi
+        mean_pitch, std_pitch = AudioService._pitch_stats(pitch_track)
         
         # MFCC (Mel-frequency cepstral coefficients)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+        mfccs = spectral.mfcc(n_mfcc=13)
         mfcc_mean = [float(x) for x in np.mean(mfccs, axis=1)]
         mfcc_std = [float(x) for x in np.std(mfccs, axis=1)]
         
         # Spektral özellikler
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+        spectral_centroids = spectral.spectral_centroid()
         mean_spectral_centroid = float(np.mean(spectral_centroids))
         
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+        spectral_rolloff = spectral.spectral_rolloff()
         mean_spectral_rolloff = float(np.mean(spectral_rolloff))
         
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(y)[0]
+        zero_crossing_rate = spectral.zero_crossing_rate()
         mean_zcr = float(np.mean(zero_crossing_rate))
         
-        # Tempo (BPM) - uzun dosyalarda yavaş olabilir, opsiyonel
-        try:
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            tempo = float(tempo) if tempo else 0.0
-        except Exception:
-            tempo = 0.0
+        # Konuşma hızı gelişmiş analizde hece çekirdeklerinden hesaplanır
+        # (advanced_acoustic.syllable_rate); müzikal tempo (beat_track) çıkarılmaz
         
         return {
             "duration": duration,
@@ -79,9 +100,63 @@ class AudioService:
                 "centroid": mean_spectral_centroid,
                 "rolloff": mean_spectral_rolloff,
                 "zero_crossing_rate": mean_zcr
+            }
+        }
+    
+    @staticmethod
+    def _compute_features_streaming(audio: AudioBuffer, pitch_track: Dict) -> Dict:
+        """
+        Uzun kayıtlar için aynı özellikler, sabit boyutlu pencerelerde.
+        Kareler tüm dosyanın STFT ızgarasıyla hizalıdır; ortalama/std akan
+        istatistiklerle tutulduğu için bellek kayıt süresinden bağımsızdır.
+        """
+        energy = RunningStats()
+        mfcc = RunningStats()
+        centroid = RunningStats()
+        rolloff = RunningStats()
+        zcr = RunningStats()
+        
+        for window in spectral_windows(audio):
+            energy.update(window.rms)
+            mfcc.update(window.mfcc(n_mfcc=13).T)
+            centroid.update(window.spectral_centroid())
+            rolloff.update(window.spectral_rolloff())
+            zcr.update(window.zero_crossing_rate())
+        
+        duration = audio.duration
+        print(f"[Audio] Pencereli analiz: {duration:.1f}s, {energy.count} kare", flush=True)
+        mean_pitch, std_pitch = AudioService._pitch_stats(pitch_track)
+        
+        return {
+            "duration": duration,
+            "sample_rate": SPECTRAL_SR,
+            "energy": {
+                "mean": float(energy.mean),
+                "max": float(energy.max)
+            },
+            "pitch": {
+                "mean": mean_pitch,
+                "std": std_pitch
+            },
+            "mfcc": {
+                "mean": [float(x) for x in np.atleast_1d(mfcc.mean)],
+                "std": [float(x) for x in np.atleast_1d(mfcc.std)]
             },
-            "tempo": tempo
+            "spectral": {
+                "centroid": float(centroid.mean),
+                "rolloff": float(rolloff.mean),
+                "zero_crossing_rate": float(zcr.mean)
+            }
         }
+    
+    @staticmethod
+    def _pitch_stats(pitch_track: Dict):
+        """Sesli karelerin F0 ortalaması ve std'si"""
+        f0 = pitch_track["f0"]
+        pitch_values = f0[f0 > 0]
+        mean_pitch = float(np.mean(pitch_values)) if len(pitch_values) > 0 else 0.0
+        std_pitch = float(np.std(pitch_values)) if len(pitch_values) > 0 else 0.0
+        return mean_pitch, std_pitch
 
 
 audio_service = AudioService()
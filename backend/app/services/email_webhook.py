@@ -1,5 +1,6 @@
 import httpx
 from app.core.config import settings
+from app.services.http_clients import http_clients
 
 
 async def send_verification_email(email: str, code: str) -> bool:
@@ -12,23 +13,23 @@ async def send_verification_email(email: str, code: str) -> bool:
         return True
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                settings.email_webhook_url,
-                json={
-                    "to": email,
-                    "email": email,
-                    "code": code
-                }
-            )
+        client = http_clients.get("email_webhook")
+        response = await client.post(
+            settings.email_webhook_url,
+            json={
+                "to": email,
+                "email": email,
+                "code": code
+            }
+        )
+        
+        if response.status_code in [200, 201, 202]:
+            print(f"[EMAIL] Doğrulama kodu gönderildi: {email}")
+            return True
+        else:
+            print(f"[EMAIL] Webhook hatası: {response.status_code} - {response.text}")
+            return False
             
-            if response.status_code in [200, 201, 202]:
-                print(f"[EMAIL] Doğrulama kodu gönderildi: {email}")
-                return True
-            else:
-                print(f"[EMAIL] Webhook hatası: {response.status_code} - {response.text}")
-                return False
-                
     except httpx.TimeoutException:
         print(f"[EMAIL] Webhook timeout: {email}")
         return False
@@ -0,0 +1,163 @@
+"""Ses içeriğine göre adreslenen (content-addressed) özellik önbelleği.
+
+Anahtar: ses dosyasının SHA-256'sı + çıkarıcı (extractor) sürümü. Aynı kayıt
+tekrar yüklendiğinde pyin / Praat / Whisper sonuçları diskten okunur.
+Önbellek boyutu sınırlıdır; sınır aşılınca en uzun süredir kullanılmayan
+(LRU, dosya mtime'ına göre) kayıtlar silinir.
+
+Önbellek process havuzundaki alt process'lerden de kullanıldığı için
+isabet/ıska sayaçları dizindeki `_stats.json` dosyasında tutulur.
+"""
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+STATS_FILE = "_stats.json"
+
+
+class FeatureCache:
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _entry_path(self, kind: str, audio_sha256: str, version: str) -> str:
+        safe_version = "".join(c if c.isalnum() or c in "-_." else "_" for c in version)
+        return os.path.join(self.cache_dir, f"{kind}--{safe_version}--{audio_sha256}.json")
+
+    def contains(self, kind: str, audio_sha256: Optional[str], version: str) -> bool:
+        """Kayıt var mı? (isabet/ıska sayaçlarını etkilemez)"""
+        if not self.enabled or not audio_sha256:
+            return False
+        return os.path.exists(self._entry_path(kind, audio_sha256, version))
+
+    def get(self, kind: str, audio_sha256: Optional[str], version: str) -> Optional[Any]:
+        """Önbellekteki değeri döndür, yoksa None"""
+        if not self.enabled or not audio_sha256:
+            return None
+        path = self._entry_path(kind, audio_sha256, version)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self._count(kind, "misses")
+            return None
+
+        # LRU için son kullanım zamanını güncelle
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self._count(kind, "hits")
+        print(f"[FeatureCache] Isabet: {kind} ({audio_sha256[:12]}...)", flush=True)
+        return value
+
+    def put(self, kind: str, audio_sha256: Optional[str], version: str, value: Any):
+        if not self.enabled or not audio_sha256:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(kind, audio_sha256, version)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[FeatureCache] Yazilamadi ({kind}): {e}", flush=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json") or name == STATS_FILE:
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Toplam boyut sınırı aşıldıysa en eski kullanılan kayıtları sil"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                continue
+        self._count("_all", "evictions", evicted)
+
+    def _count(self, kind: str, counter: str, amount: int = 1):
+        if amount <= 0:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, STATS_FILE)
+        try:
+            with open(path, "a+", encoding="utf-8") as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    stats = json.loads(f.read() or "{}")
+                except ValueError:
+                    stats = {}
+                bucket = stats.setdefault(counter, {})
+                bucket[kind] = bucket.get(kind, 0) + amount
+                stats["updated_at"] = time.time()
+                f.seek(0)
+                f.truncate()
+                json.dump(stats, f)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict:
+        """İsabet/ıska sayaçları ve önbellek boyutu"""
+        path = os.path.join(self.cache_dir, STATS_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        entries = self._entries()
+        return {
+            "hits": stats.get("hits", {}),
+            "misses": stats.get("misses", {}),
+            "evictions": stats.get("evictions", {}).get("_all", 0),
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes
+        }
+
+
+feature_cache = FeatureCache(
+    settings.feature_cache_dir,
+    settings.feature_cache_max_mb * 1024 * 1024
+)
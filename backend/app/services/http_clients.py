@@ -0,0 +1,101 @@
+"""Dış servisler için uygulama ömrü boyunca paylaşılan HTTP istemcileri.
+
+Her dış uç nokta (OpenAI, OpenRouter, email webhook) kendi bağlantı havuzuna
+sahip tek bir httpx.AsyncClient kullanır; böylece her çağrıda yeni TCP/TLS
+el sıkışması yapılmaz, bağlantılar keepalive ile yeniden kullanılır ve
+bağlantı sınırları host başına uygulanır. HTTP/2 (HTTP_HTTP2) için `h2`
+paketi gerekir; kurulu değilse HTTP/1.1 ile devam edilir.
+
+İstemciler FastAPI lifespan'inde / worker başlangıcında start() ile açılır,
+kapanışta aclose() ile kapatılır. start() çağrılmadan get() kullanılırsa
+(ör. script) istemci ilk kullanımda oluşturulur.
+"""
+from typing import Dict, Optional
+import httpx
+from app.core.config import settings
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _profiles() -> Dict[str, Dict]:
+    """İstemci adı -> zaman aşımı ve havuz ayarları"""
+    default_limits = {
+        "max_connections": settings.http_max_connections_per_host,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+        "keepalive_expiry": settings.http_keepalive_seconds,
+    }
+    return {
+        "openai": {
+            # Whisper yüklemeleri için daha uzun timeout
+            "timeout": httpx.Timeout(settings.openai_timeout_seconds * 5, connect=10.0),
+            "limits": {
+                "max_connections": settings.openai_max_connections,
+                "max_keepalive_connections": settings.openai_max_keepalive_connections,
+                "keepalive_expiry": settings.openai_keepalive_seconds,
+            },
+        },
+        "openrouter": {
+            "timeout": httpx.Timeout(settings.openrouter_timeout_seconds, connect=10.0),
+            "limits": default_limits,
+        },
+        "email_webhook": {
+            "timeout": httpx.Timeout(30.0, connect=10.0),
+            "limits": default_limits,
+        },
+    }
+
+
+class HttpClientRegistry:
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2: Optional[bool] = None
+
+    @property
+    def http2(self) -> bool:
+        if self._http2 is None:
+            self._http2 = settings.http_http2 and _http2_available()
+            if settings.http_http2 and not self._http2:
+                print("[HttpClients] h2 paketi kurulu degil, HTTP/1.1 kullanilacak", flush=True)
+        return self._http2
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        profiles = _profiles()
+        if name not in profiles:
+            raise ValueError(f"Bilinmeyen HTTP istemcisi: {name} (geçerli: {tuple(profiles)})")
+        profile = profiles[name]
+        return httpx.AsyncClient(
+            timeout=profile["timeout"],
+            limits=httpx.Limits(**profile["limits"]),
+            http2=self.http2
+        )
+
+    def start(self):
+        """Tüm istemcileri aç (lifespan / worker başlangıcı)"""
+        for name in _profiles():
+            self.get(name)
+        print(f"[HttpClients] Baslatildi: {', '.join(self._clients)} (http2={self.http2})", flush=True)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Adlandırılmış paylaşılan istemci (yoksa ya da kapanmışsa oluşturulur)"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            self._clients[name] = client
+        return client
+
+    async def aclose(self):
+        """Tüm bağlantı havuzlarını kapat"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        if clients:
+            print("[HttpClients] Kapatildi", flush=True)
+
+
+http_clients = HttpClientRegistry()
@@ -0,0 +1,182 @@
+"""Postgres tabanlı analiz kuyruğu (SELECT ... FOR UPDATE SKIP LOCKED).
+
+İşi alan worker kira (locked_by / locked_until) tutar ve çalışırken
+heartbeat ile uzatır; yalnızca kirası dolan işler yeniden kuyruğa alınır.
+Tamamlama / başarısızlık kaydı kirayı hâlâ tutan worker'dan gelirse uygulanır.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.analysis_job import AnalysisJob, JobStatus
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    progress_id: str,
+    user_id: int,
+    participant_id: int,
+    audio_path: str,
+    audio_sha256: Optional[str] = None
+) -> AnalysisJob:
+    """Yeni analiz işini kuyruğa ekle"""
+    job = AnalysisJob(
+        progress_id=progress_id,
+        user_id=user_id,
+        participant_id=participant_id,
+        audio_path=audio_path,
+        audio_sha256=audio_sha256,
+        status=JobStatus.QUEUED,
+        attempts=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+class JobLeaseLost(Exception):
+    """İşin kirası başka bir worker'a geçti (ya da iş artık "running" değil)"""
+
+
+def _lease_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.analysis_job_lease_seconds)
+
+
+def _owned(job: AnalysisJob):
+    """İş hâlâ bu worker'ın kirasında ve çalışıyor mu? (UPDATE koşulu)"""
+    return (
+        (AnalysisJob.id == job.id) &
+        (AnalysisJob.status == JobStatus.RUNNING) &
+        (AnalysisJob.locked_by == job.locked_by)
+    )
+
+
+async def claim_next_job(db: AsyncSession) -> Optional[AnalysisJob]:
+    """
+    Sıradaki işi kilitleyip "running" durumuna al ve kirala.
+    SKIP LOCKED sayesinde birden fazla worker aynı işi almaz.
+    """
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(AnalysisJob.status == JobStatus.QUEUED)
+        .order_by(AnalysisJob.created_at, AnalysisJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        await db.rollback()
+        return None
+
+    job.status = JobStatus.RUNNING
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = datetime.now(timezone.utc)
+    job.locked_by = uuid.uuid4().hex
+    job.locked_until = _lease_expiry()
+    job.error = None
+    await db.commit()
+    return job
+
+
+async def renew_lease(db: AsyncSession, job: AnalysisJob) -> bool:
+    """Kirayı uzat (heartbeat); iş artık bu worker'da değilse False"""
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(_owned(job))
+        .values(locked_until=_lease_expiry())
+    )
+    await db.commit()
+    return bool(result.rowcount)
+
+
+async def complete_job(db: AsyncSession, job: AnalysisJob, analysis_id: int) -> bool:
+    """
+    İşi tamamlandı olarak işaretle ve oturumdaki bekleyen değişikliklerle
+    (Analysis kaydı) birlikte commit et. Kira kaybedildiyse hepsi geri alınır
+    ve False döner.
+    """
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(_owned(job))
+        .values(
+            status=JobStatus.COMPLETED,
+            analysis_id=analysis_id,
+            locked_by=None,
+            locked_until=None,
+            finished_at=datetime.now(timezone.utc)
+        )
+    )
+    if not result.rowcount:
+        await db.rollback()
+        return False
+    await db.commit()
+    return True
+
+
+async def fail_job(db: AsyncSession, job: AnalysisJob, error: str) -> bool:
+    """İşi başarısız olarak işaretle; iş artık bu worker'da değilse False"""
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(_owned(job))
+        .values(
+            status=JobStatus.FAILED,
+            error=error,
+            locked_by=None,
+            locked_until=None,
+            finished_at=datetime.now(timezone.utc)
+        )
+    )
+    await db.commit()
+    return bool(result.rowcount)
+
+
+async def requeue_stale_jobs(db: AsyncSession) -> int:
+    """
+    Kirası yenilenmeyen (worker'ı çökmüş) "running" işleri kurtar. Uzun süren
+    ama heartbeat'i gelen işlere dokunulmaz. Deneme hakkı kalan işler tekrar
+    kuyruğa alınır, kalmayanlar başarısız sayılır.
+    """
+    now = datetime.now(timezone.utc)
+    stale_filter = (
+        (AnalysisJob.status == JobStatus.RUNNING) &
+        (AnalysisJob.locked_until.is_(None) | (AnalysisJob.locked_until < now))
+    )
+
+    requeued = await db.execute(
+        update(AnalysisJob)
+        .where(stale_filter, AnalysisJob.attempts < settings.analysis_job_max_attempts)
+        .values(status=JobStatus.QUEUED, started_at=None, locked_by=None, locked_until=None)
+    )
+    await db.execute(
+        update(AnalysisJob)
+        .where(stale_filter, AnalysisJob.attempts >= settings.analysis_job_max_attempts)
+        .values(
+            status=JobStatus.FAILED,
+            error="Worker zaman aşımı",
+            locked_by=None,
+            locked_until=None,
+            finished_at=now
+        )
+    )
+    await db.commit()
+    return requeued.rowcount or 0
+
+
+async def get_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[AnalysisJob]:
+    result = await db.execute(
+        select(AnalysisJob).where(
+            AnalysisJob.id == job_id,
+            AnalysisJob.user_id == user_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_job_by_progress_id(db: AsyncSession, progress_id: str) -> Optional[AnalysisJob]:
+    result = await db.execute(
+        select(AnalysisJob).where(AnalysisJob.progress_id == progress_id)
+    )
+    return result.scalar_one_or_none()
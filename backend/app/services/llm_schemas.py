@@ -0,0 +1,183 @@
+"""Tek çağrılı LLM analizi (LLM_SINGLE_CALL) için yanıt şeması.
+
+Model duygu/içerik analizini ve klinik rapor bölümlerini tek bir JSON
+nesnesinde döndürür; yanıt burada doğrulanır. Doğrulanamayan yanıtta
+pipeline iki çağrılı yola (GPT + OpenRouter) düşer.
+"""
+import json
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel, Field, ValidationError
+
+
+class EmotionAnalysis(BaseModel):
+    tone: str
+    intensity: int = Field(ge=0, le=10)
+    emotions: List[str] = []
+
+
+class ContentAnalysis(BaseModel):
+    word_count: int = Field(ge=0)
+    unique_words: int = Field(ge=0)
+    fluency_score: float = Field(ge=0, le=10)
+    coherence_score: float = Field(ge=0, le=10)
+
+
+class LinguisticIndicators(BaseModel):
+    sentence_complexity: str = "bilinmiyor"
+    repetitions: int = Field(default=0, ge=0)
+    incomplete_sentences: int = Field(default=0, ge=0)
+
+
+class ReportSection(BaseModel):
+    title: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+
+
+class CombinedAnalysis(BaseModel):
+    emotion_analysis: EmotionAnalysis
+    content_analysis: ContentAnalysis
+    linguistic_indicators: LinguisticIndicators = LinguisticIndicators()
+    report_sections: List[ReportSection] = Field(min_length=1)
+
+    def content_emotion(self) -> Dict:
+        """analyze_content_and_emotion ile aynı biçim"""
+        return {
+            "emotion_analysis": self.emotion_analysis.model_dump(),
+            "content_analysis": self.content_analysis.model_dump(),
+            "linguistic_indicators": self.linguistic_indicators.model_dump()
+        }
+
+    def report_text(self) -> str:
+        """Bölümleri generate_clinical_report çıktısı gibi Markdown metne birleştir"""
+        return "\n\n".join(
+            f"## {section.title.strip().lstrip('#').strip()}\n\n{section.content.strip()}"
+            for section in self.report_sections
+        )
+
+
+def parse_combined_analysis(content: str) -> CombinedAnalysis:
+    """Model yanıtını doğrula (```json çitleri varsa atılır); uymazsa ValueError"""
+    text = content.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return CombinedAnalysis.model_validate_json(text)
+    except ValidationError as e:
+        raise ValueError(f"Tek cagri yaniti semaya uymuyor ({e.error_count()} hata): {str(e)[:300]}")
+
+
+class ReportSectionStream:
+    """
+    Akış halinde gelen tek çağrı JSON yanıtından report_sections bölümlerini
+    çıkarıp report_text() ile aynı Markdown biçiminde on_text'e iletir.
+    Yanıt tamamlanmadan ayrıştırılamadığı için karakter bazında küçük bir
+    JSON tarayıcısı kullanılır; sadece report_sections[i].title/content
+    dizgileri çözülür. Başlık kısa olduğu için tamamı gelince, içerik
+    geldikçe yazılır; baştaki/sondaki boşluklar strip() ile aynı sonuç
+    verecek şekilde atlanır ya da bekletilir.
+    """
+
+    def __init__(self, on_text: Callable[[str], None]):
+        self.on_text = on_text
+        # Açık kaplar: {"type": "obj", "key": ..., "expect_key": bool} ya da {"type": "arr"}
+        self._stack: List[Dict] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._field: Optional[str] = None  # akıştaki dizgi: "title", "content" ya da None
+        self._escape: Optional[str] = None
+        self._high_surrogate = ""
+        self._chars: List[str] = []
+        self._sections = 0
+        self._content_started = False
+        self._pending_space = ""
+
+    def feed(self, chunk: str):
+        for char in chunk:
+            if self._in_string:
+                self._string_char(char)
+            elif char == '"':
+                self._start_string()
+            elif char in "{[":
+                self._stack.append({"type": "obj", "key": None, "expect_key": True} if char == "{" else {"type": "arr"})
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif self._stack and self._stack[-1]["type"] == "obj":
+                if char == ":":
+                    self._stack[-1]["expect_key"] = False
+                elif char == ",":
+                    self._stack[-1]["expect_key"] = True
+
+    def _section_field(self) -> Optional[str]:
+        # Kök nesne -> report_sections dizisi -> bölüm nesnesi -> alan
+        if (
+            len(self._stack) == 3
+            and self._stack[0]["type"] == "obj" and self._stack[0]["key"] == "report_sections"
+            and self._stack[1]["type"] == "arr"
+            and self._stack[2]["type"] == "obj" and self._stack[2]["key"] in ("title", "content")
+        ):
+            return self._stack[2]["key"]
+        return None
+
+    def _start_string(self):
+        self._in_string = True
+        top = self._stack[-1] if self._stack else None
+        self._string_is_key = top is not None and top["type"] == "obj" and top["expect_key"]
+        self._field = None if self._string_is_key else self._section_field()
+        self._chars = []
+        self._escape = None
+        self._high_surrogate = ""
+        if self._field == "content":
+            self._content_started = False
+            self._pending_space = ""
+
+    def _string_char(self, char: str):
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[1] == "u" and len(self._escape) < 6:
+                return
+            self._decoded(json.loads(f'"{self._escape}"'))
+            self._escape = None
+        elif char == "\\":
+            self._escape = char
+        elif char == '"':
+            self._end_string()
+        else:
+            self._decoded(char)
+
+    def _decoded(self, text: str):
+        # \ud83d\ude00 gibi kaçışlı vekil çiftlerini birleştir
+        if self._high_surrogate:
+            text = (self._high_surrogate + text).encode("utf-16", "surrogatepass").decode("utf-16")
+            self._high_surrogate = ""
+        elif len(text) == 1 and "\ud800" <= text <= "\udbff":
+            self._high_surrogate = text
+            return
+        if self._string_is_key or self._field == "title":
+            self._chars.append(text)
+        elif self._field == "content":
+            self._content(text)
+
+    def _end_string(self):
+        self._in_string = False
+        if self._string_is_key:
+            self._stack[-1]["key"] = "".join(self._chars)
+        elif self._field == "title":
+            title = "".join(self._chars).strip().lstrip("#").strip()
+            separator = "\n\n" if self._sections else ""
+            self.on_text(f"{separator}## {title}\n\n")
+            self._sections += 1
+        self._field = None
+
+    def _content(self, text: str):
+        if not self._content_started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._content_started = True
+        stripped = text.rstrip()
+        if stripped:
+            self.on_text(self._pending_space + stripped)
+            self._pending_space = ""
+        self._pending_space += text[len(stripped):]
@@ -1,53 +1,147 @@
 import os
 import asyncio
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.core.config import settings
-from typing import Optional
+import time
+from typing import List, Optional
 import httpx
+from app.services.feature_cache import feature_cache
+from app.services.http_clients import http_clients
+from app.services.resilience import resilience
+from app.services.prompt_builder import (
+    ACOUSTIC_FIELDS, compact_json, fit_transcript, pick_fields, log_prompt_tokens, log_token_usage
+)
+from app.services.transcript_chunks import stitch_transcripts
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
 
 
 class OpenAIService:
+    """
+    Native async OpenAI istemcisi. Tüm istekler paylaşılan "openai" httpx
+    bağlantı havuzunu kullanır (bkz. http_clients; thread havuzu kullanılmaz);
+    eşzamanlı istek sayısı uç nokta başına semaphore ile sınırlanır.
+    Yeniden deneme SDK'da kapalıdır; geçici hatalar resilience katmanında
+    ("openai" devre kesicisi) yeniden denenir.
+    """
     def __init__(self):
-        client_kwargs = {
-            "timeout": httpx.Timeout(settings.openai_timeout_seconds * 5, connect=10.0)  # Whisper için daha uzun timeout
-        }
-        if settings.openai_base_url:
-            client_kwargs["base_url"] = settings.openai_base_url
-
-        self.client = OpenAI(
-            api_key=settings.openai_api_key,
-            **client_kwargs,
-        )
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._whisper_semaphore: Optional[asyncio.Semaphore] = None
+        self._chat_semaphore: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Paylaşılan havuz yeniden oluşturulduysa (ör. kapanış sonrası) istemciyi de yenile
+        http_client = http_clients.get("openai")
+        if self._client is None or self._http_client is not http_client:
+            client_kwargs = {}
+            if settings.openai_base_url:
+                client_kwargs["base_url"] = settings.openai_base_url
+            self._client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=http_client,
+                max_retries=0,
+                **client_kwargs,
+            )
+            self._http_client = http_client
+        return self._client
+    
+    # Uç nokta başına eşzamanlı istek sınırları (ilk kullanımda, çalışan event loop içinde oluşturulur)
+    @property
+    def whisper_semaphore(self) -> asyncio.Semaphore:
+        if self._whisper_semaphore is None:
+            self._whisper_semaphore = asyncio.Semaphore(max(1, settings.whisper_max_concurrency))
+        return self._whisper_semaphore
+    
+    @property
+    def chat_semaphore(self) -> asyncio.Semaphore:
+        if self._chat_semaphore is None:
+            self._chat_semaphore = asyncio.Semaphore(max(1, settings.openai_chat_max_concurrency))
+        return self._chat_semaphore
+    
+    # Transkripsiyon önbellek sürümü (model ve dil anahtara ayrıca eklenir)
+    TRANSCRIPT_VERSION = "1"
+    
+    def _transcript_cache_version(self, language: str) -> str:
+        return f"{self.TRANSCRIPT_VERSION}-{settings.openai_whisper_model}-{language}"
+    
+    def is_transcript_cached(self, audio_sha256: Optional[str], language: str = "tr") -> bool:
+        """Transkript önbellekte mi? (Whisper'a gönderilecek ses hazırlanmadan önce)"""
+        return feature_cache.contains("transcript", audio_sha256, self._transcript_cache_version(language))
     
-    async def transcribe_audio(self, audio_path: str, language: str = "tr") -> str:
-        """Whisper API ile ses dosyasını transkribe et"""
-        def _transcribe():
-            print(f"[Whisper] Dosya boyutu: {os.path.getsize(audio_path) / 1024:.1f} KB", flush=True)
-            with open(audio_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
+    async def _transcribe_file(self, audio_path: str, language: str) -> str:
+        # Dosya event loop dışında bir kez okunur; istek async gönderilir
+        content = await asyncio.to_thread(_read_file, audio_path)
+        print(f"[Whisper] Dosya boyutu: {len(content) / 1024:.1f} KB", flush=True)
+        
+        async def _request():
+            # Semaphore deneme başına tutulur; geri çekilme beklemesi slot işgal etmez
+            async with self.whisper_semaphore:
+                return await self.client.audio.transcriptions.create(
                     model=settings.openai_whisper_model,
-                    file=audio_file,
+                    file=(os.path.basename(audio_path), content),
                     language=language,
                     response_format="text"
                 )
-            print(f"[Whisper] Transkripsiyon tamamlandi, uzunluk: {len(transcript)} karakter", flush=True)
-            return transcript
-        return await asyncio.to_thread(_transcribe)
+        
+        transcript = await resilience.call("openai", _request)
+        print(f"[Whisper] Transkripsiyon tamamlandi, uzunluk: {len(transcript)} karakter", flush=True)
+        return transcript
+    
+    async def transcribe_audio(
+        self,
+        audio_path: str,
+        language: str = "tr",
+        audio_sha256: Optional[str] = None,
+        chunk_paths: Optional[List[str]] = None
+    ) -> str:
+        """
+        Whisper API ile ses dosyasını transkribe et. audio_sha256 orijinal
+        yüklemenin özetidir; audio_path kırpılmış kopya olsa da önbellek
+        anahtarı değişmez.
+        chunk_paths: verilirse (bkz. transcript_chunks) parçalar eşzamanlı
+        (WHISPER_MAX_CONCURRENCY) transkribe edilip örtüşmeler ayıklanarak
+        birleştirilir; audio_path gönderilmez.
+        """
+        cache_version = self._transcript_cache_version(language)
+        cached = await asyncio.to_thread(feature_cache.get, "transcript", audio_sha256, cache_version)
+        if cached is not None:
+            return cached
+        
+        if chunk_paths:
+            start = time.time()
+            parts = await asyncio.gather(*(self._transcribe_file(path, language) for path in chunk_paths))
+            transcript = stitch_transcripts(parts)
+            print(
+                f"[Whisper] {len(parts)} parça birleştirildi ({time.time() - start:.1f}s), "
+                f"uzunluk: {len(transcript)} karakter", flush=True
+            )
+        else:
+            transcript = await self._transcribe_file(audio_path, language)
+        await asyncio.to_thread(feature_cache.put, "transcript", audio_sha256, cache_version, transcript)
+        return transcript
     
     async def analyze_content_and_emotion(
         self, 
         transcript: str, 
         acoustic_features: dict
     ) -> dict:
-        """GPT-4 ile içerik ve duygu analizi yap"""
+        """
+        GPT-4 ile içerik ve duygu analizi yap. Yeniden denemeler tükenirse ya
+        da yanıt eksikse hata fırlatılır; varsayılan skorlar sonuç olarak kaydedilmez.
+        """
         prompt = f"""Sen bir nöroloji araştırmacısısın. Aşağıdaki transkript metnini ve ses özelliklerini analiz et.
 
 TRANSCRİPT:
-{transcript}
+{fit_transcript(transcript)}
 
 SES ÖZELLİKLERİ:
-{acoustic_features}
+{compact_json(pick_fields(acoustic_features, ACOUSTIC_FIELDS))}
 
 Lütfen şu analizleri yap:
 
@@ -135,62 +229,39 @@ Lütfen sonuçları JSON formatında döndür:
             
             return normalized
         
-        def _analyze():
-            try:
-                response = self.client.chat.completions.create(
+        system_prompt = "Sen bir nöroloji araştırmacısısın. Analiz sonuçlarını KESINLIKLE belirtilen JSON formatında döndür. Farklı alan isimleri kullanma."
+        log_prompt_tokens("gpt duygu/icerik", system_prompt, prompt)
+        
+        async def _request():
+            async with self.chat_semaphore:
+                return await self.client.chat.completions.create(
                     model=settings.openai_chat_model,
                     messages=[
                         {
                             "role": "system",
-                            "content": "Sen bir nöroloji araştırmacısısın. Analiz sonuçlarını KESINLIKLE belirtilen JSON formatında döndür. Farklı alan isimleri kullanma.",
+                            "content": system_prompt,
                         },
                         {"role": "user", "content": prompt},
                     ],
                     response_format={"type": "json_object"},
                     timeout=settings.openai_timeout_seconds,
                 )
-                result = json.loads(response.choices[0].message.content)
-                print(f"[GPT-4] Analiz sonucu alindi: {list(result.keys())}", flush=True)
-                
-                # content_analysis'i normalize et
-                if "content_analysis" in result:
-                    original_ca = result["content_analysis"]
-                    result["content_analysis"] = _normalize_content_analysis(original_ca)
-                    ca = result["content_analysis"]
-                    print(f"[GPT-4] content_analysis (normalized): word_count={ca.get('word_count')}, unique_words={ca.get('unique_words')}, fluency={ca.get('fluency_score')}, coherence={ca.get('coherence_score')}", flush=True)
-                else:
-                    print(f"[GPT-4] UYARI: content_analysis bulunamadi, varsayilan degerler kullaniliyor", flush=True)
-                    result["content_analysis"] = {
-                        "word_count": 0,
-                        "unique_words": 0,
-                        "fluency_score": 0,
-                        "coherence_score": 0
-                    }
-                
-                return result
-            except Exception as e:
-                print(f"[GPT-4] HATA: {e}", flush=True)
-                # Varsayılan değerler döndür
-                return {
-                    "emotion_analysis": {
-                        "tone": "nötr",
-                        "intensity": 5,
-                        "emotions": []
-                    },
-                    "content_analysis": {
-                        "word_count": 0,
-                        "unique_words": 0,
-                        "fluency_score": 0,
-                        "coherence_score": 0
-                    },
-                    "linguistic_indicators": {
-                        "sentence_complexity": "bilinmiyor",
-                        "repetitions": 0,
-                        "incomplete_sentences": 0
-                    }
-                }
         
-        return await asyncio.to_thread(_analyze)
+        response = await resilience.call("openai", _request)
+        if response.usage is not None:
+            log_token_usage("gpt duygu/icerik", response.usage.model_dump())
+        result = json.loads(response.choices[0].message.content)
+        print(f"[GPT-4] Analiz sonucu alindi: {list(result.keys())}", flush=True)
+        
+        # Eksik yanıt varsayılan değerlerle doldurulmaz; hata stage'i (ve işi) başarısız yapar
+        missing = [key for key in ("emotion_analysis", "content_analysis") if not isinstance(result.get(key), dict)]
+        if missing:
+            raise ValueError(f"GPT yanıtında eksik alan: {', '.join(missing)}")
+        
+        result["content_analysis"] = _normalize_content_analysis(result["content_analysis"])
+        ca = result["content_analysis"]
+        print(f"[GPT-4] content_analysis (normalized): word_count={ca.get('word_count')}, unique_words={ca.get('unique_words')}, fluency={ca.get('fluency_score')}, coherence={ca.get('coherence_score')}", flush=True)
+        return result
 
 
 openai_service = OpenAIService()
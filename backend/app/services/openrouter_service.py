@@ -1,9 +1,40 @@
 import os
 import asyncio
 import json
+import time
 import httpx
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from app.core.config import settings
+from app.services.pause_analysis import describe_longest_pauses
+from app.services.prompt_builder import (
+    ACOUSTIC_FIELDS, ADVANCED_FIELDS, LINGUISTIC_FIELDS, compact_json, fit_transcript, pick_fields,
+    log_prompt_tokens, log_token_usage
+)
+from app.services.http_clients import http_clients
+from app.services.progress_store import ReportStream
+from app.services.llm_schemas import ReportSectionStream, parse_combined_analysis
+from app.services.resilience import RETRYABLE_STATUS, CircuitOpenError, resilience
+
+SYSTEM_PROMPT = "Sen bir nöroloji ve konuşma patolojisi uzmanısın. Ses analizi verilerini inceleyip kapsamlı, bilimsel ve profesyonel klinik raporlar hazırlıyorsun. Raporlarını Türkçe, detaylı ve anlaşılır bir dille yazıyorsun."
+
+# Tek çağrı: rapor (4096) + duygu/içerik JSON alanları
+COMBINED_MAX_TOKENS = 5000
+
+COMBINED_OUTPUT_INSTRUCTIONS = """
+
+## ÇIKTI FORMATI (TEK JSON NESNESİ)
+Duygu ve içerik analizini de transkriptten sen yap. Yanıtın SADECE aşağıdaki
+yapıda tek bir JSON nesnesi olsun, alan isimlerini değiştirme:
+{
+    "emotion_analysis": {"tone": "pozitif/negatif/nötr", "intensity": 5, "emotions": ["mutluluk", "kaygı"]},
+    "content_analysis": {"word_count": 150, "unique_words": 80, "fluency_score": 7, "coherence_score": 6},
+    "linguistic_indicators": {"sentence_complexity": "orta", "repetitions": 2, "incomplete_sentences": 1},
+    "report_sections": [
+        {"title": "1. ÖZET VE GENEL DEĞERLENDİRME", "content": "Markdown metin"}
+    ]
+}
+- intensity, fluency_score, coherence_score 1-10 arasıdır.
+- report_sections yukarıdaki 7 rapor bölümünü sırasıyla içerir; content alanları Markdown olabilir."""
 
 
 class OpenRouterService:
@@ -21,9 +52,14 @@ class OpenRouterService:
         advanced_acoustic: Dict,
         linguistic_analysis: Dict,
         emotion_analysis: Dict,
-        content_analysis: Dict
+        content_analysis: Dict,
+        report_stream: Optional[ReportStream] = None
     ) -> Optional[str]:
-        """OpenRouter ile kapsamlı klinik rapor oluştur"""
+        """
+        OpenRouter ile kapsamlı klinik rapor oluştur.
+        report_stream verilirse (ve OPENROUTER_STREAM açıksa) rapor akış
+        modunda alınır ve parçalar üretildikçe progress kanalına iletilir.
+        """
         
         if not self.api_key:
             print("OpenRouter API anahtari yapilandirilmamis.")
@@ -40,56 +76,202 @@ class OpenRouterService:
             content_analysis=content_analysis
         )
         
+        payload = self._payload(prompt, max_tokens=4096)
+        log_prompt_tokens("openrouter rapor", SYSTEM_PROMPT, prompt)
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://github.com/knowhy-alzheimer-analysis",
-                        "X-Title": "KNOWHY Alzheimer Analysis"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "Sen bir nöroloji ve konuşma patolojisi uzmanısın. Ses analizi verilerini inceleyip kapsamlı, bilimsel ve profesyonel klinik raporlar hazırlıyorsun. Raporlarını Türkçe, detaylı ve anlaşılır bir dille yazıyorsun."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": 4096,
-                        "top_p": 0.95,
-                    }
-                )
+            if report_stream is not None and settings.openrouter_stream:
+                return await resilience.call("openrouter", lambda: self._stream_report(payload, report_stream))
+            
+            result = await resilience.call("openrouter", lambda: self._post_chat(payload))
+            log_token_usage("openrouter rapor", result.get("usage"))
+            if "choices" in result and len(result["choices"]) > 0:
+                return result["choices"][0]["message"]["content"]
+            else:
+                print(f"OpenRouter yanit formati beklenmedik: {result}")
+                return None
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    if "choices" in result and len(result["choices"]) > 0:
-                        return result["choices"][0]["message"]["content"]
-                    else:
-                        print(f"OpenRouter yanit formati beklenmedik: {result}")
-                        return None
-                else:
-                    error_msg = f"HTTP {response.status_code}: {response.text}"
-                    print(f"OpenRouter API hatasi: {error_msg}")
-                    if response.status_code == 429:
-                        raise Exception("OpenRouter API kotasi asildi. Lutfen daha sonra tekrar deneyin.")
-                    raise Exception(f"OpenRouter API hatasi: {error_msg}")
-                    
         except httpx.TimeoutException:
             raise Exception("OpenRouter API yanit vermedi. Zaman asimi olustu.")
+        except CircuitOpenError as e:
+            raise Exception(f"OpenRouter gecici olarak devre disi: {e}")
         except Exception as e:
             error_msg = str(e)
             if "quota" in error_msg.lower() or "429" in error_msg:
                 raise Exception("OpenRouter API kotasi asildi. Lutfen daha sonra tekrar deneyin veya API planinizi kontrol edin.")
             raise Exception(f"OpenRouter raporu olusturulamadi: {error_msg}")
     
+    async def generate_combined_analysis(
+        self,
+        participant_info: Dict,
+        transcript: str,
+        acoustic_features: Dict,
+        advanced_acoustic: Dict,
+        linguistic_analysis: Dict,
+        report_stream: Optional[ReportStream] = None
+    ) -> Dict:
+        """
+        Duygu/içerik analizi ve klinik raporu tek yapılandırılmış çağrıda
+        üret (LLM_SINGLE_CALL). Transkript ve özellikler bir kez gönderilir.
+        Yanıt şemaya uymazsa hata fırlatılır; pipeline iki çağrılı yola düşer.
+        report_stream verilirse (ve OPENROUTER_STREAM açıksa) yanıt akış
+        modunda alınır; rapor bölümleri geldikçe progress kanalına iletilir.
+        
+        Returns: {"content_emotion": {...}, "clinical_report": str}
+        """
+        if not self.api_key:
+            raise ValueError("OpenRouter API anahtari yapilandirilmamis")
+        
+        prompt = self._build_comprehensive_prompt(
+            participant_info=participant_info,
+            transcript=transcript,
+            acoustic_features=acoustic_features,
+            advanced_acoustic=advanced_acoustic,
+            linguistic_analysis=linguistic_analysis,
+            emotion_analysis=None,
+            content_analysis=None
+        ) + COMBINED_OUTPUT_INSTRUCTIONS
+        payload = self._payload(prompt, max_tokens=COMBINED_MAX_TOKENS, response_format={"type": "json_object"})
+        log_prompt_tokens("openrouter tek cagri", SYSTEM_PROMPT, prompt)
+        
+        start = time.time()
+        streaming = report_stream is not None and settings.openrouter_stream
+        try:
+            if streaming:
+                content = await resilience.call("openrouter", lambda: self._stream_combined(payload, report_stream))
+            else:
+                result = await resilience.call("openrouter", lambda: self._post_chat(payload))
+                log_token_usage("openrouter tek cagri", result.get("usage"))
+                choices = result.get("choices") or []
+                if not choices:
+                    raise ValueError(f"OpenRouter yanit formati beklenmedik: {str(result)[:300]}")
+                content = choices[0]["message"]["content"]
+            combined = parse_combined_analysis(content or "")
+        except Exception:
+            # Yarım kalan akış metni istemcide kalmasın; iki çağrılı yol baştan yazar
+            if streaming:
+                report_stream.reset()
+            raise
+        if streaming:
+            # Akıştan çıkarılan metin doğrulanmış rapor metniyle eşitlenir
+            report_stream.finish(combined.report_text())
+        print(
+            f"[OpenRouter] Tek cagri analizi tamamlandi ({time.time() - start:.1f}s): "
+            f"{len(combined.report_sections)} rapor bolumu, ton={combined.emotion_analysis.tone}", flush=True
+        )
+        return {"content_emotion": combined.content_emotion(), "clinical_report": combined.report_text()}
+    
+    def _headers(self) -> Dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/knowhy-alzheimer-analysis",
+            "X-Title": "KNOWHY Alzheimer Analysis"
+        }
+    
+    def _payload(self, prompt: str, max_tokens: int, **extra) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+            "top_p": 0.95,
+            **extra
+        }
+    
+    async def _post_chat(self, payload: Dict) -> Dict:
+        """Tek deneme: chat completions isteği; 200 dışı yanıtta hata"""
+        client = http_clients.get("openrouter")
+        response = await client.post(f"{self.base_url}/chat/completions", headers=self._headers(), json=payload)
+        # Geçici durum kodları (429, 5xx) resilience katmanında yeniden denenir
+        if response.status_code in RETRYABLE_STATUS:
+            response.raise_for_status()
+        if response.status_code != 200:
+            error_msg = f"HTTP {response.status_code}: {response.text}"
+            print(f"OpenRouter API hatasi: {error_msg}")
+            raise Exception(f"OpenRouter API hatasi: {error_msg}")
+        return response.json()
+    
+    async def _stream_report(self, payload: Dict, report_stream: ReportStream) -> Optional[str]:
+        """
+        Raporu akış modunda (SSE) al; parçalar geldikçe report_stream ile
+        yayınlanır, tam metin burada birleştirilip döndürülür. Her deneme
+        istemcideki metni sıfırlayarak başlar.
+        """
+        report_stream.reset()
+        report = await self._stream_chat(payload, report_stream.feed, "rapor")
+        report_stream.flush()
+        if not report:
+            print("OpenRouter akisinda icerik yok")
+            return None
+        return report
+    
+    async def _stream_combined(self, payload: Dict, report_stream: ReportStream) -> str:
+        """
+        Tek çağrı yanıtını akış modunda al; JSON içindeki rapor bölümleri
+        geldikçe report_stream ile yayınlanır. Ham JSON metni döndürülür.
+        """
+        report_stream.reset()
+        sections = ReportSectionStream(report_stream.feed)
+        content = await self._stream_chat(payload, sections.feed, "tek cagri")
+        report_stream.flush()
+        return content
+    
+    async def _stream_chat(self, payload: Dict, on_delta: Callable[[str], None], label: str) -> str:
+        """Tek deneme: chat completions isteğini SSE ile al, her içerik parçasını on_delta'ya ver"""
+        client = http_clients.get("openrouter")
+        parts = []
+        start = time.time()
+        first_content = None
+        async with client.stream(
+            "POST", f"{self.base_url}/chat/completions", headers=self._headers(), json={**payload, "stream": True}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                if response.status_code in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                error_msg = f"HTTP {response.status_code}: {response.text}"
+                print(f"OpenRouter API hatasi: {error_msg}")
+                raise Exception(f"OpenRouter API hatasi: {error_msg}")
+            
+            async for line in response.aiter_lines():
+                # ": OPENROUTER PROCESSING" gibi yorum satırları ve boş satırlar atlanır
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    log_token_usage(f"openrouter {label}", chunk["usage"])
+                if "error" in chunk:
+                    error = chunk["error"]
+                    raise Exception(f"OpenRouter akis hatasi: {error.get('message', error) if isinstance(error, dict) else error}")
+                choices = chunk.get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    if first_content is None:
+                        first_content = time.time() - start
+                    parts.append(delta)
+                    on_delta(delta)
+        
+        text = "".join(parts)
+        if text:
+            print(
+                f"[OpenRouter] Akis tamamlandi ({label}): ilk icerik {first_content:.1f}s, "
+                f"toplam {time.time() - start:.1f}s, {len(text)} karakter", flush=True
+            )
+        return text
+    
     def _build_comprehensive_prompt(
         self,
         participant_info: Dict,
@@ -97,55 +279,49 @@ class OpenRouterService:
         acoustic_features: Dict,
         advanced_acoustic: Dict,
         linguistic_analysis: Dict,
-        emotion_analysis: Dict,
-        content_analysis: Dict
+        emotion_analysis: Optional[Dict],
+        content_analysis: Optional[Dict]
     ) -> str:
-        """Kapsamlı prompt oluştur"""
+        """Kapsamlı prompt oluştur (duygu/içerik None: tek çağrı modu)"""
+        
+        # Ham segment listesi yerine en uzun duraklamaların kısa özeti; özellikler
+        # seçilmiş alanlar ve yuvarlanmış sıkı JSON olarak gömülür (bkz. prompt_builder)
+        pause_segments = (advanced_acoustic or {}).get("pause_analysis", {}).get("segments", [])
+        
+        # Tek çağrı modunda duygu/içerik analizi henüz yok; model kendisi yapar
+        self_analysis = "Bu analizi transkriptten sen yap (bkz. ÇIKTI FORMATI)."
+        emotion_text = compact_json(emotion_analysis) if emotion_analysis is not None else self_analysis
+        content_text = compact_json(content_analysis) if content_analysis is not None else self_analysis
         
         return f"""Aşağıdaki ses analizi verilerini inceleyip kapsamlı bir klinik rapor hazırla.
 
-═══════════════════════════════════════════════════════════════
-KATILIMCI BİLGİLERİ
-═══════════════════════════════════════════════════════════════
+## KATILIMCI BİLGİLERİ
 • İsim: {participant_info.get('name', 'N/A')}
 • Yaş: {participant_info.get('age', 'N/A')}
 • Cinsiyet: {participant_info.get('gender', 'N/A')}
 • Grup Tipi: {participant_info.get('group_type', 'N/A').upper()}
 • MMSE Skoru: {participant_info.get('mmse_score', 'N/A')}
 
-═══════════════════════════════════════════════════════════════
-TRANSCRİPT (Konuşmanın Metne Dönüştürülmüş Hali)
-═══════════════════════════════════════════════════════════════
-{transcript}
+## TRANSCRİPT (Konuşmanın Metne Dönüştürülmüş Hali)
+{fit_transcript(transcript)}
 
-═══════════════════════════════════════════════════════════════
-TEMEL AKUSTİK ÖZELLİKLER
-═══════════════════════════════════════════════════════════════
-{json.dumps(acoustic_features, indent=2, ensure_ascii=False)}
+## TEMEL AKUSTİK ÖZELLİKLER
+{compact_json(pick_fields(acoustic_features, ACOUSTIC_FIELDS))}
 
-═══════════════════════════════════════════════════════════════
-GELİŞMİŞ AKUSTİK ÖZELLİKLER
-═══════════════════════════════════════════════════════════════
-{json.dumps(advanced_acoustic, indent=2, ensure_ascii=False)}
+## GELİŞMİŞ AKUSTİK ÖZELLİKLER
+{compact_json(pick_fields(advanced_acoustic, ADVANCED_FIELDS))}
+• En uzun duraklamalar (başlangıç-bitiş): {describe_longest_pauses(pause_segments)}
 
-═══════════════════════════════════════════════════════════════
-DİLBİLİMSEL ANALİZ
-═══════════════════════════════════════════════════════════════
-{json.dumps(linguistic_analysis, indent=2, ensure_ascii=False)}
+## DİLBİLİMSEL ANALİZ
+{compact_json(pick_fields(linguistic_analysis, LINGUISTIC_FIELDS))}
 
-═══════════════════════════════════════════════════════════════
-DUYGU ANALİZİ
-═══════════════════════════════════════════════════════════════
-{json.dumps(emotion_analysis, indent=2, ensure_ascii=False)}
+## DUYGU ANALİZİ
+{emotion_text}
 
-═══════════════════════════════════════════════════════════════
-İÇERİK ANALİZİ
-═══════════════════════════════════════════════════════════════
-{json.dumps(content_analysis, indent=2, ensure_ascii=False)}
+## İÇERİK ANALİZİ
+{content_text}
 
-═══════════════════════════════════════════════════════════════
-RAPOR İÇERİĞİ TALİMATLARI
-═══════════════════════════════════════════════════════════════
+## RAPOR İÇERİĞİ TALİMATLARI
 
 Lütfen aşağıdaki bölümleri içeren profesyonel, bilimsel ve detaylı bir klinik rapor hazırla. Raporu Türkçe yaz ve her metrik için klinik yorum yap.
 
@@ -243,9 +419,7 @@ Lütfen aşağıdaki bölümleri içeren profesyonel, bilimsel ve detaylı bir k
    - Müdahale önerileri (varsa)
    - Ek değerlendirme gereksinimleri
 
-═══════════════════════════════════════════════════════════════
-ÖNEMLİ NOTLAR
-═══════════════════════════════════════════════════════════════
+## ÖNEMLİ NOTLAR
 - Raporu Türkçe, bilimsel ve profesyonel bir dille yaz
 - Her metrik için sayısal değerleri belirt ve yorumla
 - Normal değerlerle karşılaştırma yap
@@ -0,0 +1,101 @@
+"""Enerji (RMS) tabanlı duraklama segmentasyonu.
+
+Eşik altındaki kareler run-length encoding ile tek geçişte segmentlere
+ayrılır. Segment başlangıç/bitiş dizileri özet değerlerle birlikte döner;
+PDF ve LLM prompt'u aynı listeyi yeniden hesaplamadan kullanır.
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Eşik stratejileri
+#   mean_std:    ortalama - k * std (varsayılan, k=0.5)
+#   percentile:  RMS'in verilen yüzdeliği
+#   relative_db: maksimum RMS'e göre dB cinsinden (ör. -35 dB)
+THRESHOLD_STRATEGIES = ("mean_std", "percentile", "relative_db")
+
+
+def rms_threshold(
+    rms: np.ndarray,
+    strategy: str = "mean_std",
+    std_factor: float = 0.5,
+    percentile: float = 25.0,
+    relative_db: float = -35.0
+) -> float:
+    """Duraklama eşiğini seçilen stratejiye göre hesapla"""
+    if len(rms) == 0:
+        return 0.0
+    if strategy == "mean_std":
+        return float(np.mean(rms) - std_factor * np.std(rms))
+    if strategy == "percentile":
+        return float(np.percentile(rms, percentile))
+    if strategy == "relative_db":
+        return float(np.max(rms) * (10.0 ** (relative_db / 20.0)))
+    raise ValueError(f"Bilinmeyen eşik stratejisi: {strategy} (geçerli: {THRESHOLD_STRATEGIES})")
+
+
+def mask_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Boolean maskedeki ardışık True kareleri (run) için başlangıç ve bitiş
+    (hariç) kare indeksleri.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_pauses(
+    rms: np.ndarray,
+    threshold: float,
+    frame_duration: float,
+    duration: float,
+    min_pause: float = 0.1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Eşik altındaki ardışık kareleri (run) duraklama segmentlerine çevir.
+    Kayıt sonuna kadar süren duraklama `duration` ile kapatılır.
+    Sadece `min_pause` saniyeden uzun segmentler döner.
+
+    Returns: (starts, ends) saniye cinsinden
+    """
+    below = np.asarray(rms) < threshold
+    if not below.any():
+        empty = np.zeros(0, dtype=np.float64)
+        return empty, empty
+
+    start_frames, end_frames = mask_runs(below)
+
+    starts = start_frames * frame_duration
+    ends = end_frames * frame_duration
+    # Sona kadar süren duraklama
+    ends[end_frames == len(below)] = duration
+
+    keep = (ends - starts) > min_pause
+    return starts[keep], ends[keep]
+
+
+def summarize_pauses(starts: np.ndarray, ends: np.ndarray, duration: float) -> Dict:
+    """Segmentlerden özet duraklama metrikleri ve segment listesi"""
+    lengths = ends - starts
+    total_pause_time = float(np.sum(lengths)) if len(lengths) else 0.0
+    return {
+        "total_pause_time": total_pause_time,
+        "pause_count": int(len(lengths)),
+        "avg_pause_duration": float(np.mean(lengths)) if len(lengths) else 0.0,
+        "pause_percentage": float((total_pause_time / duration * 100) if duration > 0 else 0.0),
+        "longest_pause": float(np.max(lengths)) if len(lengths) else 0.0,
+        "segments": [[round(float(s), 3), round(float(e), 3)] for s, e in zip(starts, ends)]
+    }
+
+
+def first_frame_above(rms: np.ndarray, threshold: float, frame_duration: float) -> float:
+    """Eşiği geçen ilk karenin zamanı (yoksa 0.0)"""
+    above = np.flatnonzero(np.asarray(rms) > threshold)
+    return float(above[0] * frame_duration) if len(above) else 0.0
+
+
+def describe_longest_pauses(segments: List[List[float]], limit: int = 5) -> str:
+    """En uzun duraklamaları kısa metin olarak özetle (rapor/prompt için)"""
+    if not segments:
+        return "yok"
+    longest = sorted(segments, key=lambda seg: seg[1] - seg[0], reverse=True)[:limit]
+    return ", ".join(f"{s:.1f}-{e:.1f}s ({e - s:.2f}s)" for s, e in longest)
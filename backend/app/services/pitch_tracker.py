@@ -0,0 +1,270 @@
+"""Temel frekans (F0) izi: kayıt başına bir kez çıkarılır, temel ve gelişmiş
+akustik özellikler aynı izi kullanır.
+
+Motorlar (PITCH_ENGINE):
+  praat: parselmouth autocorrelation (varsayılan). Konuşma için standart yöntem,
+         jitter hesabıyla aynı iz; pyin'e göre çok daha hızlı.
+  yin:   librosa.yin. Hızlı, ancak sesli/sessiz kararı vermez; sessiz kareler
+         enerji eşiğiyle ayıklanır.
+  pyin:  librosa.pyin. Olasılıksal + Viterbi; en yavaş motor.
+
+F0 aralığı konuşmaya uygun olarak PITCH_FLOOR..PITCH_CEILING (varsayılan 75-500 Hz).
+Uzun kayıtlarda iz pencere pencere çıkarılır (bkz. streaming_features);
+PITCH_PARALLEL_CHUNKS > 1 ise kayıt sessiz noktalardan parçalara bölünüp
+process havuzunda paralel takip edilir ve izler birleştirilir.
+"""
+import asyncio
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer
+from app.services.feature_cache import feature_cache
+from app.services.track_store import track_store
+from app.services.pause_analysis import rms_threshold
+from app.services.process_pool import process_pool
+from app.services.audio_normalizer import audio_normalizer
+from app.services.spectral_frontend import HOP_LENGTH, SPECTRAL_SR
+from app.services.streaming_features import (
+    should_stream, native_windows, spectral_windows, spectral_window, spectral_frame_count,
+    audio_window, AudioWindow
+)
+
+PITCH_ENGINES = ("praat", "yin", "pyin")
+
+# Çıktıyı değiştiren her değişiklikte artırılmalı (önbellek anahtarı)
+PITCH_VERSION = "3"
+
+# Paralel takip: parça başına en az bu kadar ses, parçalar arası örtüşme
+# (Praat yol bulucusu ve yeniden örnekleme için bağlam) ve sınır arama yarıçapı
+MIN_CHUNK_SECONDS = 30.0
+CHUNK_OVERLAP_SECONDS = 1.0
+SPLIT_SEARCH_SECONDS = 2.0
+
+
+def _praat_pitch(windows, floor: float, ceiling: float):
+    times, f0 = [], []
+    for window in windows:
+        pitch = window.to_sound().to_pitch(pitch_floor=floor, pitch_ceiling=ceiling)
+        window_times = np.asarray(pitch.ts(), dtype=np.float64) + window.offset
+        keep = window.owns(window_times)
+        times.append(window_times[keep])
+        f0.append(np.asarray(pitch.selected_array["frequency"], dtype=np.float64)[keep])
+    return np.concatenate(times), np.concatenate(f0)
+
+
+def _librosa_pitch(fronts, engine: str, floor: float, ceiling: float):
+    """
+    Hizalı spektral pencerelerden F0. yin için sesli/sessiz kararı henüz
+    uygulanmaz; RMS de döner ki eşik tüm kayıt üzerinden hesaplansın (_gate_yin).
+    """
+    import librosa
+
+    f0_parts, rms_parts = [], []
+    for spectral in fronts:
+        y, sr = spectral.y, spectral.sr
+        if engine == "pyin":
+            f0, voiced_flag, _ = librosa.pyin(
+                y, fmin=floor, fmax=ceiling, sr=sr, center=spectral.center,
+                frame_length=spectral.n_fft, hop_length=spectral.hop_length
+            )
+            f0 = np.where(voiced_flag, f0, 0.0)
+        else:
+            f0 = librosa.yin(
+                y, fmin=floor, fmax=ceiling, sr=sr, center=spectral.center,
+                frame_length=spectral.n_fft, hop_length=spectral.hop_length
+            )
+            rms_parts.append(spectral.rms[:len(f0)])
+        f0_parts.append(np.nan_to_num(np.asarray(f0, dtype=np.float64), nan=0.0))
+
+    rms = np.concatenate(rms_parts) if rms_parts else None
+    return np.concatenate(f0_parts), rms
+
+
+def _gate_yin(f0: np.ndarray, rms: Optional[np.ndarray]) -> np.ndarray:
+    """yin her kare için F0 verir; duraklama eşiğinin altındaki kareler sessiz sayılır"""
+    if rms is None:
+        return f0
+    # Tamamen sessiz kayıtta eşik 0 olur; sıfır enerjili kareler her durumda sessizdir
+    return np.where((rms >= rms_threshold(rms)) & (rms > 0), f0, 0.0)
+
+
+def _frame_times(frame_count: int) -> np.ndarray:
+    """librosa motorlarının (global STFT ızgarası) kare zamanları"""
+    return np.arange(frame_count) * (HOP_LENGTH / float(SPECTRAL_SR))
+
+
+def cache_version(engine: str) -> str:
+    """Pitch izi önbellek / iz deposu sürümü: çıkarıcı sürümü + motor + ayarlar"""
+    return (
+        f"{PITCH_VERSION}-{engine}-{settings.pitch_floor:g}-{settings.pitch_ceiling:g}"
+        f"-{audio_normalizer.cache_tag()}"
+    )
+
+
+def _resolve_engine(engine: Optional[str]) -> str:
+    engine = engine or settings.pitch_engine
+    if engine not in PITCH_ENGINES:
+        raise ValueError(f"Bilinmeyen pitch motoru: {engine} (geçerli: {PITCH_ENGINES})")
+    return engine
+
+
+def _load_cached(audio_sha256: Optional[str], engine: str) -> Optional[Dict]:
+    version = cache_version(engine)
+    cached = feature_cache.get("pitch_track", audio_sha256, version)
+    if cached is None:
+        return None
+    times = np.asarray(cached["times"], dtype=np.float64)
+    f0 = np.asarray(cached["f0"], dtype=np.float64)
+    if not track_store.has(audio_sha256, version, "pitch"):
+        track_store.save(audio_sha256, version, "pitch", times, f0)
+    return {"engine": cached["engine"], "times": times, "f0": f0}
+
+
+def _store(audio_sha256: Optional[str], engine: str, times: np.ndarray, f0: np.ndarray) -> Dict:
+    print(f"[Pitch] {engine}: {len(f0)} kare, {int(np.count_nonzero(f0))} sesli", flush=True)
+    version = cache_version(engine)
+    feature_cache.put("pitch_track", audio_sha256, version, {
+        "engine": engine,
+        "times": times.tolist(),
+        "f0": f0.tolist()
+    })
+    track_store.save(audio_sha256, version, "pitch", times, f0)
+    return {"engine": engine, "times": times, "f0": f0}
+
+
+def empty_track(audio: AudioBuffer, engine: str) -> Dict:
+    """Motor hata verdiğinde kullanılan iz: motorun kare ızgarasında tüm kareler sessiz (0 Hz)"""
+    if engine == "praat":
+        # Praat'ın varsayılan zaman adımı: 0.75 / taban frekans
+        times = np.arange(0.0, audio.duration, 0.75 / settings.pitch_floor)
+    else:
+        times = _frame_times(spectral_frame_count(audio))
+    return {"engine": engine, "times": times, "f0": np.zeros(len(times))}
+
+
+def track_pitch(audio: AudioBuffer, audio_sha256: Optional[str] = None, engine: Optional[str] = None) -> Dict:
+    """
+    F0 izini çıkar. Sessiz kareler 0 Hz'dir. Motor hata verirse (ör. çok kısa
+    kayıt) hata loglanır ve boş iz döner; boş iz önbelleğe yazılmaz.
+
+    Returns: {"engine", "times": (N,), "f0": (N,)}
+    """
+    engine = _resolve_engine(engine)
+    cached = _load_cached(audio_sha256, engine)
+    if cached is not None:
+        return cached
+
+    try:
+        times, f0 = _compute_pitch(audio, engine)
+    except Exception as e:
+        print(f"[Pitch] {engine} hatası, boş iz kullanılacak: {e}", flush=True)
+        return empty_track(audio, engine)
+    return _store(audio_sha256, engine, times, f0)
+
+
+def _compute_pitch(audio: AudioBuffer, engine: str):
+    """Returns: (times, f0); motor hataları track_pitch'te yakalanır"""
+    floor, ceiling = settings.pitch_floor, settings.pitch_ceiling
+    streaming = should_stream(audio)
+    if engine == "praat":
+        windows = native_windows(audio) if streaming else [
+            AudioWindow(0.0, float("inf"), 0.0, audio.samples, audio.sample_rate)
+        ]
+        times, f0 = _praat_pitch(windows, floor, ceiling)
+    else:
+        fronts = spectral_windows(audio) if streaming else [audio.spectral()]
+        f0, rms = _librosa_pitch(fronts, engine, floor, ceiling)
+        f0 = _gate_yin(f0, rms)
+        times = _frame_times(len(f0))
+    return times, f0
+
+
+# ----- Paralel (parçalı) pitch takibi -----
+
+def plan_pitch_chunks(audio: AudioBuffer, chunk_count: int, search_seconds: float = SPLIT_SEARCH_SECONDS) -> List[int]:
+    """
+    Sinyali chunk_count parçaya bölen sınır örnekleri (0 ve len dahil).
+    Her sınır, eşit bölme noktasının ±search_seconds çevresindeki en düşük
+    enerjili 20 ms'lik kareye kaydırılır; sadece bu çevreler okunur.
+    """
+    sr = audio.sample_rate
+    n = len(audio.samples)
+    frame = max(1, int(0.02 * sr))
+    radius = int(search_seconds * sr)
+    bounds = [0]
+    for k in range(1, chunk_count):
+        target = k * n // chunk_count
+        a = max(target - radius, bounds[-1] + frame)
+        b = min(target + radius, n - frame)
+        if b - a < frame:
+            continue
+        region = np.asarray(audio.samples[a:b], dtype=np.float32)
+        usable = (len(region) // frame) * frame
+        energy = np.mean(region[:usable].reshape(-1, frame) ** 2, axis=1)
+        bounds.append(a + int(np.argmin(energy)) * frame + frame // 2)
+    bounds.append(n)
+    return bounds
+
+
+def track_pitch_chunk(audio: AudioBuffer, start: int, end: int, engine: str, floor: float, ceiling: float):
+    """
+    Tek parçanın F0 izi (process havuzunda çalışır). Parça bağlam payıyla
+    analiz edilir, sadece kendi aralığındaki kareler döner.
+
+    Returns: (times, f0, rms) - librosa motorlarında times None, yin dışında rms None
+    """
+    if engine == "praat":
+        times, f0 = _praat_pitch([audio_window(audio, start, end, CHUNK_OVERLAP_SECONDS)], floor, ceiling)
+        return times, f0, None
+
+    # librosa motorları: parça sınırları global STFT karelerine yuvarlanır
+    total_frames = spectral_frame_count(audio)
+    j0 = 0 if start == 0 else int(round(start * SPECTRAL_SR / audio.sample_rate / HOP_LENGTH))
+    j1 = total_frames if end >= len(audio.samples) else int(round(end * SPECTRAL_SR / audio.sample_rate / HOP_LENGTH))
+    front = spectral_window(audio, j0, j1, context_seconds=CHUNK_OVERLAP_SECONDS)
+    f0, rms = _librosa_pitch([front], engine, floor, ceiling)
+    return None, f0, rms
+
+
+def parallel_chunk_count(audio: AudioBuffer) -> int:
+    """Paralel pitch için parça sayısı (1 = tek geçiş)"""
+    if settings.pitch_parallel_chunks <= 1:
+        return 1
+    return max(1, min(settings.pitch_parallel_chunks, int(audio.duration // MIN_CHUNK_SECONDS)))
+
+
+async def track_pitch_parallel(audio: AudioBuffer, audio_sha256: Optional[str] = None, engine: Optional[str] = None) -> Dict:
+    """
+    F0 izini sessiz noktalardan bölünmüş parçalar halinde process havuzunda
+    paralel çıkar ve birleştir. Parça sayısı PITCH_PARALLEL_CHUNKS ile
+    belirlenir; kısa kayıtlar tek geçişte (track_pitch) işlenir.
+    """
+    engine = _resolve_engine(engine)
+    chunk_count = parallel_chunk_count(audio)
+    if chunk_count <= 1:
+        return await process_pool.run(track_pitch, audio, audio_sha256, engine)
+
+    cached = _load_cached(audio_sha256, engine)
+    if cached is not None:
+        return cached
+
+    bounds = plan_pitch_chunks(audio, chunk_count)
+    floor, ceiling = settings.pitch_floor, settings.pitch_ceiling
+    try:
+        parts = await asyncio.gather(*(
+            process_pool.run(track_pitch_chunk, audio, start, end, engine, floor, ceiling)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ))
+    except Exception as e:
+        print(f"[Pitch] {engine} paralel takip hatası, boş iz kullanılacak: {e}", flush=True)
+        return empty_track(audio, engine)
+    print(f"[Pitch] {len(parts)} parça paralel işlendi", flush=True)
+
+    f0 = np.concatenate([part[1] for part in parts])
+    if engine == "praat":
+        times = np.concatenate([part[0] for part in parts])
+    else:
+        rms = None if parts[0][2] is None else np.concatenate([part[2] for part in parts])
+        f0 = _gate_yin(f0, rms)
+        times = _frame_times(len(f0))
+    return await asyncio.to_thread(_store, audio_sha256, engine, times, f0)
@@ -0,0 +1,71 @@
+"""Praat izlerini (pitch, intensity, formant...) toplu çıkarma ve ortak bir zaman eksenine hizalama"""
+from typing import Dict
+import numpy as np
+
+
+def nearest_indices(source_times: np.ndarray, target_times: np.ndarray) -> np.ndarray:
+    """
+    Her hedef zaman için en yakın kaynak zamanın indeksi (kaynak sıralı olmalı).
+    searchsorted ile O((N+M) log N); eşitlikte önceki indeks seçilir
+    (np.argmin(np.abs(source_times - t)) ile aynı sonuç).
+    """
+    source_times = np.asarray(source_times, dtype=np.float64)
+    target_times = np.asarray(target_times, dtype=np.float64)
+    if len(source_times) == 0:
+        raise ValueError("Kaynak iz boş")
+    if len(source_times) == 1:
+        return np.zeros(len(target_times), dtype=np.intp)
+
+    idx = np.searchsorted(source_times, target_times)
+    idx = np.clip(idx, 1, len(source_times) - 1)
+    left = source_times[idx - 1]
+    right = source_times[idx]
+    idx = idx - ((target_times - left) <= (right - target_times))
+    return idx
+
+
+def align_track(
+    source_times: np.ndarray,
+    source_values: np.ndarray,
+    target_times: np.ndarray,
+    method: str = "nearest"
+) -> np.ndarray:
+    """
+    Bir izi hedef zamanlara taşı.
+    method: "nearest" (en yakın kare) veya "linear" (np.interp, kenarlarda sabit)
+    """
+    source_values = np.asarray(source_values)
+    if method == "nearest":
+        return source_values[nearest_indices(source_times, target_times)]
+    if method == "linear":
+        return np.interp(target_times, source_times, source_values)
+    raise ValueError(f"Bilinmeyen hizalama yöntemi: {method}")
+
+
+def extract_formant_tracks(sound, time_step: float = 0.01, max_formant_count: int = 4) -> Dict[str, np.ndarray]:
+    """
+    F1..Fn izlerini tek seferde numpy dizisi olarak çıkar.
+    Kare başına get_value_at_time yerine Praat'ın "To Matrix" komutu kullanılır
+    (formant başına tek çağrı). Tanımsız kareler NaN olur.
+
+    Returns: {"times": (N,), "values": (max_formant_count, N)}
+    """
+    from parselmouth.praat import call
+
+    formant = sound.to_formant_burg(time_step=time_step)
+    times = np.asarray(formant.ts(), dtype=np.float64)
+    values = np.full((max_formant_count, len(times)), np.nan)
+    for k in range(1, max_formant_count + 1):
+        row = np.asarray(call(formant, "To Matrix", k).values, dtype=np.float64).ravel()
+        n = min(len(row), len(times))
+        values[k - 1, :n] = row[:n]
+    values[~(values > 0)] = np.nan
+    return {"times": times, "values": values}
+
+
+def masked_track_means(values: np.ndarray) -> np.ndarray:
+    """Her iz (satır) için tanımlı (> 0) değerlerin ortalaması; hiç yoksa 0.0"""
+    valid = values > 0
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, values, 0.0).sum(axis=1)
+    return np.divide(sums, counts, out=np.zeros(len(values)), where=counts > 0)
@@ -0,0 +1,81 @@
+"""CPU yoğun işler (DSP, dilbilimsel analiz, PDF) için yönetilen process havuzu.
+
+pyin, Praat ve reportlab çağrıları event loop'u bloklamasın diye ayrı
+process'lerde çalıştırılır. Havuz uygulama lifespan'inde (API) veya worker
+başlangıcında açılır ve kapanışta kapatılır.
+"""
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+
+class ProcessPoolService:
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.RLock()
+        self._workers: Optional[int] = None
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self, max_workers: Optional[int] = None):
+        with self._lock:
+            if self._executor is not None:
+                return
+            workers = max(1, max_workers or settings.cpu_pool_size)
+            # fork, çalışan event loop ve thread'lerle güvenli değil; spawn kullan
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            self._workers = workers
+        print(f"[ProcessPool] Baslatildi, {workers} process", flush=True)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=wait, cancel_futures=True)
+        print("[ProcessPool] Kapatildi", flush=True)
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """
+        Bozulan havuzu yenile. Aynı bozulmayı gören diğer çağıranlar, havuz
+        zaten yenilendiyse (self._executor artık broken değilse) yeni havuza
+        dokunmaz.
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+            print("[ProcessPool] Havuz bozuldu, yeniden baslatiliyor", flush=True)
+            self._executor = None
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.start(self._workers)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Fonksiyonu havuzda çalıştır. Fonksiyon ve argümanlar pickle edilebilir olmalı.
+        Havuz başlatılmamışsa (ör. script kullanımı) thread'e düşer.
+        """
+        call = functools.partial(fn, *args, **kwargs)
+        executor = self._executor
+        if executor is None:
+            return await asyncio.to_thread(call)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, call)
+        except BrokenProcessPool:
+            # Bir alt process öldü (ör. OOM); havuzu yenile ki sonraki işler çalışsın
+            self._restart(executor)
+            raise
+
+
+process_pool = ProcessPoolService()
@@ -0,0 +1,98 @@
+"""Progress güncellemelerini Postgres LISTEN/NOTIFY ile process'ler arasında taşır.
+
+Worker `set_progress` çağırdığında güncelleme NOTIFY ile yayınlanır; API
+process'leri kanalı dinleyip kendi in-memory store'larına uygular, böylece
+SSE endpoint'i hangi uvicorn worker'ına düşerse düşsün güncel durumu görür.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Dict, Optional
+from sqlalchemy import text
+from app.core.database import engine
+from app.services import progress_store
+
+CHANNEL = "analysis_progress"
+
+
+class ProgressRelay:
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._queue: Optional[asyncio.Queue] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._listen_conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, listen: bool = True):
+        """Yayıncıyı başlat, istenirse kanalı dinlemeye başla"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._publisher_task = asyncio.create_task(self._publish_loop())
+        progress_store.set_relay(self.publish)
+
+        if listen:
+            self._listen_conn = await engine.connect()
+            raw = await self._listen_conn.get_raw_connection()
+            await raw.driver_connection.add_listener(CHANNEL, self._on_notify)
+        print(f"[ProgressRelay] Baslatildi (origin={self.origin}, listen={listen})", flush=True)
+
+    async def stop(self):
+        progress_store.set_relay(None)
+        if self._publisher_task:
+            # Bekleyen bildirimleri gönder
+            await self._queue.join()
+            self._publisher_task.cancel()
+            self._publisher_task = None
+        if self._listen_conn is not None:
+            try:
+                raw = await self._listen_conn.get_raw_connection()
+                await raw.driver_connection.remove_listener(CHANNEL, self._on_notify)
+            except Exception:
+                pass
+            await self._listen_conn.close()
+            self._listen_conn = None
+
+    def publish(self, progress_id: str, data: Dict, event: Optional[str] = None):
+        """set_progress / publish_report_delta tarafından (senkron) çağrılır; NOTIFY arka planda gönderilir"""
+        if self._queue is not None:
+            self._queue.put_nowait((progress_id, data, event))
+
+    async def _publish_loop(self):
+        while True:
+            progress_id, data, event = await self._queue.get()
+            try:
+                payload = json.dumps(
+                    {"origin": self.origin, "progress_id": progress_id, "data": data, "event": event},
+                    ensure_ascii=False
+                )
+                async with engine.begin() as conn:
+                    await conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": CHANNEL, "payload": payload}
+                    )
+            except Exception as e:
+                print(f"[ProgressRelay] NOTIFY hatasi: {e}", flush=True)
+            finally:
+                self._queue.task_done()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return
+
+        progress_id = message["progress_id"]
+        data = message["data"]
+        if message.get("event") == progress_store.REPORT_DELTA_EVENT:
+            progress_store.apply_report_delta(progress_id, data)
+            return
+        progress_store.apply_progress(progress_id, data)
+
+        if data.get("status") in ["completed", "error"] and self._loop is not None:
+            self._loop.call_later(progress_store.CLEAR_DELAY_SECONDS, progress_store.clear_progress, progress_id)
+
+
+progress_relay = ProgressRelay()
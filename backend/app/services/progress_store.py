@@ -1,10 +1,27 @@
 """In-memory progress store for analysis tracking"""
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import asyncio
+import os
+import time
 
 # Global progress store
 _progress_store: Dict[str, Dict] = {}
 _subscribers: Dict[str, list] = {}
+# progress_id -> {stage adı: (adım, durum)}; bir adımı birden fazla stage oluşturabilir
+_stage_states: Dict[str, Dict[str, Tuple[int, str]]] = {}
+# Akış halinde gelen klinik raporun şimdiye kadarki metni (yeniden bağlanan istemciler için)
+_report_text: Dict[str, str] = {}
+
+# Diğer process'lere (API <-> worker) iletim için opsiyonel relay: (progress_id, data, event)
+_relay: Optional[Callable[[str, Dict, Optional[str]], None]] = None
+
+# Klinik rapor parçaları için SSE olay tipi. data: {"offset": int, "delta": str};
+# offset 0 metni sıfırlar (yeni deneme ya da yeniden bağlanmada tam metin)
+REPORT_DELTA_EVENT = "report_delta"
+# Relay (NOTIFY) yükü 8000 baytla sınırlı; bundan uzun birikim beklemeden gönderilir
+REPORT_DELTA_MAX_CHARS = 1000
+# Biten (completed / error) kaydın istemcilerin son durumu okuyabilmesi için tutulduğu süre
+CLEAR_DELAY_SECONDS = 30
 
 ANALYSIS_STEPS = [
     {"step": 1, "title": "Dosya Yükleme", "description": "Ses dosyası yükleniyor..."},
@@ -19,27 +36,179 @@ ANALYSIS_STEPS = [
 ]
 
 
-def set_progress(progress_id: str, step: int, message: str = "", status: str = "running"):
+def set_relay(relay: Optional[Callable[[str, Dict, Optional[str]], None]]):
+    """Progress güncellemelerini diğer process'lere iletecek fonksiyonu ayarla"""
+    global _relay
+    _relay = relay
+
+
+def set_progress(progress_id: str, step: int, message: str = "", status: str = "running", **extra):
     """Update progress for an analysis"""
     progress_data = {
         "current_step": step,
         "total_steps": len(ANALYSIS_STEPS),
         "message": message,
-        "status": status,  # running, completed, error
-        "steps": ANALYSIS_STEPS
+        "status": status,  # queued, running, completed, error
+        "steps": ANALYSIS_STEPS,
+        **extra
     }
-    _progress_store[progress_id] = progress_data
     print(f"[Progress] ID={progress_id[:8]}... Step={step} Message={message}", flush=True)
-    
-    # Notify subscribers
+    apply_progress(progress_id, progress_data)
+    _publish(progress_id, progress_data)
+
+
+def _publish(progress_id: str, data: Dict, event: Optional[str] = None):
+    if _relay is not None:
+        try:
+            _relay(progress_id, data, event)
+        except Exception as e:
+            print(f"[Progress] Relay hatasi: {e}", flush=True)
+
+
+def _notify(progress_id: str, event: Optional[str], data: Dict):
+    # Abone kuyruklarına (olay tipi, veri) çifti konur; None: progress güncellemesi
     if progress_id in _subscribers:
         for queue in _subscribers[progress_id]:
             try:
-                queue.put_nowait(progress_data.copy())
+                queue.put_nowait((event, data.copy()))
             except:
                 pass
 
 
+def apply_progress(progress_id: str, progress_data: Dict):
+    """Progress verisini yerel store'a yaz ve aboneleri bilgilendir"""
+    _progress_store[progress_id] = progress_data
+    _notify(progress_id, None, progress_data)
+
+
+def publish_report_delta(progress_id: str, delta: str, offset: int):
+    """Klinik rapor parçasını yerel abonelere ve relay'e gönder"""
+    data = {"offset": offset, "delta": delta}
+    apply_report_delta(progress_id, data)
+    _publish(progress_id, data, REPORT_DELTA_EVENT)
+
+
+def apply_report_delta(progress_id: str, data: Dict):
+    """Rapor parçasını biriken metne ekle ve aboneleri bilgilendir"""
+    offset = data["offset"]
+    _report_text[progress_id] = _report_text.get(progress_id, "")[:offset] + data["delta"]
+    _notify(progress_id, REPORT_DELTA_EVENT, data)
+
+
+def get_report_text(progress_id: str) -> Optional[str]:
+    """Akış halindeki raporun şimdiye kadarki metni"""
+    return _report_text.get(progress_id)
+
+
+class ReportStream:
+    """
+    Akış halinde gelen rapor parçalarını biriktirip en fazla flush_seconds'ta
+    bir yayınlar; her token için ayrı NOTIFY / SSE mesajı gönderilmez.
+    """
+    def __init__(self, progress_id: str, flush_seconds: float):
+        self.progress_id = progress_id
+        self.flush_seconds = flush_seconds
+        self.offset = 0
+        self._sent = ""
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        # İlk parça beklemeden gönderilir (ilk içeriğe kadar geçen süre)
+        self._last_flush = 0.0
+
+    def reset(self):
+        """Yeni deneme başlıyor: istemcideki metni sıfırla"""
+        self.offset = 0
+        self._sent = ""
+        self._pending = []
+        self._pending_chars = 0
+        self._last_flush = 0.0
+        publish_report_delta(self.progress_id, "", 0)
+
+    def feed(self, delta: str):
+        self._pending.append(delta)
+        self._pending_chars += len(delta)
+        if (
+            self._pending_chars >= REPORT_DELTA_MAX_CHARS
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+        publish_report_delta(self.progress_id, text, self.offset)
+        self._sent += text
+        self.offset += len(text)
+
+    def finish(self, text: str):
+        """
+        Akış bitti; yayınlanan metin son metinden farklıysa (ör. tek çağrı
+        yanıtından çıkarılan metin) ortak önekten sonrası düzeltilir.
+        """
+        self.flush()
+        common = len(os.path.commonprefix([self._sent, text]))
+        if common < len(self._sent) or common < len(text):
+            publish_report_delta(self.progress_id, text[common:], common)
+        self._sent = text
+        self.offset = len(text)
+
+
+def register_stages(progress_id: str, stage_steps: Dict[str, int]):
+    """
+    Adımları oluşturan stage'leri baştan kaydet; böylece bir adım, ona bağlı
+    tüm stage'ler bitmeden "completed" görünmez.
+    """
+    states = _stage_states.setdefault(progress_id, {})
+    for name, step in stage_steps.items():
+        states.setdefault(name, (step, "pending"))
+
+
+def _aggregate_state(states: List[str]) -> str:
+    """Bir adımın durumu: hata > çalışıyor > hepsi bitti > kısmen bitti (çalışıyor) > bekliyor"""
+    if not states:
+        return "pending"
+    if "error" in states:
+        return "error"
+    if "running" in states:
+        return "running"
+    if all(s == "skipped" for s in states):
+        return "skipped"
+    if all(s in ("completed", "skipped") for s in states):
+        return "completed"
+    if any(s in ("completed", "skipped") for s in states):
+        return "running"
+    return "pending"
+
+
+def step_states(progress_id: str) -> Dict[str, str]:
+    """Stage durumlarından adım bazlı durumlar ({"1": "completed", ...})"""
+    by_step: Dict[str, List[str]] = {str(s["step"]): [] for s in ANALYSIS_STEPS}
+    for step, state in _stage_states.get(progress_id, {}).values():
+        by_step.setdefault(str(step), []).append(state)
+    return {step: _aggregate_state(states) for step, states in by_step.items()}
+
+
+def set_stage_state(progress_id: str, step: int, state: str, message: str = "", stage: Optional[str] = None):
+    """
+    Paralel çalışan stage'ler için durum güncelle; istemciye adım bazlı
+    toplanmış durumlar gider. stage verilmezse adımın tek stage'i sayılır.
+    state: pending, running, completed, skipped, error
+    """
+    states = _stage_states.setdefault(progress_id, {})
+    states[stage or f"step-{step}"] = (step, state)
+    steps = step_states(progress_id)
+    
+    # current_step: çalışan en erken adım (eski istemciler için)
+    running = [int(k) for k, v in steps.items() if v == "running"]
+    current = min(running) if running else step
+    status = "error" if state == "error" else "running"
+    set_progress(progress_id, current, message, status=status, stage_states=steps)
+
+
 def get_progress(progress_id: str) -> Optional[Dict]:
     """Get current progress for an analysis"""
     return _progress_store.get(progress_id)
@@ -51,10 +220,18 @@ def clear_progress(progress_id: str):
         del _progress_store[progress_id]
     if progress_id in _subscribers:
         del _subscribers[progress_id]
+    _stage_states.pop(progress_id, None)
+    _report_text.pop(progress_id, None)
+
+
+def clear_progress_later(progress_id: str, delay: Optional[float] = None):
+    """Kaydı gecikmeli sil (çalışan event loop içinden çağrılmalı)"""
+    delay = CLEAR_DELAY_SECONDS if delay is None else delay
+    asyncio.get_running_loop().call_later(delay, clear_progress, progress_id)
 
 
 def subscribe(progress_id: str) -> asyncio.Queue:
-    """Subscribe to progress updates"""
+    """Subscribe to progress updates; kuyruk (olay tipi, veri) çiftleri alır"""
     if progress_id not in _subscribers:
         _subscribers[progress_id] = []
     queue = asyncio.Queue()
@@ -0,0 +1,131 @@
+"""LLM istemleri için sıkı (compact), token bütçeli veri blokları.
+
+Özellik sözlükleri istemlere olduğu gibi gömülmez: modelin yorumlayabileceği
+alanlar seçilir (26 MFCC katsayısı, duraklama segmentleri, sample rate gibi
+ham değerler çıkarılır), float'lar PROMPT_FLOAT_DIGITS anlamlı basamağa
+yuvarlanır ve JSON boşluksuz yazılır. Token sayısı yerel olarak karakter
+sayısından tahmin edilir; PROMPT_TRANSCRIPT_TOKEN_BUDGET'ı aşan transkriptin
+başı ve sonu tutulup ortası çıkarılır (dilbilimsel metrikler tam transkriptten
+hesaplandığı için modele yine tüm kaydın özeti gider).
+"""
+import json
+import math
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+
+# Tokenizer olmadan kaba tahmin: Türkçe metin ve sıkı JSON için karakter/token
+CHARS_PER_TOKEN = 3.5
+# Bütçe aşıldığında transkriptin baştan tutulan payı (kalanı sondan)
+TRANSCRIPT_HEAD_SHARE = 0.7
+
+# Alan seçimi: üst anahtar -> None (tamamı) ya da tutulacak alt anahtarlar
+ACOUSTIC_FIELDS = {
+    "duration": None,
+    "energy": None,
+    "pitch": None,
+    "spectral": None,
+}
+ADVANCED_FIELDS = {
+    "jitter": None,
+    "shimmer": None,
+    "hnr": None,
+    "formants": None,
+    "speech_rate_audio": None,
+    "syllable_rate": None,
+    "voiced_ratio": None,
+    "pause_analysis": ("total_pause_time", "pause_count", "avg_pause_duration", "pause_percentage", "longest_pause"),
+    "voice_onset_time": None,
+    "voice_activity": ("speech_seconds", "skipped_seconds"),
+}
+LINGUISTIC_FIELDS = {
+    "word_count": None,
+    "unique_word_count": None,
+    "type_token_ratio": None,
+    "diversity_score": None,
+    "mean_length_utterance": None,
+    "sentence_count": None,
+    "avg_sentence_length": None,
+    "hesitation_markers": None,
+    "hesitation_count": None,
+    "hesitation_ratio": None,
+    "repetitions": None,  # en fazla 10 ardışık tekrar (kelime, sayı)
+    "repetition_count": None,
+    "repetition_ratio": None,
+    "conjunction_ratio": None,
+    "syntactic_complexity": None,
+}
+
+
+def pick_fields(data: Optional[Dict], fields: Dict[str, Optional[Tuple[str, ...]]]) -> Dict:
+    """Sözlükten sadece istemde kullanılacak alanları al"""
+    data = data or {}
+    picked = {}
+    for key, subkeys in fields.items():
+        if key not in data:
+            continue
+        value = data[key]
+        if subkeys is not None and isinstance(value, dict):
+            value = {k: value[k] for k in subkeys if k in value}
+        picked[key] = value
+    return picked
+
+
+def round_floats(value: Any, digits: Optional[int] = None) -> Any:
+    """Float'ları anlamlı basamağa yuvarla (iç içe sözlük/listelerde)"""
+    digits = digits or settings.prompt_float_digits
+    if isinstance(value, float):
+        return float(f"{value:.{digits}g}") if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: round_floats(v, digits) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [round_floats(v, digits) for v in value]
+    return value
+
+
+def compact_json(value: Any) -> str:
+    """Yuvarlanmış, boşluksuz JSON"""
+    return json.dumps(round_floats(value), ensure_ascii=False, separators=(",", ":"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Yerel token tahmini (karakter sayısından)"""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def fit_transcript(transcript: str, budget_tokens: Optional[int] = None) -> str:
+    """
+    Transkript bütçeyi aşıyorsa baş (%70) ve sonunu (%30) kelime sınırında
+    tut, ortasını kaç kelimenin çıkarıldığını belirten bir notla değiştir.
+    """
+    transcript = transcript or ""
+    budget_tokens = budget_tokens or settings.prompt_transcript_token_budget
+    if budget_tokens <= 0 or estimate_tokens(transcript) <= budget_tokens:
+        return transcript
+
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    head_chars = int(budget_chars * TRANSCRIPT_HEAD_SHARE)
+    tail_chars = int(budget_chars - head_chars)
+    head = transcript[:head_chars].rsplit(" ", 1)[0]
+    tail = transcript[len(transcript) - tail_chars:].split(" ", 1)[-1]
+    omitted = len(transcript.split()) - len(head.split()) - len(tail.split())
+    print(
+        f"[Prompt] Transkript {estimate_tokens(transcript)} tahmini token, "
+        f"{budget_tokens} bütçeye kısaltıldı ({omitted} kelime çıkarıldı)", flush=True
+    )
+    return f"{head}\n[... transkriptin ortasından {omitted} kelime çıkarıldı ...]\n{tail}"
+
+
+def log_prompt_tokens(label: str, *parts: str):
+    """Çağrı öncesi istem boyutu (sistem + kullanıcı mesajları)"""
+    chars = sum(len(p) for p in parts)
+    print(f"[Prompt] {label}: ~{estimate_tokens(''.join(parts))} token tahmini ({chars} karakter)", flush=True)
+
+
+def log_token_usage(label: str, usage: Optional[Dict]):
+    """Sağlayıcının bildirdiği gerçek token kullanımı (varsa)"""
+    if not usage:
+        return
+    print(
+        f"[Prompt] {label}: girdi {usage.get('prompt_tokens')} token, "
+        f"çıktı {usage.get('completion_tokens')} token (sağlayıcı)", flush=True
+    )
@@ -1,7 +1,7 @@
 import os
 import uuid
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
@@ -79,6 +79,43 @@ class ReportService:
         
         canvas.restoreState()
     
+    @staticmethod
+    def _acoustic_rows(acoustic_features: Dict, advanced_acoustic: Dict | None) -> List[List[str]]:
+        """Akustik özellikler tablosunun satırları (başlık dahil)"""
+        acoustic_data = [
+            ["Metrik", "Değer", "Açıklama"],
+            ["Süre", f"{acoustic_features.get('duration', 0):.2f} sn", "Toplam kayıt süresi"],
+            ["Ortalama Pitch", f"{acoustic_features.get('pitch', {}).get('mean', 0):.2f} Hz", "Ses perdesi ortalaması"],
+            ["Pitch Std Dev", f"{acoustic_features.get('pitch', {}).get('std', 0):.2f}", "Perde değişkenliği"],
+            ["Ortalama Enerji", f"{acoustic_features.get('energy', {}).get('mean', 0):.4f}", "Ses şiddeti ortalaması"],
+            ["Spektral Centroid", f"{acoustic_features.get('spectral', {}).get('centroid', 0):.2f}", "Ses parlaklığı"],
+        ]
+
+        # Hece hızı öncesi kaydedilmiş analizlerde sadece beat_track temposu vardır
+        syllable_rate = (advanced_acoustic or {}).get('syllable_rate')
+        if not syllable_rate and 'tempo' in acoustic_features:
+            acoustic_data.insert(5, ["Tempo", f"{acoustic_features.get('tempo', 0):.2f} BPM", "Konuşma ritmi"])
+
+        if advanced_acoustic:
+            acoustic_data.extend([
+                ["Jitter (Local)", f"{advanced_acoustic.get('jitter', {}).get('local', 0):.4f}", "Perde titremesi"],
+                ["Shimmer (Local)", f"{advanced_acoustic.get('shimmer', {}).get('local', 0):.4f}", "Şiddet titremesi"],
+                ["HNR", f"{advanced_acoustic.get('hnr', 0):.2f} dB", "Harmoni/Gürültü oranı"],
+            ])
+            if syllable_rate:
+                acoustic_data.extend([
+                    ["Konuşma Hızı", f"{syllable_rate.get('speech_rate', 0):.2f} hece/sn", "Hece çekirdeği / toplam süre"],
+                    ["Artikülasyon Hızı", f"{syllable_rate.get('articulation_rate', 0):.2f} hece/sn", "Duraklamalar hariç"],
+                ])
+            acoustic_data.extend([
+                ["F1 Formant", f"{advanced_acoustic.get('formants', {}).get('F1', 0):.2f} Hz", "Birinci formant"],
+                ["F2 Formant", f"{advanced_acoustic.get('formants', {}).get('F2', 0):.2f} Hz", "İkinci formant"],
+                ["Duraklama Sayısı", str(advanced_acoustic.get('pause_analysis', {}).get('pause_count', 0)), "Toplam duraklama"],
+                ["Ort. Duraklama", f"{advanced_acoustic.get('pause_analysis', {}).get('avg_pause_duration', 0):.2f} sn", "Ortalama duraklama süresi"],
+                ["En Uzun Duraklama", f"{advanced_acoustic.get('pause_analysis', {}).get('longest_pause', 0):.2f} sn", "En uzun sessiz bölüm"],
+            ])
+        return acoustic_data
+
     def create_pdf_report(
         self,
         participant_info: Dict,
@@ -221,26 +258,7 @@ class ReportService:
         # ===== AKUSTİK ÖZELLİKLER =====
         story.append(Paragraph("🔊 AKUSTİK ÖZELLİKLER", heading_style))
         
-        acoustic_data = [
-            ["Metrik", "Değer", "Açıklama"],
-            ["Süre", f"{acoustic_features.get('duration', 0):.2f} sn", "Toplam kayıt süresi"],
-            ["Ortalama Pitch", f"{acoustic_features.get('pitch', {}).get('mean', 0):.2f} Hz", "Ses perdesi ortalaması"],
-            ["Pitch Std Dev", f"{acoustic_features.get('pitch', {}).get('std', 0):.2f}", "Perde değişkenliği"],
-            ["Ortalama Enerji", f"{acoustic_features.get('energy', {}).get('mean', 0):.4f}", "Ses şiddeti ortalaması"],
-            ["Tempo", f"{acoustic_features.get('tempo', 0):.2f} BPM", "Konuşma ritmi"],
-            ["Spektral Centroid", f"{acoustic_features.get('spectral', {}).get('centroid', 0):.2f}", "Ses parlaklığı"],
-        ]
-        
-        if advanced_acoustic:
-            acoustic_data.extend([
-                ["Jitter (Local)", f"{advanced_acoustic.get('jitter', {}).get('local', 0):.4f}", "Perde titremesi"],
-                ["Shimmer (Local)", f"{advanced_acoustic.get('shimmer', {}).get('local', 0):.4f}", "Şiddet titremesi"],
-                ["HNR", f"{advanced_acoustic.get('hnr', 0):.2f} dB", "Harmoni/Gürültü oranı"],
-                ["F1 Formant", f"{advanced_acoustic.get('formants', {}).get('F1', 0):.2f} Hz", "Birinci formant"],
-                ["F2 Formant", f"{advanced_acoustic.get('formants', {}).get('F2', 0):.2f} Hz", "İkinci formant"],
-                ["Duraklama Sayısı", str(advanced_acoustic.get('pause_analysis', {}).get('pause_count', 0)), "Toplam duraklama"],
-                ["Ort. Duraklama", f"{advanced_acoustic.get('pause_analysis', {}).get('avg_pause_duration', 0):.2f} sn", "Ortalama duraklama süresi"],
-            ])
+        acoustic_data = self._acoustic_rows(acoustic_features, advanced_acoustic)
         
         acoustic_table = Table(acoustic_data, colWidths=[4*cm, 4*cm, 8*cm])
         acoustic_table.setStyle(TableStyle([
@@ -0,0 +1,269 @@
+"""Dış API çağrıları (Whisper, GPT, OpenRouter) için yeniden deneme ve devre kesici.
+
+  * Geçici hatalar (zaman aşımı, bağlantı hatası, 408/425/429/5xx) üstel
+    geri çekilme + tam jitter ile yeniden denenir; sunucu `Retry-After`
+    (ya da `retry-after-ms`) gönderirse bu süre beklenir.
+  * Sağlayıcı başına devre kesici: art arda RESILIENCE_BREAKER_FAILURES geçici
+    hatadan sonra devre açılır ve RESILIENCE_BREAKER_RESET_SECONDS boyunca
+    çağrılar beklemeden CircuitOpenError ile reddedilir. Süre dolunca tek bir
+    deneme çağrısına izin verilir (half-open); başarılı olursa devre kapanır.
+  * Kalıcı hatalar (400, 401...) yeniden denenmez ve devreyi etkilemez.
+
+Sayaçlar ve devre durumu process başına RESILIENCE_STATS_DIR altına JSON
+olarak yazılır; API (GET /api/analyze/resilience/stats) worker'lar dahil
+tüm process'lerin durumunu buradan okur.
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import httpx
+import openai
+from app.core.config import settings
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# Sunucu çok uzun Retry-After isterse beklenecek üst sınır
+MAX_RETRY_AFTER_SECONDS = 120.0
+# Bu süredir güncellenmeyen process metrik dosyaları okunurken silinir
+STATS_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+COUNTERS = ("calls", "successes", "failures", "retries", "retry_after_waits", "short_circuits", "breaker_opens")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} devre kesici açık, {retry_in:.0f} sn sonra tekrar denenecek")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def _status_and_headers(exc: Exception):
+    """httpx / openai hatasından HTTP durum kodu ve başlıklar (yoksa None)"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code, exc.response.headers
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code, exc.response.headers
+    return None, None
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Geçici (yeniden denenebilir) hata mı?"""
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status, _ = _status_and_headers(exc)
+    return status in RETRYABLE_STATUS
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Retry-After / retry-after-ms başlığından beklenecek süre"""
+    _, headers = _status_and_headers(exc)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000.0, 0.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Tam jitter'lı üstel bekleme: U(0, min(max, base * 2^(deneme-1)))"""
+    ceiling = min(settings.resilience_max_delay_seconds, settings.resilience_base_delay_seconds * 2 ** (attempt - 1))
+    return random.uniform(0.0, ceiling)
+
+
+class CircuitBreaker:
+    def __init__(self, provider: str, failure_threshold: int, reset_seconds: float):
+        self.provider = provider
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self):
+        """Devre açıksa CircuitOpenError; süre dolduysa tek deneme çağrısına izin ver"""
+        if self.state == "closed":
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == "open" and elapsed >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise CircuitOpenError(self.provider, max(self.reset_seconds - elapsed, 0.0))
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Geçici hatayı kaydet; devre bu hatayla açıldıysa True"""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def release(self):
+        """Kalıcı hata: sağlayıcı ayakta, devre durumu değişmez"""
+        if self.state == "half_open":
+            self.record_success()
+        else:
+            self._trial_in_flight = False
+
+    def abandon(self):
+        """Çağrı sonuçlanmadan kesildi (iptal): deneme hakkını geri ver, durumu değiştirme"""
+        self._trial_in_flight = False
+
+
+class Resilience:
+    def __init__(self, stats_dir: str):
+        self.stats_dir = stats_dir
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._stats_file = f"{socket.gethostname()}-{os.getpid()}.json"
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(
+                provider, settings.resilience_breaker_failures, settings.resilience_breaker_reset_seconds
+            )
+            self._counters[provider] = {name: 0 for name in COUNTERS}
+        return self._breakers[provider]
+
+    def _count(self, provider: str, counter: str):
+        self._counters[provider][counter] += 1
+
+    async def call(self, provider: str, fn: Callable[[], Awaitable[Any]], max_attempts: Optional[int] = None) -> Any:
+        """
+        fn'i (her denemede yeniden çağrılan coroutine fabrikası) yeniden deneme
+        ve devre kesici ile çalıştır. Son hata aynen yükseltilir.
+        """
+        max_attempts = max(1, max_attempts or settings.resilience_max_attempts)
+        breaker = self.breaker(provider)
+        self._count(provider, "calls")
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    breaker.before_call()
+                except CircuitOpenError:
+                    self._count(provider, "short_circuits")
+                    self._count(provider, "failures")
+                    raise
+                try:
+                    result = await fn()
+                except Exception as e:
+                    if not is_retryable(e):
+                        breaker.release()
+                        self._count(provider, "failures")
+                        raise
+                    if breaker.record_failure():
+                        self._count(provider, "breaker_opens")
+                        print(f"[Resilience] {provider} devre kesici acildi ({breaker.consecutive_failures} ardisik hata)", flush=True)
+                    if attempt >= max_attempts or breaker.state == "open":
+                        self._count(provider, "failures")
+                        raise
+                    delay = retry_after_seconds(e)
+                    if delay is not None:
+                        delay = min(delay, MAX_RETRY_AFTER_SECONDS)
+                        self._count(provider, "retry_after_waits")
+                    else:
+                        delay = backoff_delay(attempt)
+                    self._count(provider, "retries")
+                    print(
+                        f"[Resilience] {provider} gecici hata ({type(e).__name__}: {(str(e).splitlines() or [''])[0][:120]}), "
+                        f"{delay:.1f}s sonra deneme {attempt + 1}/{max_attempts}", flush=True
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # CancelledError (ör. stage grafiği kardeş görevleri iptal
+                    # ettiğinde) Exception değildir; half-open deneme hakkı
+                    # bırakılmazsa devre process yeniden başlayana dek kilitli kalır
+                    breaker.abandon()
+                    raise
+                breaker.record_success()
+                self._count(provider, "successes")
+                return result
+        finally:
+            await asyncio.to_thread(self._persist)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Bu process'in sağlayıcı başına sayaçları ve devre durumu"""
+        return {
+            provider: {
+                **self._counters[provider],
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures
+            }
+            for provider, breaker in self._breakers.items()
+        }
+
+    def _persist(self):
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            path = os.path.join(self.stats_dir, self._stats_file)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "updated_at": time.time(), "providers": self.stats()}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Resilience] Metrikler yazilamadi: {e}", flush=True)
+
+    def load_all_stats(self) -> Dict:
+        """Tüm process'lerin metrikleri ve sağlayıcı başına toplamlar"""
+        processes: List[Dict] = []
+        totals: Dict[str, Dict[str, int]] = {}
+        if os.path.isdir(self.stats_dir):
+            now = time.time()
+            for name in sorted(os.listdir(self.stats_dir)):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.stats_dir, name)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if now - snapshot.get("updated_at", 0) > STATS_MAX_AGE_SECONDS:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                snapshot["process"] = name[:-len(".json")]
+                processes.append(snapshot)
+                for provider, values in snapshot.get("providers", {}).items():
+                    bucket = totals.setdefault(provider, {counter: 0 for counter in COUNTERS})
+                    for counter in COUNTERS:
+                        bucket[counter] += int(values.get(counter, 0))
+        return {"totals": totals, "processes": processes}
+
+
+resilience = Resilience(settings.resilience_stats_dir)
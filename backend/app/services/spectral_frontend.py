@@ -0,0 +1,99 @@
+"""Kayıt başına tek seferlik STFT / mel spektral ön yüzü.
+
+librosa'nın `mfcc`, `spectral_centroid` ve `spectral_rolloff` fonksiyonları
+`y=` ile çağrıldığında her biri aynı sinyalin STFT'sini yeniden hesaplar.
+Burada büyüklük (magnitude) STFT'si ve mel spektrogramı bir kez hesaplanır;
+bu özellikler `S=` parametresiyle bunlardan türetilir. RMS ve sıfır geçiş
+oranı zaman alanında, aynı kare ızgarasında hesaplanır. Kare ızgarası
+(n_fft=2048, hop=512, center=True) librosa varsayılanlarıyla aynıdır, bu
+yüzden sonuçlar `y=` ile hesaplananlarla eşleşir.
+
+center=False ile kullanıldığında y zaten n_fft/2 kenar payı içeren bir
+penceredir (bkz. streaming_features.spectral_windows); first_frame bu
+pencerenin ilk karesinin dosya genelindeki indeksidir.
+"""
+from typing import Optional
+import numpy as np
+
+# Tüm spektral özellikler ve enerji tabanlı duraklama analizi bu ızgarayı kullanır
+SPECTRAL_SR = 22050
+N_FFT = 2048
+HOP_LENGTH = 512
+
+
+class SpectralFrontEnd:
+    def __init__(
+        self,
+        y: np.ndarray,
+        sr: int,
+        n_fft: int = N_FFT,
+        hop_length: int = HOP_LENGTH,
+        center: bool = True,
+        first_frame: int = 0
+    ):
+        self.y = np.asarray(y)
+        self.sr = int(sr)
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.center = center
+        self.first_frame = first_frame
+        self._magnitude: Optional[np.ndarray] = None
+        self._mel: Optional[np.ndarray] = None
+        self._rms: Optional[np.ndarray] = None
+
+    @property
+    def frame_duration(self) -> float:
+        """Ardışık kareler arası süre (saniye)"""
+        return self.hop_length / float(self.sr)
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """|STFT| (power=1); centroid ve rolloff bunu kullanır"""
+        if self._magnitude is None:
+            import librosa
+            self._magnitude = np.abs(librosa.stft(
+                self.y, n_fft=self.n_fft, hop_length=self.hop_length, center=self.center
+            ))
+        return self._magnitude
+
+    @property
+    def mel(self) -> np.ndarray:
+        """Güç (power=2) mel spektrogramı; librosa.feature.mfcc(y=...) ile aynı girdi"""
+        if self._mel is None:
+            import librosa
+            self._mel = librosa.feature.melspectrogram(S=self.magnitude ** 2, sr=self.sr)
+        return self._mel
+
+    @property
+    def rms(self) -> np.ndarray:
+        """
+        Kare başına RMS enerji, zaman alanında (`rms(y=...)`) hesaplanır.
+        STFT'den türetmek Hann penceresi yüzünden kare kenarlarındaki enerjiyi
+        bastırır; ani başlangıç ve sessizlik sınırlarında duraklama eşiğini ve
+        VOT'u kaydırır.
+        """
+        if self._rms is None:
+            import librosa
+            self._rms = librosa.feature.rms(
+                y=self.y, frame_length=self.n_fft, hop_length=self.hop_length, center=self.center
+            )[0]
+        return self._rms
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        import librosa
+        return librosa.feature.mfcc(S=librosa.power_to_db(self.mel), sr=self.sr, n_mfcc=n_mfcc)
+
+    def spectral_centroid(self) -> np.ndarray:
+        import librosa
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr, n_fft=self.n_fft)[0]
+
+    def spectral_rolloff(self) -> np.ndarray:
+        import librosa
+        return librosa.feature.spectral_rolloff(S=self.magnitude, sr=self.sr, n_fft=self.n_fft)[0]
+
+    def zero_crossing_rate(self) -> np.ndarray:
+        """Zaman alanı özelliği; aynı kare ızgarasında hesaplanır"""
+        import librosa
+        return librosa.feature.zero_crossing_rate(
+            self.y, frame_length=self.n_fft, hop_length=self.hop_length, center=self.center
+        )[0]
@@ -0,0 +1,109 @@
+"""Analiz adımları için küçük, bildirimsel (declarative) bir stage grafı.
+
+Her stage hangi çıktılara ihtiyaç duyduğunu (`inputs`) bildirir; bağımlılıkları
+hazır olan stage'ler aynı anda çalıştırılır. Örneğin Whisper transkripsiyonu
+akustik analizlerle paralel yürür, dilbilimsel analiz sadece transkripti bekler.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+# Stage durum değişikliklerini bildiren callback: (stage, state, message)
+StageCallback = Callable[["Stage", str, str], None]
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    step: int = 0
+    message: str = ""
+    optional: bool = False  # Hata verirse sonucu None olur, pipeline durmaz
+
+
+class StageGraphError(Exception):
+    def __init__(self, stage: Stage, error: Exception):
+        self.stage = stage
+        self.error = error
+        super().__init__(f"{stage.name}: {error}")
+
+
+def _validate(stages: Sequence[Stage], initial: Dict[str, Any]):
+    names = set(initial)
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Tekrarlanan stage/girdi adı: {stage.name}")
+        names.add(stage.name)
+    for stage in stages:
+        missing = [i for i in stage.inputs if i not in names]
+        if missing:
+            raise ValueError(f"{stage.name} için tanımsız girdi: {missing}")
+
+    # Döngü kontrolü (Kahn)
+    remaining = {s.name: {i for i in s.inputs if i not in initial} for s in stages}
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage grafında döngü var: {sorted(remaining)}")
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def run_stage_graph(
+    stages: Sequence[Stage],
+    initial: Dict[str, Any],
+    on_state: Optional[StageCallback] = None
+) -> Dict[str, Any]:
+    """
+    Grafı çalıştır ve tüm stage çıktılarını (initial değerlerle birlikte) döndür.
+    Zorunlu bir stage hata verirse çalışan diğer stage'ler iptal edilir ve
+    StageGraphError fırlatılır.
+    """
+    _validate(stages, initial)
+
+    def notify(stage: Stage, state: str, message: str = ""):
+        if on_state is not None:
+            on_state(stage, state, message)
+
+    results: Dict[str, Any] = dict(initial)
+    done_events = {s.name: asyncio.Event() for s in stages}
+    start_time = time.time()
+
+    async def run_one(stage: Stage):
+        for dep in stage.inputs:
+            if dep in done_events:
+                await done_events[dep].wait()
+
+        notify(stage, "running", stage.message)
+        print(f"[Stage] {stage.name} basladi", flush=True)
+        try:
+            kwargs = {dep: results[dep] for dep in stage.inputs}
+            results[stage.name] = await stage.run(**kwargs)
+            notify(stage, "completed")
+            print(f"[Stage] {stage.name} tamamlandi ({time.time() - start_time:.1f}s)", flush=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not stage.optional:
+                notify(stage, "error", str(e))
+                raise StageGraphError(stage, e) from e
+            print(f"[Stage] {stage.name} basarisiz (opsiyonel): {e}", flush=True)
+            results[stage.name] = None
+            notify(stage, "skipped", str(e))
+        finally:
+            done_events[stage.name].set()
+
+    tasks = [asyncio.create_task(run_one(stage)) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    return results
@@ -0,0 +1,189 @@
+"""Uzun kayıtlar için sınırlı bellekli (pencere pencere) özellik çıkarımı.
+
+Sinyal sabit uzunlukta, bağlam payıyla örtüşen pencerelere bölünür. Her
+pencerede sadece pencerenin "kendi" aralığına düşen kareler tutulur; örtüşen
+bağlam kenar etkilerini (yeniden örnekleme filtresi, STFT/Praat pencereleri)
+karşılar. Örnek seviyesindeki diziler (PCM, STFT, float64 Praat sesi)
+pencere boyutuyla sınırlıdır; özetler Welford/Chan birleştirmesiyle akan
+ortalama/std olarak tutulur. Kare hızındaki küçük izler (F0, intensity,
+RMS: dakikada birkaç KB) duraklama ve jitter hesabı için birleştirilir.
+"""
+from dataclasses import dataclass
+from math import gcd
+from typing import Iterator, Optional
+import numpy as np
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer
+from app.services.spectral_frontend import SpectralFrontEnd, SPECTRAL_SR, N_FFT, HOP_LENGTH
+
+# Pencere kenarlarında yeniden örnekleme ve analiz pencereleri için bağlam payı
+CONTEXT_SECONDS = 1.0
+
+
+def should_stream(audio: AudioBuffer) -> bool:
+    """Kayıt, pencere pencere işlenecek kadar uzun mu?"""
+    return settings.streaming_min_seconds > 0 and audio.duration >= settings.streaming_min_seconds
+
+
+class RunningStats:
+    """Akan ortalama / std / maksimum (Welford, toplu güncellemede Chan birleştirmesi)"""
+
+    def __init__(self):
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+        self._max = None
+
+    def update(self, values: np.ndarray):
+        """values: (n,) ya da (n, boyut); satırlar gözlemdir"""
+        values = np.asarray(values, dtype=np.float64)
+        n = values.shape[0]
+        if n == 0:
+            return
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        batch_max = values.max(axis=0)
+        if self.count == 0:
+            self._mean, self._m2, self._max = batch_mean, batch_m2, batch_max
+            self.count = n
+            return
+        total = self.count + n
+        delta = batch_mean - self._mean
+        self._mean = self._mean + delta * (n / total)
+        self._m2 = self._m2 + batch_m2 + delta ** 2 * (self.count * n / total)
+        self._max = np.maximum(self._max, batch_max)
+        self.count = total
+
+    @property
+    def mean(self):
+        return self._mean if self.count else 0.0
+
+    @property
+    def std(self):
+        """Popülasyon std (np.std ile aynı, ddof=0)"""
+        return np.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    @property
+    def max(self):
+        return self._max if self.count else 0.0
+
+
+@dataclass
+class AudioWindow:
+    """Native sample rate'te bir pencere; start/end pencerenin kendi aralığı (saniye)"""
+    start: float
+    end: float
+    offset: float
+    samples: np.ndarray
+    sample_rate: int
+
+    def owns(self, times: np.ndarray) -> np.ndarray:
+        """Global zamanlardan bu pencereye ait olanların maskesi"""
+        times = np.asarray(times)
+        return (times >= self.start) & (times < self.end)
+
+    def to_sound(self):
+        import parselmouth
+        return parselmouth.Sound(
+            np.asarray(self.samples, dtype=np.float64),
+            sampling_frequency=float(self.sample_rate)
+        )
+
+
+def audio_window(
+    audio: AudioBuffer,
+    own_start: int,
+    own_end: int,
+    context_seconds: float = CONTEXT_SECONDS
+) -> AudioWindow:
+    """Örnek aralığı [own_start, own_end) için bağlam paylı pencere"""
+    sr = audio.sample_rate
+    n = len(audio.samples)
+    context = int(context_seconds * sr)
+    a = max(own_start - context, 0)
+    b = min(own_end + context, n)
+    return AudioWindow(
+        start=own_start / sr if own_start > 0 else float("-inf"),
+        end=own_end / sr if own_end < n else float("inf"),
+        offset=a / sr,
+        samples=np.asarray(audio.samples[a:b]),
+        sample_rate=sr
+    )
+
+
+def native_windows(
+    audio: AudioBuffer,
+    window_seconds: Optional[float] = None,
+    context_seconds: float = CONTEXT_SECONDS
+) -> Iterator[AudioWindow]:
+    """Memory-map edilmiş tampondan bağlam paylı pencereler (Praat analizleri için)"""
+    window_seconds = window_seconds or settings.streaming_window_seconds
+    n = len(audio.samples)
+    step = max(1, int(window_seconds * audio.sample_rate))
+    for own_start in range(0, n, step):
+        yield audio_window(audio, own_start, min(own_start + step, n), context_seconds)
+
+
+def spectral_frame_count(audio: AudioBuffer, target_sr: int = SPECTRAL_SR) -> int:
+    """Tüm dosyanın (center=True) STFT kare sayısı"""
+    n_target = int(np.ceil(len(audio.samples) * target_sr / audio.sample_rate))
+    return 1 + n_target // HOP_LENGTH
+
+
+def spectral_window(
+    audio: AudioBuffer,
+    j0: int,
+    j1: int,
+    target_sr: int = SPECTRAL_SR,
+    context_seconds: float = CONTEXT_SECONDS
+) -> SpectralFrontEnd:
+    """
+    Global STFT kareleri [j0, j1) için, tüm dosyanın kare ızgarasıyla birebir
+    hizalı spektral pencere.
+
+    Pencere bu kareler için gereken örnekleri (n_fft/2 kenar payıyla) içerir ve
+    center=False ile analiz edilir; dosya kenarlarında librosa'nın center=True
+    sıfır dolgusu taklit edilir. Başlangıç yeniden örnekleme oranına tam
+    bölünecek şekilde hizalanır, böylece parça parça yeniden örnekleme global
+    örnek ızgarasıyla çakışır.
+    """
+    import librosa
+
+    sr = audio.sample_rate
+    n = len(audio.samples)
+    n_target = int(np.ceil(n * target_sr / sr))
+    align = sr // gcd(sr, target_sr)
+    context = int(context_seconds * sr)
+    half = N_FFT // 2
+
+    s0 = j0 * HOP_LENGTH - half
+    s1 = (j1 - 1) * HOP_LENGTH - half + N_FFT
+
+    # Native aralık: bağlam payı + oran hizalaması
+    a = max(int(max(s0, 0) * sr // target_sr) - context, 0)
+    a -= a % align
+    b = min(int(np.ceil(s1 * sr / target_sr)) + context, n)
+    resampled = librosa.resample(np.asarray(audio.samples[a:b]), orig_sr=sr, target_sr=target_sr)
+    offset = a * target_sr // sr
+
+    segment = np.zeros(s1 - s0, dtype=np.float32)
+    g0 = max(s0, offset)
+    g1 = min(s1, n_target, offset + len(resampled))
+    if g1 > g0:
+        segment[g0 - s0:g1 - s0] = resampled[g0 - offset:g1 - offset]
+    return SpectralFrontEnd(segment, target_sr, center=False, first_frame=j0)
+
+
+def spectral_windows(
+    audio: AudioBuffer,
+    window_seconds: Optional[float] = None,
+    target_sr: int = SPECTRAL_SR,
+    context_seconds: float = CONTEXT_SECONDS
+) -> Iterator[SpectralFrontEnd]:
+    """Tüm dosyayı sırayla kapsayan hizalı spektral pencereler (bkz. spectral_window)"""
+    window_seconds = window_seconds or settings.streaming_window_seconds
+    total_frames = spectral_frame_count(audio, target_sr)
+    frames_per_window = max(1, int(window_seconds * target_sr) // HOP_LENGTH)
+    for j0 in range(0, total_frames, frames_per_window):
+        j1 = min(j0 + frames_per_window, total_frames)
+        yield spectral_window(audio, j0, j1, target_sr, context_seconds)
@@ -0,0 +1,63 @@
+"""Hece çekirdeği (syllable nuclei) tabanlı konuşma hızı.
+
+de Jong & Wempe (2009) yöntemi: şiddet (intensity) izindeki tepeler hece
+çekirdeği adayıdır. Aday tepe
+  * sessizlik eşiğinin (0.99 yüzdelik + silence_db) üstünde olmalı,
+  * bir sonraki tepeye kadar en az `min_dip_db` kadar düşmeli,
+  * sesli (F0 tanımlı) bir karede olmalıdır.
+Gelişmiş akustik analizin zaten hesapladığı intensity ve pitch izlerini
+kullanır; sinyal üzerinde ek bir geçiş yapmaz.
+"""
+from typing import Dict
+import numpy as np
+from app.services.praat_tracks import align_track
+
+
+def detect_syllable_nuclei(
+    intensity_times: np.ndarray,
+    intensity_db: np.ndarray,
+    pitch_times: np.ndarray,
+    f0: np.ndarray,
+    silence_db: float = -25.0,
+    min_dip_db: float = 2.0
+) -> np.ndarray:
+    """Hece çekirdeklerinin zamanları (saniye)"""
+    intensity_db = np.asarray(intensity_db, dtype=np.float64)
+    if len(intensity_db) < 3:
+        return np.zeros(0, dtype=np.float64)
+
+    threshold = max(np.percentile(intensity_db, 99) + silence_db, np.min(intensity_db))
+
+    # Yerel maksimumlar (platoda ilk kare)
+    center = intensity_db[1:-1]
+    peaks = np.flatnonzero((center > intensity_db[:-2]) & (center >= intensity_db[2:])) + 1
+    peaks = peaks[intensity_db[peaks] > threshold]
+    if len(peaks) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    # Her tepeden bir sonrakine (sonuncuda iz sonuna) kadar en derin çukur
+    dips = np.minimum.reduceat(intensity_db, peaks)
+    peaks = peaks[intensity_db[peaks] - dips > min_dip_db]
+
+    peak_times = np.asarray(intensity_times, dtype=np.float64)[peaks]
+    if len(peak_times) == 0 or len(pitch_times) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    # Sessiz (F0 tanımsız) tepeler hece sayılmaz
+    voiced = align_track(pitch_times, f0, peak_times) > 0
+    return peak_times[voiced]
+
+
+def speech_rate_metrics(nuclei_times: np.ndarray, duration: float, total_pause_time: float) -> Dict:
+    """
+    speech_rate: hece / toplam süre
+    articulation_rate: hece / fonasyon süresi (duraklamalar hariç)
+    """
+    syllable_count = int(len(nuclei_times))
+    phonation_time = max(duration - total_pause_time, 0.0)
+    return {
+        "syllable_count": syllable_count,
+        "speech_rate": float(syllable_count / duration) if duration > 0 else 0.0,
+        "articulation_rate": float(syllable_count / phonation_time) if phonation_time > 0 else 0.0,
+        "phonation_time": float(phonation_time)
+    }
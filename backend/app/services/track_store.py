@@ -0,0 +1,211 @@
+"""Kare bazlı özellik izlerinin (F0, intensity, RMS, formant, duraklama)
+kompakt ve memory-map ile okunabilen deposu.
+
+Sadece özet değerler veritabanına yazıldığı için yeni bir metrik ya da grafik
+ses dosyasının yeniden çözümlenmesini gerektiriyordu. İzler ses içeriğine
+(SHA-256) ve izi üreten çıkarıcının önbellek sürümüne (bkz.
+AdvancedAudioService.cache_version, pitch_tracker.cache_version) göre
+adreslenir; sürüm ya da ayar değişince eski izler okunmaz. Her iz bir dizin
+altında sıkıştırılmamış `.npy` dosyalarıdır (npz memory-map edilemez):
+
+    <features_dir>/<sha[:2]>/<sha>/<sürüm>/<iz>.times.npy   float32, saniye
+    <features_dir>/<sha[:2]>/<sha>/<sürüm>/<iz>.values.npy  float16/float32, (N,) ya da (kanal, N)
+
+Okuma sırasında dosyalar mmap ile açılır; sadece istenen zaman aralığı ve
+seyreltilmiş kareler belleğe gelir. Hangi sürümle yazıldığı analiz kaydında
+(Analysis.track_versions) tutulur; ayar değişse de eski analizin izleri okunur.
+Depo boyutu FEATURES_MAX_MB ile sınırlıdır; sınır aşılınca en uzun süredir
+kullanılmayan (sürüm dizininin mtime'ına göre) izler silinir.
+"""
+import os
+import shutil
+import uuid
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+
+# İz adı -> değer dtype'ı (None: sadece zaman noktaları, ör. hece çekirdekleri)
+TRACK_DTYPES = {
+    "pitch": np.float32,
+    "intensity": np.float16,
+    "rms": np.float16,
+    "formants": np.float32,
+    "pauses": np.float32,
+    "syllable_nuclei": None,
+}
+
+
+class TrackStore:
+    def __init__(self, root: str, max_bytes: int = 0):
+        self.root = root
+        # 0: sınırsız
+        self.max_bytes = max_bytes
+
+    def _sha_dir(self, audio_sha256: str) -> str:
+        return os.path.join(self.root, audio_sha256[:2], audio_sha256)
+
+    def _dir(self, audio_sha256: str, version: str) -> str:
+        return os.path.join(self._sha_dir(audio_sha256), version)
+
+    def _path(self, audio_sha256: str, version: str, name: str, part: str) -> str:
+        return os.path.join(self._dir(audio_sha256, version), f"{name}.{part}.npy")
+
+    def _write(self, path: str, array: np.ndarray):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    def _touch(self, audio_sha256: str, version: str):
+        # LRU için son kullanım zamanı
+        try:
+            os.utime(self._dir(audio_sha256, version), None)
+        except OSError:
+            pass
+
+    def has(self, audio_sha256: Optional[str], version: str, name: str) -> bool:
+        return bool(audio_sha256) and os.path.exists(self._path(audio_sha256, version, name, "times"))
+
+    def save(
+        self,
+        audio_sha256: Optional[str],
+        version: str,
+        name: str,
+        times: np.ndarray,
+        values: Optional[np.ndarray] = None
+    ):
+        """İzi kompakt dtype ile yaz (aynı ses ve sürüm için varsa üzerine yazar)"""
+        if self._save(audio_sha256, version, name, times, values):
+            self._evict(keep=self._dir(audio_sha256, version))
+
+    def _save(self, audio_sha256, version, name, times, values) -> bool:
+        if not audio_sha256 or name not in TRACK_DTYPES:
+            return False
+        try:
+            os.makedirs(self._dir(audio_sha256, version), exist_ok=True)
+            dtype = TRACK_DTYPES[name]
+            if dtype is not None and values is not None:
+                self._write(self._path(audio_sha256, version, name, "values"), np.asarray(values, dtype=dtype))
+            # times en son yazılır; has() bunu iz tamam işareti olarak kullanır
+            self._write(self._path(audio_sha256, version, name, "times"), np.asarray(times, dtype=np.float32))
+            return True
+        except OSError as e:
+            print(f"[TrackStore] Yazilamadi ({name}): {e}", flush=True)
+            return False
+
+    def save_all(self, audio_sha256: Optional[str], version: str, tracks: Dict[str, Dict]):
+        """{"iz": {"times": ..., "values": ...}} sözlüğündeki tüm izleri aynı sürümle yaz"""
+        saved = [
+            self._save(audio_sha256, version, name, track["times"], track.get("values"))
+            for name, track in tracks.items()
+        ]
+        if any(saved):
+            self._evict(keep=self._dir(audio_sha256, version))
+
+    def delete(self, audio_sha256: Optional[str]):
+        """Kaydın tüm sürümlerdeki izlerini sil"""
+        if not audio_sha256:
+            return
+        shutil.rmtree(self._sha_dir(audio_sha256), ignore_errors=True)
+
+    def _entries(self) -> List:
+        """(mtime, boyut, sürüm dizini) listesi"""
+        entries = []
+        for prefix in self._listdir(self.root):
+            for sha in self._listdir(os.path.join(self.root, prefix)):
+                for version in self._listdir(os.path.join(self.root, prefix, sha)):
+                    path = os.path.join(self.root, prefix, sha, version)
+                    try:
+                        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                        entries.append((os.stat(path).st_mtime, size, path))
+                    except OSError:
+                        continue
+        return entries
+
+    @staticmethod
+    def _listdir(path: str) -> List[str]:
+        try:
+            return [name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))]
+        except OSError:
+            return []
+
+    def _evict(self, keep: Optional[str] = None):
+        """Toplam boyut sınırı aşıldıysa en eski kullanılan sürüm dizinlerini sil"""
+        if self.max_bytes <= 0:
+            return
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(path))  # boş kalan ses dizini
+            except OSError:
+                pass
+            total -= size
+            evicted += 1
+        if evicted:
+            print(f"[TrackStore] {evicted} iz dizini silindi (sinir {self.max_bytes // (1024 * 1024)} MB)", flush=True)
+
+    def list_tracks(self, audio_sha256: str, versions: Dict[str, str]) -> List[Dict]:
+        """Kayıt için mevcut izler ve boyutları. versions: iz adı -> sürüm"""
+        tracks = []
+        for name, version in versions.items():
+            if name not in TRACK_DTYPES or not self.has(audio_sha256, version, name):
+                continue
+            times = np.load(self._path(audio_sha256, version, name, "times"), mmap_mode="r")
+            values_path = self._path(audio_sha256, version, name, "values")
+            values = np.load(values_path, mmap_mode="r") if os.path.exists(values_path) else None
+            tracks.append({
+                "name": name,
+                "version": version,
+                "frames": int(len(times)),
+                "channels": int(values.shape[0]) if values is not None and values.ndim == 2 else 1,
+                "dtype": str(values.dtype) if values is not None else None,
+                "start": float(times[0]) if len(times) else 0.0,
+                "end": float(times[-1]) if len(times) else 0.0
+            })
+        return tracks
+
+    def read_slice(
+        self,
+        audio_sha256: str,
+        version: str,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        max_points: int = 1000
+    ) -> Optional[Dict]:
+        """
+        [start, end) aralığındaki kareleri en fazla max_points noktaya
+        seyrelterek döndür. Zaman dizisi sıralı olduğu için aralık
+        searchsorted ile bulunur; mmap sayesinde sadece bu kısım okunur.
+        """
+        if not self.has(audio_sha256, version, name):
+            return None
+        self._touch(audio_sha256, version)
+        times = np.load(self._path(audio_sha256, version, name, "times"), mmap_mode="r")
+        values_path = self._path(audio_sha256, version, name, "values")
+        values = np.load(values_path, mmap_mode="r") if os.path.exists(values_path) else None
+
+        i0 = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        i1 = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        step = max(1, int(np.ceil((i1 - i0) / max(1, max_points))))
+
+        result = {
+            "name": name,
+            "step": step,
+            "times": np.asarray(times[i0:i1:step], dtype=np.float64).round(4).tolist()
+        }
+        if values is not None:
+            sliced = values[..., i0:i1:step]
+            # Tanımsız kareler (ör. formant NaN) JSON için 0 olarak döner
+            result["values"] = np.nan_to_num(np.asarray(sliced, dtype=np.float64), nan=0.0).round(4).tolist()
+        return result
+
+
+track_store = TrackStore(settings.features_dir, settings.features_max_mb * 1024 * 1024)
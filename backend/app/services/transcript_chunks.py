@@ -0,0 +1,114 @@
+"""Uzun ya da boyut sınırını aşan kayıtlar için parçalı Whisper transkripsiyonu.
+
+Kayıt VAD bölgeleri arasındaki sessizliklerden yaklaşık WHISPER_CHUNK_SECONDS
+uzunluğunda parçalara bölünür; parçalar WHISPER_CHUNK_OVERLAP_SECONDS kadar
+örtüşür ki sınırdaki kelime kaybolmasın. Parçalar 16 kHz FLAC olarak yazılıp
+eşzamanlı transkribe edilir (bkz. OpenAIService.transcribe_audio), ardından
+örtüşmede tekrarlanan kelimeler ayıklanarak birleştirilir.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer
+from app.services.vad import write_clip
+
+# Örtüşme ayıklamasında karşılaştırılan en fazla kelime; tek ortak kelime
+# (ör. "ve") tesadüf olabileceği için en az iki kelimelik eşleşme aranır
+MAX_OVERLAP_WORDS = 40
+MIN_OVERLAP_WORDS = 2
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def needs_chunking(upload_path: str, duration: float) -> bool:
+    """Kayıt parçalı transkribe edilmeli mi? (uzun kayıt ya da boyut sınırı)"""
+    if settings.whisper_chunk_min_seconds > 0 and duration >= settings.whisper_chunk_min_seconds:
+        return True
+    return os.path.getsize(upload_path) > settings.max_file_size
+
+
+def plan_transcript_chunks(speech: Dict, chunk_seconds: Optional[float] = None) -> List[Tuple[float, float]]:
+    """
+    Konuşma aralığını (ilk bölge başı - son bölge sonu) parçalara böl.
+    Her kesim, [önceki + chunk/2, önceki + chunk] aralığına düşen en uzun
+    sessizliğin ortasına konur; uygun sessizlik yoksa chunk sınırında kesilir.
+    chunk_seconds verilmezse WHISPER_CHUNK_SECONDS kullanılır.
+
+    Returns: [(başlangıç, bitiş), ...] örtüşme payı dahil, saniye
+    """
+    chunk_seconds = chunk_seconds or settings.whisper_chunk_seconds
+    overlap = settings.whisper_chunk_overlap_seconds
+    regions = np.asarray(speech["regions"] or [[0.0, speech["duration"]]], dtype=np.float64)
+    span_start, span_end = float(regions[0, 0]), float(regions[-1, 1])
+
+    gap_mid = (regions[:-1, 1] + regions[1:, 0]) / 2.0
+    gap_len = regions[1:, 0] - regions[:-1, 1]
+
+    cuts = [span_start]
+    # Son parça chunk'ın 1.25 katına kadar uzayabilir (çok kısa son parça olmasın)
+    while span_end - cuts[-1] > chunk_seconds * 1.25:
+        lo, hi = cuts[-1] + chunk_seconds / 2.0, cuts[-1] + chunk_seconds
+        inside = np.flatnonzero((gap_mid > lo) & (gap_mid <= hi))
+        cuts.append(float(gap_mid[inside[np.argmax(gap_len[inside])]]) if len(inside) else hi)
+    cuts.append(span_end)
+
+    return [
+        (max(a - overlap, span_start), min(b + overlap, span_end))
+        for a, b in zip(cuts[:-1], cuts[1:])
+    ]
+
+
+def chunk_path_prefix(audio_path: str) -> str:
+    """Parça dosyaları için önek (PCM tamponuyla aynı dizin)"""
+    return os.path.splitext(AudioBuffer.pcm_path_for(audio_path))[0] + ".whisper"
+
+
+def write_transcript_chunks(audio: AudioBuffer, chunks: List[Tuple[float, float]], prefix: str) -> List[str]:
+    """Parçaları 16 kHz FLAC olarak yaz (process havuzunda çalışır)"""
+    return [
+        write_clip(audio, start, end, f"{prefix}.{i:03d}.flac")
+        for i, (start, end) in enumerate(chunks)
+    ]
+
+
+def _normalize_word(word: str) -> str:
+    return "".join(_WORD.findall(word.lower()))
+
+
+def _overlap(prev: List[str], nxt: List[str]) -> Tuple[int, int, int]:
+    """
+    prev'in sonu ile nxt'in başındaki ortak kelime dizisi.
+    Parça sınırında kesilmiş yarım kelimeye izin vermek için prev'in son
+    kelimesi ve nxt'in ilk kelimesi atlanarak da denenir.
+
+    Returns: (prev sonundan atılacak, nxt başından atılacak, eşleşen) kelime sayıları
+    """
+    limit = min(len(prev), len(nxt), MAX_OVERLAP_WORDS)
+    a = [_normalize_word(w) for w in prev[len(prev) - limit:]]
+    b = [_normalize_word(w) for w in nxt[:limit]]
+    best = (0, 0, 0)
+    for skip_a in (0, 1):
+        tail = a[:len(a) - skip_a]
+        for skip_b in (0, 1):
+            head = b[skip_b:]
+            for k in range(min(len(tail), len(head)), MIN_OVERLAP_WORDS - 1, -1):
+                if k > best[2] and tail[len(tail) - k:] == head[:k]:
+                    best = (skip_a, skip_b + k, k)
+                    break
+    return best
+
+
+def stitch_transcripts(parts: List[str]) -> str:
+    """Parça transkriptlerini örtüşmedeki tekrarları ayıklayarak birleştir"""
+    words: List[str] = []
+    for part in parts:
+        part_words = (part or "").split()
+        if not part_words:
+            continue
+        drop_prev, drop_next, _ = _overlap(words, part_words)
+        if drop_prev:
+            del words[len(words) - drop_prev:]
+        words.extend(part_words[drop_next:])
+    return " ".join(words)
@@ -0,0 +1,49 @@
+"""Yüklenen dosyaları parça parça diske yazan, boyut sınırı uygulayan servis"""
+import asyncio
+import hashlib
+import os
+from typing import Tuple
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+async def save_upload(file: UploadFile, dest_path: str, max_size: int) -> Tuple[int, str]:
+    """
+    Dosyayı parçalar halinde diske yaz ve SHA-256'sını hesapla.
+    Sınır aşıldığı anda yazmayı keser, yarım dosyayı siler ve
+    UploadTooLargeError fırlatır. Dosya I/O event loop dışında yapılır.
+
+    Returns: (boyut, sha256 hex)
+    """
+    tmp_path = dest_path + ".part"
+    hasher = hashlib.sha256()
+    size = 0
+
+    def _write(f, chunk: bytes):
+        f.write(chunk)
+        hasher.update(chunk)
+
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(f"Dosya boyutu {max_size} byte sınırını aşıyor")
+            await asyncio.to_thread(_write, f, chunk)
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp_path, dest_path)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        if os.path.exists(tmp_path):
+            await asyncio.to_thread(os.remove, tmp_path)
+        raise
+
+    return size, hasher.hexdigest()
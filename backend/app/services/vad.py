@@ -0,0 +1,208 @@
+"""Enerji tabanlı ses etkinliği tespiti (VAD) ön geçişi.
+
+Çözümlenmiş tampon 20 ms'lik karelere bölünür; kare enerjisi (dB)
+memory-map'ten bloklar halinde okunarak hesaplanır. Eşik kaydın gürültü
+tabanına (alt yüzdelik) göre uyarlanır, kısa konuşma patlamaları (tıklama)
+atılır, bölgeler kenar payıyla genişletilip kısa sessizlikler köprülenir.
+
+Bölgeler iki yerde kullanılır:
+  * Whisper'a baştaki/sondaki sessizliği kırpılmış 16 kHz FLAC gönderilir,
+  * gelişmiş akustik analizin Praat izleri (intensity, HNR, formant) sadece
+    konuşma bölgelerinde çıkarılır.
+Duraklama metrikleri tüm zaman çizelgesindeki RMS'ten hesaplanmaya devam
+eder; VAD onları etkilemez.
+"""
+import os
+from math import gcd
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer
+from app.services.pause_analysis import mask_runs
+from app.services.streaming_features import AudioWindow, audio_window
+
+FRAME_SECONDS = 0.02
+# Enerji hesabında memory-map'ten bir seferde okunan ses
+BLOCK_SECONDS = 30.0
+# Gürültü tabanı ve konuşma tepesi yüzdelikleri; aralarındaki fark bundan
+# küçükse kayıtta belirgin sessizlik yoktur (tüm kayıt konuşma sayılır)
+NOISE_PERCENTILE = 10.0
+PEAK_PERCENTILE = 99.0
+MIN_DYNAMIC_DB = 10.0
+# Bundan kısa enerji patlamaları konuşma sayılmaz; bölgeler her yönde PAD
+# kadar genişletilir (2 * PAD'den kısa sessizlikler köprülenir)
+MIN_SPEECH_SECONDS = 0.05
+PAD_SECONDS = 0.2
+# Praat pencereleri için bölge kenarlarındaki bağlam payı
+REGION_CONTEXT_SECONDS = 0.1
+# Whisper zaten 16 kHz'e indirir; kırpılmış ses bu hızda yazılır
+CLIP_SAMPLE_RATE = 16000
+
+
+def frame_energy_db(audio: AudioBuffer):
+    """
+    Kare başına ortalama güç (dB). Tampon bloklar halinde okunur.
+
+    Returns: (energy_db, frame_seconds)
+    """
+    sr = audio.sample_rate
+    frame = max(1, int(round(FRAME_SECONDS * sr)))
+    usable = (len(audio.samples) // frame) * frame
+    block = frame * max(1, int(BLOCK_SECONDS / FRAME_SECONDS))
+    parts = []
+    for a in range(0, usable, block):
+        x = np.asarray(audio.samples[a:min(a + block, usable)], dtype=np.float32).reshape(-1, frame)
+        parts.append(np.mean(x * x, axis=1))
+    energy = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    return 10.0 * np.log10(energy.astype(np.float64) + 1e-12), frame / float(sr)
+
+
+def _pad_and_merge(starts: np.ndarray, ends: np.ndarray, pad: float, duration: float):
+    """Sıralı bölgeleri genişlet ve çakışanları birleştir"""
+    if len(starts) == 0:
+        return starts, ends
+    starts = np.maximum(starts - pad, 0.0)
+    ends = np.minimum(ends + pad, duration)
+    new_region = np.concatenate(([True], starts[1:] > ends[:-1]))
+    first = np.flatnonzero(new_region)
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+    return starts[first], ends[last]
+
+
+def speech_summary(starts: np.ndarray, ends: np.ndarray, duration: float) -> Dict:
+    """Bölgelerden VAD özeti (process havuzundan dönebilen düz sözlük)"""
+    speech_seconds = float(np.sum(ends - starts)) if len(starts) else 0.0
+    return {
+        "regions": [[round(float(s), 3), round(float(e), 3)] for s, e in zip(starts, ends)],
+        "duration": float(duration),
+        "speech_seconds": speech_seconds,
+        "skipped_seconds": max(float(duration) - speech_seconds, 0.0),
+        "leading_silence": float(starts[0]) if len(starts) else float(duration),
+        "trailing_silence": float(duration - ends[-1]) if len(ends) else 0.0
+    }
+
+
+def detect_speech_regions(audio: AudioBuffer, margin_db: Optional[float] = None) -> Dict:
+    """
+    Konuşma bölgelerini bul (process havuzunda çalışır).
+
+    Eşik: gürültü tabanı + min(margin_db, dinamik aralık / 2). VAD kapalıysa
+    ya da kayıtta belirgin sessizlik yoksa tüm kayıt tek bölgedir.
+
+    Returns: {"regions": [[başlangıç, bitiş], ...], "duration", "speech_seconds",
+              "skipped_seconds", "leading_silence", "trailing_silence"}
+    """
+    duration = audio.duration
+    whole = speech_summary(np.array([0.0]), np.array([duration]), duration)
+    if not settings.vad_enabled:
+        return whole
+
+    margin_db = settings.vad_margin_db if margin_db is None else margin_db
+    energy_db, frame_seconds = frame_energy_db(audio)
+    if len(energy_db) == 0:
+        return whole
+
+    noise_floor = np.percentile(energy_db, NOISE_PERCENTILE)
+    dynamic = np.percentile(energy_db, PEAK_PERCENTILE) - noise_floor
+    if dynamic < MIN_DYNAMIC_DB:
+        return whole
+
+    threshold = noise_floor + min(margin_db, dynamic / 2.0)
+    start_frames, end_frames = mask_runs(energy_db > threshold)
+    starts = start_frames * frame_seconds
+    ends = np.minimum(end_frames * frame_seconds, duration)
+    keep = (ends - starts) >= MIN_SPEECH_SECONDS
+    starts, ends = _pad_and_merge(starts[keep], ends[keep], PAD_SECONDS, duration)
+
+    return speech_summary(starts, ends, duration)
+
+
+def in_regions(times: np.ndarray, regions: List[List[float]]) -> np.ndarray:
+    """Zamanlardan [başlangıç, bitiş) bölgelerinden birine düşenlerin maskesi"""
+    times = np.asarray(times, dtype=np.float64)
+    mask = np.zeros(len(times), dtype=bool)
+    if not regions:
+        return mask
+    bounds = np.asarray(regions, dtype=np.float64)
+    idx = np.searchsorted(bounds[:, 0], times, side="right") - 1
+    valid = idx >= 0
+    mask[valid] = times[valid] < bounds[idx[valid], 1]
+    return mask
+
+
+def speech_windows(
+    audio: AudioBuffer,
+    regions: List[List[float]],
+    max_seconds: Optional[float] = None,
+    context_seconds: float = REGION_CONTEXT_SECONDS
+) -> Iterator[AudioWindow]:
+    """
+    Konuşma bölgelerini kapsayan bağlam paylı pencereler. Uzun bölgeler
+    STREAMING_WINDOW_SECONDS civarı eşit parçalara bölünür, böylece float64
+    Praat sesi pencere boyutuyla sınırlı kalır.
+    """
+    max_seconds = max_seconds or settings.streaming_window_seconds
+    sr = audio.sample_rate
+    n = len(audio.samples)
+    for start, end in regions:
+        a = int(start * sr)
+        b = min(int(round(end * sr)), n)
+        if b <= a:
+            continue
+        pieces = max(1, int(round((b - a) / (max_seconds * sr))))
+        edges = np.linspace(a, b, pieces + 1).astype(np.int64)
+        for own_start, own_end in zip(edges[:-1], edges[1:]):
+            yield audio_window(audio, int(own_start), int(own_end), context_seconds)
+
+
+def speech_clip_path(audio_path: str) -> str:
+    """Whisper için kırpılmış sesin geçici yolu (PCM tamponuyla aynı dizin)"""
+    return os.path.splitext(AudioBuffer.pcm_path_for(audio_path))[0] + ".speech.flac"
+
+
+def write_clip(audio: AudioBuffer, start: float, end: float, out_path: str) -> str:
+    """
+    [start, end) saniye aralığını 16 kHz mono FLAC olarak yaz.
+
+    Yeniden örnekleme bloklar halinde yapılır; blok başları oran hizalı
+    olduğundan bloklar global örnek ızgarasıyla çakışır, bağlam payı filtre
+    kenar etkisini karşılar.
+    """
+    import soundfile as sf
+    from scipy.signal import resample_poly
+
+    sr = audio.sample_rate
+    n = len(audio.samples)
+    g = gcd(sr, CLIP_SAMPLE_RATE)
+    up, down = CLIP_SAMPLE_RATE // g, sr // g
+    a = int(start * sr)
+    a -= a % down
+    b = min(int(np.ceil(end * sr)), n)
+    block = down * max(1, int(BLOCK_SECONDS * sr) // down)
+    context = down * max(1, int(REGION_CONTEXT_SECONDS * sr) // down)
+
+    with sf.SoundFile(out_path, "w", samplerate=CLIP_SAMPLE_RATE, channels=1, format="FLAC", subtype="PCM_16") as f:
+        for own_start in range(a, b, block):
+            own_end = min(own_start + block, b)
+            c0 = max(own_start - context, 0)
+            c1 = min(own_end + context, n)
+            y = resample_poly(np.asarray(audio.samples[c0:c1], dtype=np.float64), up, down)
+            o0 = (own_start - c0) * up // down
+            o1 = o0 + (own_end - own_start) * up // down
+            f.write(np.clip(y[o0:o1], -1.0, 1.0).astype(np.float32))
+    return out_path
+
+
+def write_speech_clip(audio: AudioBuffer, speech: Dict, out_path: str) -> Optional[str]:
+    """
+    İlk konuşma bölgesinin başından son bölgenin sonuna kadar olan sesi
+    16 kHz mono FLAC olarak yaz (process havuzunda çalışır). Baş/son sessizlik
+    VAD_MIN_TRIM_SECONDS'tan kısaysa kırpmaya değmez, None döner.
+    """
+    trimmed = speech["leading_silence"] + speech["trailing_silence"]
+    if not speech["regions"] or trimmed < settings.vad_min_trim_seconds:
+        return None
+
+    write_clip(audio, speech["regions"][0][0], speech["regions"][-1][1], out_path)
+    print(f"[VAD] Whisper için {trimmed:.1f}s baş/son sessizlik kırpıldı", flush=True)
+    return out_path
@@ -0,0 +1,157 @@
+"""Analiz worker'ı.
+
+Kullanım:
+    python -m app.worker
+
+Kuyruktaki analiz işlerini (analysis_jobs) SKIP LOCKED ile alır ve
+ANALYSIS_WORKER_CONCURRENCY kadar işi aynı anda çalıştırır. API
+process'lerinden bağımsız ölçeklenebilir. Çalışan her işin kirası
+ANALYSIS_JOB_HEARTBEAT_SECONDS aralıkla uzatılır.
+"""
+import asyncio
+import os
+import signal
+import traceback
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, init_models, engine
+from app.models.analysis_job import AnalysisJob
+from app.services.analysis_pipeline import run_analysis
+from app.services.job_queue import JobLeaseLost, claim_next_job, fail_job, renew_lease, requeue_stale_jobs
+from app.services.progress_relay import progress_relay
+from app.services.process_pool import process_pool
+from app.services.audio_normalizer import audio_normalizer
+from app.services.http_clients import http_clients
+from app.services.progress_store import set_progress, clear_progress
+
+# Takılı kalan işlerin kontrol aralığı
+REAPER_INTERVAL_SECONDS = 60
+
+
+async def _heartbeat(job: AnalysisJob, task: asyncio.Task):
+    """Çalışan işin kirasını uzat; kira kaybedildiyse analizi iptal et"""
+    while not task.done():
+        await asyncio.sleep(settings.analysis_job_heartbeat_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                owned = await renew_lease(db, job)
+        except Exception as e:
+            print(f"[Worker] Kira yenilenemedi (job={job.id}): {e}", flush=True)
+            continue
+        if not owned:
+            print(f"[Worker] Kira kaybedildi (job={job.id}), analiz durduruluyor", flush=True)
+            task.cancel()
+            return
+
+
+async def _run_job(job: AnalysisJob):
+    try:
+        async with AsyncSessionLocal() as db:
+            analysis = await run_analysis(db, job)
+        set_progress(
+            job.progress_id, 9, "Analiz tamamlandı!",
+            status="completed", analysis_id=analysis.id, job_id=job.id
+        )
+    except JobLeaseLost as e:
+        # İş başka bir worker'a geçti; ilerleme ve dosya artık onun
+        print(f"[Worker] {e}", flush=True)
+        return
+    except Exception as e:
+        print(f"[Worker] Analiz hatası (job={job.id}): {traceback.format_exc()}", flush=True)
+        async with AsyncSessionLocal() as db:
+            if not await fail_job(db, job, str(e)):
+                print(f"[Worker] Is {job.id} artik bu worker'da degil, hata kaydedilmedi", flush=True)
+                return
+
+        # Hata durumunda dosyayı (ve varsa kanonik kopyasını) sil
+        paths = [job.audio_path]
+        if audio_normalizer.enabled:
+            paths.append(audio_normalizer.canonical_path_for(job.audio_path))
+        for path in paths:
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        set_progress(job.progress_id, 0, f"Hata: {str(e)}", status="error", job_id=job.id)
+    clear_progress(job.progress_id)
+
+
+async def _process_job(job: AnalysisJob):
+    print(f"[Worker] Is alindi: job={job.id} progress={job.progress_id[:8]}... deneme={job.attempts}", flush=True)
+    task = asyncio.create_task(_run_job(job))
+    heartbeat = asyncio.create_task(_heartbeat(job, task))
+    try:
+        await asyncio.wait([task])
+    finally:
+        heartbeat.cancel()
+    if not task.cancelled():
+        task.result()
+
+
+async def _worker_loop(worker_no: int, stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_next_job(db)
+        except Exception as e:
+            print(f"[Worker {worker_no}] Kuyruk okunamadi: {e}", flush=True)
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=settings.analysis_worker_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        await _process_job(job)
+
+
+async def _reaper_loop(stop_event: asyncio.Event):
+    while not stop_event.is_set():
+        try:
+            async with AsyncSessionLocal() as db:
+                requeued = await requeue_stale_jobs(db)
+            if requeued:
+                print(f"[Worker] {requeued} takili is yeniden kuyruga alindi", flush=True)
+        except Exception as e:
+            print(f"[Worker] Takili is kontrolu basarisiz: {e}", flush=True)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=REAPER_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main():
+    await init_models()
+    await progress_relay.start(listen=False)
+    process_pool.start()
+    http_clients.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows
+            pass
+
+    concurrency = max(1, settings.analysis_worker_concurrency)
+    print(f"[Worker] Baslatildi, eszamanlilik={concurrency}", flush=True)
+
+    tasks = [asyncio.create_task(_worker_loop(i + 1, stop_event)) for i in range(concurrency)]
+    tasks.append(asyncio.create_task(_reaper_loop(stop_event)))
+    try:
+        # Çalışan işler bitince döngüler stop_event'i görüp çıkar
+        await asyncio.gather(*tasks)
+    finally:
+        process_pool.shutdown()
+        await http_clients.aclose()
+        await progress_relay.stop()
+        await engine.dispose()
+        print("[Worker] Durduruldu", flush=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,13 @@
+#!/bin/sh
+# Tek servisli dağıtım (Railway): analiz worker'ı arka planda, API ön planda.
+# Worker çökerse yeniden başlatılır; yarım kalan işleri kira süresi dolunca
+# (ANALYSIS_JOB_LEASE_SECONDS) bir sonraki worker yeniden kuyruğa alır.
+(
+  while true; do
+    python -m app.worker
+    echo "[start] Worker durdu (kod $?), 5 sn sonra yeniden baslatiliyor"
+    sleep 5
+  done
+) &
+
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}"
@@ -0,0 +1,89 @@
+"""
+Backend testleri. Ayarlar (app.core.config) import anında ortamdan okunduğu
+için ortam değişkenleri app modülleri import edilmeden önce burada ayarlanır;
+dosya yazan servisler geçici bir dizine yönlendirilir.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="knowhy-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("HTTP_HTTP2", "false")
+os.environ.setdefault("RESILIENCE_STATS_DIR", os.path.join(_TMP, "resilience"))
+os.environ.setdefault("FEATURE_CACHE_DIR", os.path.join(_TMP, "feature_cache"))
+os.environ.setdefault("FEATURES_DIR", os.path.join(_TMP, "features"))
+
+
+class StubServer:
+    """
+    Sırayla verilen yanıtları döndüren yerel HTTP sunucusu. plan öğeleri:
+    (status, body, headers) ya da gecikmeli yanıt için ("sleep", saniye).
+    Plan bitince responder(path, body) verilmişse onun döndürdüğü öğe,
+    yoksa 200 + default_body döner.
+    """
+
+    def __init__(self):
+        self.plan = []
+        self.hits = []
+        self.default_body = {"ok": True}
+        self.responder = None
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Başlık ve gövde tek segmentte gitsin (Nagle / gecikmeli ACK beklemesi olmasın)
+            disable_nagle_algorithm = True
+            wbufsize = 1 << 16
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length) if length else b""
+                stub.hits.append((self.path, time.monotonic(), body, self.client_address))
+                if stub.plan:
+                    step = stub.plan.pop(0)
+                elif stub.responder is not None:
+                    step = stub.responder(self.path, body)
+                else:
+                    step = (200, stub.default_body, {})
+                if step[0] == "sleep":
+                    time.sleep(step[1])
+                    step = (200, stub.default_body, {})
+                status, payload, headers = (tuple(step) + ({},))[:3]
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                headers = {"content-type": "application/json", **headers}
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _handle
+            do_POST = _handle
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
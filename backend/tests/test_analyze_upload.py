@@ -0,0 +1,149 @@
+"""Yükleme uç noktası: istemciden gelen progress_id doğrulaması"""
+import asyncio
+import io
+import os
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.api.routes import analyze as analyze_module
+from app.core.config import settings
+from app.models.analysis_job import AnalysisJob, JobStatus
+from app.models.participant import GroupType, Participant
+from app.services import progress_store
+
+
+def _wav_bytes() -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(1600, dtype=np.float32), 16000, format="WAV")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    return tmp_path
+
+
+def _api(scenario):
+    """Yükleme uç noktasını SQLite veritabanıyla çalıştır"""
+    pytest.importorskip("aiosqlite")
+    import httpx
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from app.api.dependencies import get_current_user
+    from app.core.database import Base, get_db
+    from app.main import app
+
+    user = SimpleNamespace(id=1, email="a@b.c", is_verified=True, has_consented=True)
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with sessions() as db:
+            db.add(Participant(
+                id=1, user_id=1, name="K", age=70, gender="f", group_type=GroupType.CONTROL, has_consented=True
+            ))
+            await db.commit()
+
+        async def db_override():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = db_override
+        app.dependency_overrides[get_current_user] = lambda: user
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await scenario(client, sessions)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            app.dependency_overrides.pop(get_current_user, None)
+            await engine.dispose()
+    asyncio.run(main())
+
+
+async def _post(client, progress_id=None):
+    data = {"participant_id": "1"}
+    if progress_id is not None:
+        data["progress_id"] = progress_id
+    return await client.post("/api/analyze/", data=data, files={"file": ("kayit.wav", _wav_bytes(), "audio/wav")})
+
+
+async def _add_job(sessions, progress_id):
+    async with sessions() as db:
+        db.add(AnalysisJob(
+            progress_id=progress_id, user_id=1, participant_id=1, audio_path="/yok.wav", status=JobStatus.RUNNING
+        ))
+        await db.commit()
+
+
+def test_generated_and_client_progress_ids_are_accepted(upload_dir):
+    progress_id = str(uuid.uuid4())
+
+    async def scenario(client, sessions):
+        response = await _post(client, progress_id)
+        assert response.status_code == 202
+        assert response.json()["progress_id"] == progress_id
+
+        response = await _post(client)
+        assert response.status_code == 202
+        assert analyze_module._is_uuid(response.json()["progress_id"])
+
+    _api(scenario)
+    assert len(os.listdir(upload_dir)) == 2
+
+
+@pytest.mark.parametrize("progress_id", ["abc", "../etc", str(uuid.uuid4()).upper(), uuid.uuid4().hex])
+def test_malformed_progress_id_is_rejected(upload_dir, progress_id):
+    async def scenario(client, sessions):
+        response = await _post(client, progress_id)
+        assert response.status_code == 400
+
+    _api(scenario)
+    assert os.listdir(upload_dir) == []
+    assert progress_store.get_progress(progress_id) is None
+
+
+def test_reused_progress_id_returns_409_and_keeps_existing_progress(upload_dir):
+    progress_id = str(uuid.uuid4())
+    progress_store.set_progress(progress_id, 4, "Transkripsiyon yapılıyor...", status="running")
+
+    async def scenario(client, sessions):
+        await _add_job(sessions, progress_id)
+        response = await _post(client, progress_id)
+        assert response.status_code == 409
+
+    try:
+        _api(scenario)
+        assert os.listdir(upload_dir) == []
+        progress = progress_store.get_progress(progress_id)
+        assert progress["current_step"] == 4 and progress["status"] == "running"
+    finally:
+        progress_store.clear_progress(progress_id)
+
+
+def test_concurrent_reuse_hits_unique_constraint_and_returns_409(upload_dir, monkeypatch):
+    progress_id = str(uuid.uuid4())
+
+    async def not_found(db, progress_id):
+        return None
+
+    # Ön kontrolden geçip kayıt anında çakışan eşzamanlı gönderim
+    monkeypatch.setattr(analyze_module, "get_job_by_progress_id", not_found)
+    monkeypatch.setattr(analyze_module, "get_progress", lambda progress_id: None)
+
+    async def scenario(client, sessions):
+        await _add_job(sessions, progress_id)
+        response = await _post(client, progress_id)
+        assert response.status_code == 409
+
+        # Oturum geri alındığı için sonraki yükleme çalışır
+        assert (await _post(client)).status_code == 202
+
+    _api(scenario)
+    assert len(os.listdir(upload_dir)) == 1
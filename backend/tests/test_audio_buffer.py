@@ -0,0 +1,58 @@
+"""PCM tamponu: blok blok çözümleme librosa.load ile aynı sonucu, sabit bellekle verir"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+sf = pytest.importorskip("soundfile")
+
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer, decode_audio, discard_decoded
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    return tmp_path
+
+
+def _write_stereo(path, seconds: float, sr: int = 44100):
+    rng = np.random.default_rng(3)
+    frames = int(seconds * sr)
+    data = np.stack([0.2 * np.sin(2 * np.pi * 220 * np.arange(frames) / sr), rng.normal(0, 0.05, frames)], axis=1)
+    sf.write(path, data.astype(np.float32), sr, subtype="PCM_16")
+
+
+def test_decode_matches_librosa_load(upload_dir):
+    path = str(upload_dir / "kayit.wav")
+    _write_stereo(path, 3.0)
+    buffer = decode_audio(path)
+    expected, sr = librosa.load(path, sr=None, mono=True)
+    assert buffer.sample_rate == sr
+    assert isinstance(buffer.samples, np.memmap)
+    np.testing.assert_allclose(buffer.samples, expected, rtol=0, atol=1e-7)
+    discard_decoded(path)
+
+
+def test_decode_memory_does_not_grow_with_length(upload_dir):
+    path = str(upload_dir / "uzun.wav")
+    _write_stereo(path, 60.0)  # 2.6M kare: tam yükleme ~10 MB (stereo float32)
+    tracemalloc.start()
+    try:
+        buffer = decode_audio(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(buffer.samples) == 60 * 44100
+    assert peak < 3 * 1024 * 1024
+    discard_decoded(path)
+
+
+def test_unreadable_format_falls_back_to_librosa(upload_dir, monkeypatch):
+    path = str(upload_dir / "kayit.wav")
+    _write_stereo(path, 1.0)
+    monkeypatch.setattr(sf, "info", lambda *_: (_ for _ in ()).throw(RuntimeError("desteklenmiyor")))
+    buffer = decode_audio(path)
+    assert len(buffer.samples) == 44100 and buffer.backing_path == AudioBuffer.pcm_path_for(path)
+    discard_decoded(path)
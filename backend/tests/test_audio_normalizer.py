@@ -0,0 +1,41 @@
+"""Kanonik ses dosyası: varsayılan kayıpsız FLAC, orijinal yükleme silinir"""
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("librosa")
+
+from app.core.config import settings
+from app.services.audio_normalizer import audio_normalizer
+
+
+def _speech_like(seconds: float, sr: int) -> np.ndarray:
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    envelope = 0.5 * (1 + np.sign(np.sin(2 * np.pi * 2 * t)))  # hece benzeri aç/kapa
+    rng = np.random.default_rng(0)
+    return (envelope * sum(0.2 / k * np.sin(k * phase) for k in range(1, 6)) + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_default_canonical_file_is_smaller_lossless_flac(tmp_path):
+    assert settings.audio_normalize_format == "flac"
+    sr = settings.audio_normalize_sample_rate
+    upload = tmp_path / "kayit.wav"
+    y = _speech_like(10.0, 44100)
+    sf.write(str(upload), np.stack([y, y], axis=1), 44100, subtype="PCM_16")
+
+    canonical = asyncio.run(audio_normalizer.normalize(str(upload)))
+
+    assert canonical.endswith(".canonical.flac")
+    assert not os.path.exists(upload)
+    info = sf.info(canonical)
+    assert (info.format, info.subtype, info.samplerate, info.channels) == ("FLAC", "PCM_16", sr, 1)
+    # Aynı içeriğin 16 kHz PCM_16 WAV'ı (önceki varsayılan) daha büyüktür
+    pcm_wav_bytes = info.frames * 2 + 44
+    assert os.path.getsize(canonical) < 0.8 * pcm_wav_bytes
+    # Yeniden denemede mevcut kanonik dosya döner
+    assert asyncio.run(audio_normalizer.normalize(str(upload))) == canonical
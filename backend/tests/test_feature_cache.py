@@ -0,0 +1,36 @@
+"""Özellik önbelleği anahtarları: çıktıyı etkileyen her ayar sürüme girmeli"""
+import pytest
+
+from app.core.config import settings
+from app.services.advanced_audio_service import AdvancedAudioService
+from app.services.audio_service import AudioService
+from app.services.feature_cache import FeatureCache
+
+
+@pytest.mark.parametrize("name, value", [
+    ("pitch_floor", 60.0),
+    ("pitch_ceiling", 400.0),
+    ("pause_threshold_strategy", "percentile"),
+    ("pause_min_duration", 0.25),
+    ("vad_margin_db", 18.0),
+    ("vad_min_trim_seconds", 2.0),
+])
+def test_advanced_version_changes_with_setting(monkeypatch, name, value):
+    before = AdvancedAudioService.cache_version(vad=True)
+    monkeypatch.setattr(settings, name, value)
+    assert AdvancedAudioService.cache_version(vad=True) != before
+
+
+@pytest.mark.parametrize("name, value", [("pitch_floor", 60.0), ("pitch_ceiling", 400.0)])
+def test_acoustic_version_changes_with_pitch_range(monkeypatch, name, value):
+    before = AudioService.cache_version()
+    monkeypatch.setattr(settings, name, value)
+    assert AudioService.cache_version() != before
+
+
+def test_entries_are_isolated_by_version(tmp_path):
+    cache = FeatureCache(str(tmp_path), 10 * 1024 * 1024)
+    sha = "ab" * 32
+    cache.put("advanced_acoustic", sha, AdvancedAudioService.cache_version(vad=False), {"x": 1})
+    assert cache.get("advanced_acoustic", sha, AdvancedAudioService.cache_version(vad=False)) == {"x": 1}
+    assert cache.get("advanced_acoustic", sha, AdvancedAudioService.cache_version(vad=True)) is None
@@ -0,0 +1,74 @@
+"""Paylaşılan HTTP istemcileri: bağlantı yeniden kullanımı ve çağrı başına istemciye karşı kıyas"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.email_webhook import send_verification_email
+from app.services.http_clients import http_clients
+
+CALLS = 50
+
+
+async def _per_call_post(url: str) -> int:
+    # Eski davranış: her çağrıda yeni istemci (yeni TCP bağlantısı + havuz kurulumu)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0)) as client:
+        response = await client.post(url, json={"to": "a@b.c", "email": "a@b.c", "code": "123456"})
+    return response.status_code
+
+
+def _timed(calls) -> float:
+    async def run():
+        try:
+            started = time.perf_counter()
+            for call in calls:
+                await call()
+            return (time.perf_counter() - started) / len(calls)
+        finally:
+            await http_clients.aclose()
+    return asyncio.run(run())
+
+
+def _client_ports(stub_server) -> set:
+    ports = {hit[3][1] for hit in stub_server.hits}
+    stub_server.hits.clear()
+    return ports
+
+
+def test_shared_client_reuses_one_connection(stub_server, monkeypatch):
+    url = stub_server.url + "/webhook"
+    monkeypatch.setattr(settings, "email_webhook_url", url)
+
+    per_call = _timed([lambda: _per_call_post(url)] * CALLS)
+    per_call_ports = _client_ports(stub_server)
+
+    async def shared():
+        assert await send_verification_email("a@b.c", "123456")
+    pooled = _timed([shared] * CALLS)
+    pooled_ports = _client_ports(stub_server)
+
+    print(f"\n[Benchmark] {CALLS} POST: çağrı başına istemci {per_call * 1000:.2f} ms, "
+          f"paylaşılan istemci {pooled * 1000:.2f} ms (ortalama)")
+
+    assert len(per_call_ports) == CALLS
+    assert len(pooled_ports) == 1
+    assert pooled * 2 < per_call
+
+
+def test_registry_recreates_closed_clients():
+    async def run():
+        first = http_clients.get("openrouter")
+        assert http_clients.get("openrouter") is first
+        await http_clients.aclose()
+        assert first.is_closed
+        second = http_clients.get("openrouter")
+        assert second is not first and not second.is_closed
+        await http_clients.aclose()
+    asyncio.run(run())
+
+
+def test_unknown_client_is_rejected():
+    with pytest.raises(ValueError):
+        http_clients.get("gemini")
@@ -0,0 +1,107 @@
+"""Analiz kuyruğu kira (lease) davranışı; Postgres yerine SQLite (aiosqlite) ile"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+pytest.importorskip("aiosqlite")
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.analysis_job import AnalysisJob, JobStatus
+from app.services import job_queue
+
+
+def _run(scenario):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            await scenario(sessions)
+        finally:
+            await engine.dispose()
+    asyncio.run(main())
+
+
+async def _status(sessions, job_id):
+    async with sessions() as db:
+        return (await db.execute(select(AnalysisJob).where(AnalysisJob.id == job_id))).scalar_one()
+
+
+async def _expire_lease(sessions, job_id):
+    async with sessions() as db:
+        await db.execute(
+            update(AnalysisJob).where(AnalysisJob.id == job_id)
+            .values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        await db.commit()
+
+
+def test_long_running_job_with_heartbeat_is_not_requeued(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_lease_seconds", 60)
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            await job_queue.enqueue_job(db, "p1", 1, 1, "/tmp/a.wav")
+            job = await job_queue.claim_next_job(db)
+        # started_at çok eski olsa da kira taze olduğu sürece iş yerinde kalır
+        async with sessions() as db:
+            await db.execute(
+                update(AnalysisJob).where(AnalysisJob.id == job.id)
+                .values(started_at=datetime.now(timezone.utc) - timedelta(hours=3))
+            )
+            await db.commit()
+            assert await job_queue.renew_lease(db, job)
+            assert await job_queue.requeue_stale_jobs(db) == 0
+        assert (await _status(sessions, job.id)).status == JobStatus.RUNNING
+
+    _run(scenario)
+
+
+def test_expired_lease_is_requeued_and_old_owner_cannot_finish(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_max_attempts", 2)
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            await job_queue.enqueue_job(db, "p2", 1, 1, "/tmp/a.wav")
+            stale = await job_queue.claim_next_job(db)
+        await _expire_lease(sessions, stale.id)
+        async with sessions() as db:
+            assert await job_queue.requeue_stale_jobs(db) == 1
+            fresh = await job_queue.claim_next_job(db)
+        assert fresh.id == stale.id and fresh.locked_by != stale.locked_by and fresh.attempts == 2
+
+        # Eski sahip artık kirayı yenileyemez, işi bitiremez ya da düşüremez
+        async with sessions() as db:
+            assert not await job_queue.renew_lease(db, stale)
+            assert not await job_queue.fail_job(db, stale, "eski worker")
+            assert not await job_queue.complete_job(db, stale, 99)
+        async with sessions() as db:
+            assert await job_queue.complete_job(db, fresh, 7)
+        job = await _status(sessions, stale.id)
+        assert job.status == JobStatus.COMPLETED and job.analysis_id == 7 and job.locked_by is None
+
+    _run(scenario)
+
+
+def test_complete_does_not_overwrite_failed(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_job_max_attempts", 1)
+
+    async def scenario(sessions):
+        async with sessions() as db:
+            await job_queue.enqueue_job(db, "p3", 1, 1, "/tmp/a.wav")
+            job = await job_queue.claim_next_job(db)
+        await _expire_lease(sessions, job.id)
+        async with sessions() as db:
+            await job_queue.requeue_stale_jobs(db)
+        assert (await _status(sessions, job.id)).status == JobStatus.FAILED
+        async with sessions() as db:
+            assert not await job_queue.complete_job(db, job, 5)
+        job = await _status(sessions, job.id)
+        assert job.status == JobStatus.FAILED and job.analysis_id is None
+
+    _run(scenario)
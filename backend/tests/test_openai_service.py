@@ -0,0 +1,70 @@
+"""GPT içerik/duygu analizi: başarısız çağrı varsayılan skorlar yerine hata verir"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services import openai_service as openai_module
+from app.services.http_clients import http_clients
+from app.services.openai_service import OpenAIService
+from app.services.resilience import Resilience
+
+FEATURES = {"duration": 30.0, "pitch": {"mean": 150.0, "std": 20.0}}
+
+
+def _completion(content: dict) -> dict:
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4",
+        "choices": [{
+            "index": 0, "finish_reason": "stop",
+            "message": {"role": "assistant", "content": json.dumps(content)}
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+@pytest.fixture
+def service(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "openai_base_url", stub_server.url + "/v1")
+    monkeypatch.setattr(settings, "resilience_max_attempts", 3)
+    monkeypatch.setattr(settings, "resilience_base_delay_seconds", 0.01)
+    monkeypatch.setattr(settings, "resilience_max_delay_seconds", 0.02)
+    # Paylaşılan "openai" devre kesicisi diğer testleri etkilemesin
+    monkeypatch.setattr(openai_module, "resilience", Resilience(str(tmp_path)))
+    return OpenAIService()
+
+
+def _analyze(service):
+    async def run():
+        try:
+            return await service.analyze_content_and_emotion("bugün parka gittim", FEATURES)
+        finally:
+            await http_clients.aclose()
+    return asyncio.run(run())
+
+
+def test_exhausted_retries_raise_instead_of_placeholders(service, stub_server):
+    stub_server.plan = [(500, {"error": {"message": "down"}})] * 3
+    with pytest.raises(Exception) as info:
+        _analyze(service)
+    assert "500" in str(info.value)
+    assert len(stub_server.hits) == 3
+
+
+def test_incomplete_response_raises(service, stub_server):
+    stub_server.plan = [(200, _completion({"emotion_analysis": {"tone": "nötr", "intensity": 4, "emotions": []}}))]
+    with pytest.raises(ValueError, match="content_analysis"):
+        _analyze(service)
+
+
+def test_valid_response_is_normalized(service, stub_server):
+    stub_server.plan = [(200, _completion({
+        "emotion_analysis": {"tone": "pozitif", "intensity": 6, "emotions": ["mutluluk"]},
+        "content_analysis": {"word_count": 3, "unique_words": 3, "anlatim_bicimi": {"akicilik": "yüksek", "tutarlilik": "orta"}}
+    }))]
+    result = _analyze(service)
+    assert result["emotion_analysis"]["intensity"] == 6
+    assert result["content_analysis"] == {
+        "word_count": 3, "unique_words": 3, "fluency_score": 8, "coherence_score": 5
+    }
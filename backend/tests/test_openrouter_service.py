@@ -0,0 +1,122 @@
+"""Tek çağrılı LLM analizi: JSON yanıtı akışla alınırken rapor bölümleri iletilir"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services import openrouter_service as openrouter_module
+from app.services import progress_store
+from app.services.http_clients import http_clients
+from app.services.llm_schemas import ReportSectionStream, parse_combined_analysis
+from app.services.openrouter_service import OpenRouterService
+from app.services.progress_store import ReportStream
+from app.services.resilience import Resilience
+
+COMBINED = {
+    "emotion_analysis": {"tone": "nötr", "intensity": 4, "emotions": ["kaygı"]},
+    "content_analysis": {"word_count": 120, "unique_words": 70, "fluency_score": 6, "coherence_score": 7},
+    "linguistic_indicators": {"sentence_complexity": "orta", "repetitions": 1, "incomplete_sentences": 0},
+    "report_sections": [
+        {"title": "## 1. ÖZET VE GENEL DEĞERLENDİRME ", "content": "  Konuşma **akıcı**; \"duraklama\" az.\n\n"},
+        {"title": "2. AKUSTİK", "content": "- F0 ortalaması 150 Hz 🙂\n- Jitter {normal} [aralıkta]\t"},
+    ],
+}
+
+
+def _sse(content: str, chunk_size: int) -> bytes:
+    lines = [": OPENROUTER PROCESSING", ""]
+    for i in range(0, len(content), chunk_size):
+        chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + chunk_size]}}]}
+        lines += [f"data: {json.dumps(chunk)}", ""]
+    lines += ["data: [DONE]", ""]
+    return "\n".join(lines).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_section_stream_matches_report_text(chunk_size):
+    raw = "```json\n" + json.dumps(COMBINED, indent=2) + "\n```"
+    parts = []
+    sections = ReportSectionStream(parts.append)
+    for i in range(0, len(raw), chunk_size):
+        sections.feed(raw[i:i + chunk_size])
+    assert "".join(parts) == parse_combined_analysis(raw).report_text()
+
+
+@pytest.fixture
+def service(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "openrouter_stream", True)
+    monkeypatch.setattr(settings, "resilience_max_attempts", 2)
+    monkeypatch.setattr(settings, "resilience_base_delay_seconds", 0.01)
+    monkeypatch.setattr(settings, "resilience_max_delay_seconds", 0.02)
+    monkeypatch.setattr(openrouter_module, "resilience", Resilience(str(tmp_path)))
+    service = OpenRouterService()
+    service.base_url = stub_server.url
+    return service
+
+
+def _combined(service, progress_id):
+    async def run():
+        queue = progress_store.subscribe(progress_id)
+        try:
+            result = await service.generate_combined_analysis(
+                participant_info={"name": "K", "age": 70, "gender": "f", "group_type": "control", "mmse_score": None},
+                transcript="bugün parka gittim",
+                acoustic_features={"duration": 30.0},
+                advanced_acoustic={},
+                linguistic_analysis={},
+                report_stream=ReportStream(progress_id, 0.0)
+            )
+        finally:
+            progress_store.unsubscribe(progress_id, queue)
+            await http_clients.aclose()
+        deltas = []
+        while not queue.empty():
+            event, data = queue.get_nowait()
+            if event == progress_store.REPORT_DELTA_EVENT:
+                deltas.append(data)
+        return result, deltas
+    return asyncio.run(run())
+
+
+def test_single_call_streams_report_deltas(service, stub_server):
+    stub_server.plan = [(200, _sse(json.dumps(COMBINED), 7), {"content-type": "text/event-stream"})]
+    progress_id = "tek-cagri-akis"
+    try:
+        result, deltas = _combined(service, progress_id)
+        report = result["clinical_report"]
+        assert report.startswith("## 1. ÖZET VE GENEL DEĞERLENDİRME\n\nKonuşma **akıcı**")
+        assert result["content_emotion"]["emotion_analysis"]["tone"] == "nötr"
+        assert json.loads(stub_server.hits[0][2])["stream"] is True
+
+        # İlk mesaj sıfırlama; metin birden fazla parça halinde ve düzeltmesiz gelir
+        assert deltas[0] == {"offset": 0, "delta": ""}
+        assert len(deltas) > 3
+        assert all(d["offset"] == sum(len(p["delta"]) for p in deltas[:i]) for i, d in enumerate(deltas))
+        assert progress_store.get_report_text(progress_id) == report
+    finally:
+        progress_store.clear_progress(progress_id)
+
+
+def test_invalid_streamed_response_resets_client_text(service, stub_server):
+    broken = dict(COMBINED, content_analysis={"word_count": -1})
+    stub_server.plan = [(200, _sse(json.dumps(broken), 16), {"content-type": "text/event-stream"})]
+    progress_id = "tek-cagri-hata"
+    try:
+        with pytest.raises(ValueError, match="semaya uymuyor"):
+            _combined(service, progress_id)
+        # Yarım metin istemcide kalmaz; iki çağrılı yol raporu baştan yazar
+        assert progress_store.get_report_text(progress_id) == ""
+    finally:
+        progress_store.clear_progress(progress_id)
+
+
+def test_finish_corrects_only_the_differing_tail():
+    progress_id = "rapor-duzeltme"
+    stream = ReportStream(progress_id, 0.0)
+    stream.reset()
+    stream.feed("## Başlık\n\nİçerik sonu")
+    stream.finish("## Başlık\n\nİçerik tamam")
+    assert progress_store.get_report_text(progress_id) == "## Başlık\n\nİçerik tamam"
+    assert stream.offset == len("## Başlık\n\nİçerik tamam")
+    progress_store.clear_progress(progress_id)
@@ -0,0 +1,100 @@
+"""Paralel (parçalı) pitch takibi: parça sınırlarında tek geçişle tutarlılık"""
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+pytest.importorskip("parselmouth")
+
+from app.core.config import settings
+from app.services.audio_buffer import AudioBuffer
+from app.services import pitch_tracker
+from app.services.pitch_tracker import (
+    CHUNK_OVERLAP_SECONDS, plan_pitch_chunks, track_pitch, track_pitch_parallel
+)
+
+SR = 16000
+CHUNKS = 3
+
+
+def _utterances(seconds: int = 95) -> np.ndarray:
+    """2.5 sn harmonik ses + 0.5 sn sessizlik bloklarından oluşan kayıt (F0 120-180 Hz)"""
+    parts, k = [], 0
+    while sum(len(p) for p in parts) < seconds * SR:
+        f0 = 120 + 15 * (k % 5)
+        t = np.arange(int(2.5 * SR)) / SR
+        parts.append(sum(0.3 / h * np.sin(2 * np.pi * h * f0 * t) for h in range(1, 5)))
+        parts.append(np.zeros(int(0.5 * SR)))
+        k += 1
+    return np.concatenate(parts)[:seconds * SR].astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def audio():
+    return AudioBuffer(_utterances(), SR)
+
+
+@pytest.fixture(autouse=True)
+def parallel_chunks(monkeypatch):
+    # Havuz başlatılmadığı için process_pool.run parçaları thread'de çalıştırır
+    monkeypatch.setattr(settings, "pitch_parallel_chunks", CHUNKS)
+
+
+def _seams(audio):
+    bounds = plan_pitch_chunks(audio, CHUNKS)
+    assert len(bounds) == CHUNKS + 1
+    return np.array(bounds[1:-1]) / SR
+
+
+def test_split_points_fall_in_silence(audio):
+    for seam in _seams(audio):
+        i = int(seam * SR)
+        assert np.max(np.abs(audio.samples[i - 80:i + 80])) == 0
+
+
+def test_yin_chunks_match_single_pass(audio):
+    single = track_pitch(audio, None, "yin")
+    parallel = asyncio.run(track_pitch_parallel(audio, None, "yin"))
+
+    # librosa motorları global STFT ızgarasını kullanır: kareler birebir aynı
+    np.testing.assert_array_equal(parallel["times"], single["times"])
+    np.testing.assert_array_equal(parallel["f0"] > 0, single["f0"] > 0)
+    np.testing.assert_allclose(parallel["f0"], single["f0"], rtol=1e-5)
+
+
+def test_praat_chunks_have_no_seam_discontinuity(audio):
+    single = track_pitch(audio, None, "praat")
+    parallel = asyncio.run(track_pitch_parallel(audio, None, "praat"))
+    times, f0 = parallel["times"], parallel["f0"]
+
+    # Praat her pencerede kare ızgarasını ortalar; parçaların ızgara fazı
+    # kayabilir ama sınırda kare tekrarı ya da boşluk olmamalı
+    steps = np.diff(times)
+    assert steps.min() > 0
+    assert steps.max() <= 0.01 + 1e-9
+
+    # Tek geçiş izi parçalı kare zamanlarına enterpole edilir; ses/sessizlik
+    # geçişlerindeki (faz kaymasından etkilenen) kareler hariç tutulur
+    expected = np.interp(times, single["times"], single["f0"])
+    neighbours_voiced = (
+        (np.interp(times - 0.01, single["times"], single["f0"]) > 0)
+        & (np.interp(times + 0.01, single["times"], single["f0"]) > 0)
+    )
+    both = (expected > 0) & (f0 > 0) & neighbours_voiced
+    assert np.max(np.abs(f0[both] - expected[both]) / expected[both]) < 0.005
+    assert np.mean((expected > 0) == (f0 > 0)) > 0.99
+
+    # Parça sınırları çevresinde (bağlam payı içinde) sesli kareler korunur
+    for seam in _seams(audio):
+        near = np.abs(times - seam) <= CHUNK_OVERLAP_SECONDS
+        assert np.count_nonzero(f0[near] > 0) == pytest.approx(
+            np.count_nonzero(expected[near] > 0), abs=2
+        )
+
+
+def test_short_recording_uses_single_pass(monkeypatch):
+    short = AudioBuffer(_utterances(20), SR)
+    monkeypatch.setattr(pitch_tracker, "plan_pitch_chunks", lambda *a, **k: pytest.fail("bölünmemeli"))
+    result = asyncio.run(track_pitch_parallel(short, None, "praat"))
+    np.testing.assert_array_equal(result["f0"], track_pitch(short, None, "praat")["f0"])
@@ -0,0 +1,81 @@
+"""CPU havuzu: bozulan havuzun yenilenmesi ve event loop'un bloklanmaması"""
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.process_pool import ProcessPoolService
+
+# Alt process'te ~1 sn süren, pickle edilebilir (yerleşik) CPU işi
+CPU_BURN = (sum, range(40_000_000))
+
+
+@pytest.fixture
+def pool():
+    service = ProcessPoolService()
+    service.start(1)
+    yield service
+    service.shutdown()
+
+
+def test_concurrent_broken_pool_callers_restart_once(pool):
+    broken = pool._executor
+
+    async def main():
+        results = await asyncio.gather(
+            pool.run(os._exit, 1), pool.run(os._exit, 1), return_exceptions=True
+        )
+        assert all(isinstance(r, BrokenProcessPool) for r in results)
+        fresh = pool._executor
+        assert fresh is not None and fresh is not broken
+        # Bozulmayı geç gören çağıran yeni havuzu kapatmamalı
+        pool._restart(broken)
+        assert pool._executor is fresh
+        assert await pool.run(abs, -3) == 3
+
+    asyncio.run(main())
+
+
+def test_auth_me_latency_stays_flat_during_cpu_work(pool):
+    from app.api.dependencies import get_current_user
+    from app.main import app
+
+    user = SimpleNamespace(
+        id=1, email="a@b.c", is_verified=True, has_consented=True, created_at=datetime.now(timezone.utc)
+    )
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    async def measure(client, count):
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get("/api/auth/me")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            await asyncio.sleep(0.01)
+        return latencies
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await pool.run(abs, -1)  # havuz process'ini ısıt
+            idle = await measure(client, 20)
+            burn = asyncio.ensure_future(pool.run(*CPU_BURN))
+            loaded = await measure(client, 20)
+            assert not burn.done(), "CPU işi ölçüm boyunca sürmeli"
+            await burn
+        return idle, loaded
+
+    try:
+        idle, loaded = asyncio.run(main())
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert max(loaded) < 0.1
+    assert statistics.median(loaded) < statistics.median(idle) + 0.02
@@ -0,0 +1,57 @@
+"""Bellek içi progress kaydı"""
+import asyncio
+
+from app.api.routes import analyze
+from app.services import progress_store
+
+
+def test_rejected_upload_progress_is_cleared(monkeypatch):
+    monkeypatch.setattr(progress_store, "CLEAR_DELAY_SECONDS", 0.05)
+
+    async def main():
+        queue = progress_store.subscribe("rejected")
+        analyze._reject_progress("rejected", "Dosya çok büyük")
+        event, data = queue.get_nowait()
+        assert event is None and data["status"] == "error"
+        assert progress_store.get_progress("rejected")["message"] == "Dosya çok büyük"
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert progress_store.get_progress("rejected") is None
+    assert "rejected" not in progress_store._subscribers
+
+
+def test_step_completes_only_when_all_its_stages_complete():
+    progress_id = "stages"
+    progress_store.register_stages(progress_id, {"audio_buffer": 2, "pitch_track": 2, "acoustic_features": 2, "transcript": 4})
+    try:
+        progress_store.set_stage_state(progress_id, 2, "running", stage="audio_buffer")
+        progress_store.set_stage_state(progress_id, 4, "running", stage="transcript")
+        progress_store.set_stage_state(progress_id, 2, "completed", stage="audio_buffer")
+        progress_store.set_stage_state(progress_id, 2, "running", stage="pitch_track")
+        progress_store.set_stage_state(progress_id, 2, "completed", stage="pitch_track")
+        # acoustic_features henüz başlamadı: adım 2 tamamlanmış görünmemeli
+        assert progress_store.get_progress(progress_id)["stage_states"]["2"] == "running"
+
+        progress_store.set_stage_state(progress_id, 2, "running", stage="acoustic_features")
+        progress_store.set_stage_state(progress_id, 4, "completed", stage="transcript")
+        progress = progress_store.get_progress(progress_id)
+        assert progress["stage_states"]["2"] == "running"
+        assert progress["stage_states"]["4"] == "completed"
+        assert progress["current_step"] == 2
+
+        progress_store.set_stage_state(progress_id, 2, "completed", stage="acoustic_features")
+        assert progress_store.get_progress(progress_id)["stage_states"]["2"] == "completed"
+        assert progress_store.get_progress(progress_id)["stage_states"]["3"] == "pending"
+    finally:
+        progress_store.clear_progress(progress_id)
+
+
+def test_step_with_only_skipped_stages_is_skipped():
+    progress_id = "skipped"
+    progress_store.register_stages(progress_id, {"clinical_report": 7})
+    try:
+        progress_store.set_stage_state(progress_id, 7, "skipped", stage="clinical_report")
+        assert progress_store.get_progress(progress_id)["stage_states"]["7"] == "skipped"
+    finally:
+        progress_store.clear_progress(progress_id)
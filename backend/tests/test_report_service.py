@@ -0,0 +1,33 @@
+"""PDF rapor tablosu: eski (tempo) ve yeni (hece hızı) analizler"""
+import pytest
+
+pytest.importorskip("reportlab")
+
+from app.services.report_service import ReportService
+
+ACOUSTIC = {"duration": 12.0, "pitch": {"mean": 180.0, "std": 20.0}, "energy": {"mean": 0.05}, "spectral": {"centroid": 1500.0}}
+ADVANCED = {"jitter": {"local": 0.01}, "shimmer": {"local": 0.05}, "hnr": 15.0, "formants": {"F1": 500.0, "F2": 1500.0},
+            "pause_analysis": {"pause_count": 3, "avg_pause_duration": 0.4, "longest_pause": 0.9}}
+
+
+def _rows(acoustic, advanced):
+    return {row[0]: row[1] for row in ReportService._acoustic_rows(acoustic, advanced)[1:]}
+
+
+def test_new_analysis_shows_syllable_rates():
+    advanced = {**ADVANCED, "syllable_rate": {"speech_rate": 3.21, "articulation_rate": 4.5}}
+    rows = _rows(ACOUSTIC, advanced)
+    assert rows["Konuşma Hızı"] == "3.21 hece/sn"
+    assert rows["Artikülasyon Hızı"] == "4.50 hece/sn"
+    assert "Tempo" not in rows
+
+
+def test_old_analysis_falls_back_to_tempo():
+    rows = _rows({**ACOUSTIC, "tempo": 117.45}, ADVANCED)
+    assert rows["Tempo"] == "117.45 BPM"
+    assert "Konuşma Hızı" not in rows
+
+
+def test_old_analysis_without_advanced_features():
+    rows = _rows({**ACOUSTIC, "tempo": 99.0}, None)
+    assert rows["Tempo"] == "99.00 BPM" and "HNR" not in rows
@@ -0,0 +1,114 @@
+"""Yeniden deneme / devre kesici: yerel sahte sunucuya hata enjeksiyonu"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.resilience import CircuitOpenError, Resilience
+
+
+@pytest.fixture
+def res(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "resilience_max_attempts", 4)
+    monkeypatch.setattr(settings, "resilience_base_delay_seconds", 0.01)
+    monkeypatch.setattr(settings, "resilience_max_delay_seconds", 0.05)
+    monkeypatch.setattr(settings, "resilience_breaker_failures", 3)
+    monkeypatch.setattr(settings, "resilience_breaker_reset_seconds", 0.3)
+    return Resilience(str(tmp_path))
+
+
+def _request(client, url):
+    async def _do():
+        response = await client.post(url, json={})
+        response.raise_for_status()
+        return response.json()
+    return _do
+
+
+def test_retry_after_is_honoured(res, stub_server):
+    stub_server.plan = [(429, {}, {"Retry-After": "0.4"}), (503, {}), (200, {"ok": 1})]
+
+    async def main():
+        async with httpx.AsyncClient() as client:
+            return await res.call("stub", _request(client, stub_server.url))
+
+    assert asyncio.run(main()) == {"ok": 1}
+    assert len(stub_server.hits) == 3
+    assert stub_server.hits[1][1] - stub_server.hits[0][1] >= 0.35
+    stats = res.stats()["stub"]
+    assert stats["retries"] == 2 and stats["retry_after_waits"] == 1 and stats["successes"] == 1
+
+
+def test_permanent_error_is_not_retried(res, stub_server):
+    stub_server.plan = [(400, {"error": "bad"})]
+
+    async def main():
+        async with httpx.AsyncClient() as client:
+            await res.call("stub", _request(client, stub_server.url))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(main())
+    assert len(stub_server.hits) == 1
+    assert res.breaker("stub").state == "closed"
+
+
+def test_breaker_opens_and_recovers(res, stub_server):
+    stub_server.plan = [(500, {})] * 10
+
+    async def main():
+        async with httpx.AsyncClient() as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await res.call("stub", _request(client, stub_server.url))
+            assert res.breaker("stub").state == "open"
+            hits = len(stub_server.hits)
+            started = time.monotonic()
+            with pytest.raises(CircuitOpenError):
+                await res.call("stub", _request(client, stub_server.url))
+            assert len(stub_server.hits) == hits
+            assert time.monotonic() - started < 0.1
+
+            await asyncio.sleep(0.35)
+            stub_server.plan = [(200, {"ok": 2})]
+            assert await res.call("stub", _request(client, stub_server.url)) == {"ok": 2}
+            assert res.breaker("stub").state == "closed"
+
+    asyncio.run(main())
+    assert res.stats()["stub"]["breaker_opens"] == 1
+
+
+def test_cancelled_half_open_trial_releases_breaker(res, stub_server):
+    stub_server.plan = [(500, {})] * 3
+
+    async def main():
+        async with httpx.AsyncClient() as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await res.call("stub", _request(client, stub_server.url))
+            await asyncio.sleep(0.35)
+
+            # Half-open deneme çağrısı yanıt beklerken iptal edilir
+            stub_server.plan = [("sleep", 1.0)]
+            trial = asyncio.create_task(res.call("stub", _request(client, stub_server.url)))
+            await asyncio.sleep(0.1)
+            assert res.breaker("stub").state == "half_open"
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            # Sonraki çağrı yeni deneme hakkını alabilmeli
+            stub_server.plan = [(200, {"ok": 3})]
+            assert await res.call("stub", _request(client, stub_server.url)) == {"ok": 3}
+            assert res.breaker("stub").state == "closed"
+
+    asyncio.run(main())
+
+
+def test_stats_are_persisted_per_process(res, stub_server):
+    async def main():
+        async with httpx.AsyncClient() as client:
+            await res.call("stub", _request(client, stub_server.url))
+
+    asyncio.run(main())
+    totals = res.load_all_stats()["totals"]
+    assert totals["stub"]["calls"] == 1 and totals["stub"]["successes"] == 1
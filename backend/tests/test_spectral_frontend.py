@@ -0,0 +1,49 @@
+"""Paylaşılan spektral ön yüz: y= ile hesaplanan librosa özellikleriyle eşleşme"""
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+
+from app.services.audio_buffer import AudioBuffer
+from app.services.spectral_frontend import SPECTRAL_SR, SpectralFrontEnd
+from app.services.streaming_features import spectral_windows
+
+
+def _speech_like(sr: int, seconds: float = 4.0) -> np.ndarray:
+    """Sessizlik, ani başlayan ton ve gürültü blokları (kenarlar duraklama analizini zorlar)"""
+    rng = np.random.default_rng(7)
+    t = np.arange(int(sr * 0.8)) / sr
+    blocks = [
+        np.zeros(int(sr * 0.5)),
+        0.4 * np.sin(2 * np.pi * 180 * t) * (1 + 0.3 * np.sin(2 * np.pi * 3 * t)),
+        np.zeros(int(sr * 0.3)),
+        rng.normal(0, 0.05, int(sr * 0.6)),
+        np.zeros(int(sr * (seconds - 2.2))),
+    ]
+    return np.concatenate(blocks).astype(np.float32)
+
+
+def test_rms_matches_time_domain_librosa():
+    y = _speech_like(SPECTRAL_SR)
+    expected = librosa.feature.rms(y=y)[0]
+    np.testing.assert_allclose(SpectralFrontEnd(y, SPECTRAL_SR).rms, expected, rtol=1e-5, atol=1e-7)
+
+
+def test_spectral_features_match_y_based_librosa():
+    y = _speech_like(SPECTRAL_SR)
+    front = SpectralFrontEnd(y, SPECTRAL_SR)
+    np.testing.assert_allclose(front.mfcc(13), librosa.feature.mfcc(y=y, sr=SPECTRAL_SR, n_mfcc=13), rtol=1e-3, atol=1e-3)
+    np.testing.assert_allclose(
+        front.spectral_centroid(), librosa.feature.spectral_centroid(y=y, sr=SPECTRAL_SR)[0], rtol=1e-4, atol=1e-3
+    )
+
+
+def test_streaming_windows_rms_match_whole_file(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "streaming_window_seconds", 1.0)
+    y = _speech_like(SPECTRAL_SR)
+    audio = AudioBuffer(y, SPECTRAL_SR)
+    whole = audio.spectral(SPECTRAL_SR).rms
+    windowed = np.concatenate([window.rms for window in spectral_windows(audio)])
+    assert len(windowed) == len(whole)
+    np.testing.assert_allclose(windowed, whole, rtol=1e-5, atol=1e-7)
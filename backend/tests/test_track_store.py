@@ -0,0 +1,180 @@
+"""Kare izi deposu: sürüm anahtarları, boyut sınırı ve analiz silinince temizlik"""
+import asyncio
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.advanced_audio_service import AdvancedAudioService
+from app.models.analysis import Analysis
+from app.models.analysis_job import AnalysisJob, JobStatus
+from app.services.track_store import TrackStore, track_store
+
+SHA = "cd" * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TrackStore(str(tmp_path))
+
+
+def test_tracks_are_isolated_by_version(store):
+    times = np.arange(100) * 0.01
+    store.save(SHA, "v1", "intensity", times, np.full(100, 60.0))
+    store.save(SHA, "v2", "intensity", times, np.full(100, 70.0))
+
+    assert store.read_slice(SHA, "v1", "intensity")["values"][0] == 60.0
+    assert store.read_slice(SHA, "v2", "intensity")["values"][0] == 70.0
+    assert store.read_slice(SHA, "v3", "intensity") is None
+    assert not store.has(SHA, "v3", "intensity")
+
+
+def test_list_tracks_uses_requested_versions(store):
+    times = np.arange(50) * 0.01
+    store.save_all(SHA, "adv", {
+        "rms": {"times": times, "values": np.ones(50)},
+        "syllable_nuclei": {"times": times[::10]},
+    })
+    store.save(SHA, "old-pitch", "pitch", times, np.full(50, 120.0))
+
+    listed = store.list_tracks(SHA, {"rms": "adv", "syllable_nuclei": "adv", "pitch": "new-pitch"})
+    assert [t["name"] for t in listed] == ["rms", "syllable_nuclei"]
+    assert listed[0]["frames"] == 50 and listed[0]["dtype"] == "float16"
+    assert listed[1]["frames"] == 5 and listed[1]["dtype"] is None
+
+
+@pytest.mark.parametrize("name, value, tracks", [
+    ("pitch_floor", 60.0, {"pitch", "intensity"}),
+    ("pitch_engine", "yin", {"pitch", "formants"}),
+    ("pause_min_duration", 0.5, {"pauses", "rms"}),
+    ("vad_enabled", not settings.vad_enabled, {"intensity", "syllable_nuclei"}),
+])
+def test_track_versions_follow_settings(monkeypatch, name, value, tracks):
+    before = AdvancedAudioService.track_versions()
+    monkeypatch.setattr(settings, name, value)
+    after = AdvancedAudioService.track_versions()
+    for track in tracks:
+        assert after[track] != before[track]
+
+
+def test_eviction_keeps_recently_used_tracks(tmp_path):
+    times = np.arange(1000) * 0.01
+    values = np.zeros(1000)
+    probe = TrackStore(str(tmp_path / "probe"))
+    probe.save(SHA, "v", "pitch", times, values)
+    entry_bytes = probe._entries()[0][1]
+
+    store = TrackStore(str(tmp_path / "store"), max_bytes=int(entry_bytes * 2.5))
+    shas = [f"{i:02d}" * 32 for i in range(3)]
+    for i, sha in enumerate(shas[:2]):
+        store.save(sha, "v", "pitch", times, values)
+        os.utime(store._dir(sha, "v"), (1000 + i, 1000 + i))
+    # İlk kayıt okunur (LRU'da en yeniye geçer); üçüncü yazılınca ikinci silinir
+    assert store.read_slice(shas[0], "v", "pitch") is not None
+    store.save(shas[2], "v", "pitch", times, values)
+
+    assert store.has(shas[0], "v", "pitch")
+    assert not store.has(shas[1], "v", "pitch")
+    assert store.has(shas[2], "v", "pitch")
+    assert not os.path.exists(store._sha_dir(shas[1]))
+
+
+def test_delete_removes_every_version(store):
+    store.save(SHA, "v1", "pitch", np.arange(5) * 0.01, np.ones(5))
+    store.save(SHA, "v2", "pitch", np.arange(5) * 0.01, np.ones(5))
+    store.delete(SHA)
+    assert not store.has(SHA, "v1", "pitch") and not store.has(SHA, "v2", "pitch")
+    assert not os.path.exists(store._sha_dir(SHA))
+
+
+@pytest.fixture
+def shared_store(tmp_path, monkeypatch):
+    # Uç noktaların kullandığı depo geçici dizine yönlendirilir
+    monkeypatch.setattr(track_store, "root", str(tmp_path))
+    return track_store
+
+
+def _api(scenario):
+    """Sonuç uç noktalarını SQLite veritabanı ve geçici iz deposuyla çalıştır"""
+    pytest.importorskip("aiosqlite")
+    import httpx
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from app.api.dependencies import get_current_user
+    from app.core.database import Base, get_db
+    from app.main import app
+
+    user = SimpleNamespace(id=1, email="a@b.c", is_verified=True, has_consented=True)
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def db_override():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = db_override
+        app.dependency_overrides[get_current_user] = lambda: user
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await scenario(client, sessions)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            app.dependency_overrides.pop(get_current_user, None)
+            await engine.dispose()
+    asyncio.run(main())
+
+
+async def _add_analysis(sessions, progress_id, track_versions):
+    async with sessions() as db:
+        analysis = Analysis(user_id=1, participant_id=1, audio_path="/yok.wav", track_versions=track_versions)
+        db.add(analysis)
+        await db.flush()
+        db.add(AnalysisJob(
+            progress_id=progress_id, user_id=1, participant_id=1, audio_path="/yok.wav",
+            audio_sha256=SHA, status=JobStatus.COMPLETED, analysis_id=analysis.id
+        ))
+        await db.commit()
+        return analysis.id
+
+
+def test_tracks_are_read_with_recorded_versions_after_config_change(shared_store, monkeypatch):
+    versions = AdvancedAudioService.track_versions()
+    track_store.save(SHA, versions["pitch"], "pitch", np.arange(10) * 0.01, np.full(10, 150.0))
+
+    async def scenario(client, sessions):
+        analysis_id = await _add_analysis(sessions, "p1", versions)
+        # Ayar değişince yeni analizler başka sürüme yazar; eskisi kendi sürümüyle okunur
+        monkeypatch.setattr(settings, "pitch_ceiling", settings.pitch_ceiling + 100)
+        monkeypatch.setattr(AdvancedAudioService, "FEATURE_VERSION", "yeni")
+
+        listed = (await client.get(f"/api/results/{analysis_id}/tracks")).json()["tracks"]
+        assert [t["name"] for t in listed] == ["pitch"]
+        response = await client.get(f"/api/results/{analysis_id}/tracks/pitch")
+        assert response.status_code == 200
+        assert response.json()["values"] == [150.0] * 10
+
+    _api(scenario)
+
+
+def test_delete_analysis_removes_unshared_tracks(shared_store):
+    versions = AdvancedAudioService.track_versions()
+    track_store.save(SHA, versions["pitch"], "pitch", np.arange(10) * 0.01, np.full(10, 150.0))
+
+    async def scenario(client, sessions):
+        first = await _add_analysis(sessions, "p1", versions)
+        second = await _add_analysis(sessions, "p2", versions)
+
+        assert (await client.delete(f"/api/results/{first}")).status_code == 200
+        # Aynı sesi kullanan analiz kaldığı için izler durur
+        assert track_store.has(SHA, versions["pitch"], "pitch")
+
+        assert (await client.delete(f"/api/results/{second}")).status_code == 200
+        assert not track_store.has(SHA, versions["pitch"], "pitch")
+
+    _api(scenario)
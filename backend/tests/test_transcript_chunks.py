@@ -0,0 +1,112 @@
+"""Parçalı Whisper transkripsiyonu: örtüşme ayıklama ve sahte sunucuya karşı uçtan uca birleştirme"""
+import asyncio
+import re
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.http_clients import http_clients
+from app.services.openai_service import OpenAIService
+from app.services.transcript_chunks import _overlap, plan_transcript_chunks, stitch_transcripts
+
+# Kaydın gerçek metni; parçalar örtüşen kelime aralıklarıdır
+SENTENCE = (
+    "bugün sabah erkenden kalktım kahvaltımı yaptım ve sonra torunumla birlikte "
+    "parka yürüyüşe çıktık hava çok güzeldi güneş parlıyordu kuşlar ötüyordu "
+    "eve dönünce biraz dinlendim öğleden sonra komşumuz ziyarete geldi çay içtik"
+).split()
+# (başlangıç, bitiş) kelime indeksleri; ardışık parçalar 2-4 kelime örtüşür
+SPANS = [(0, 10), (8, 19), (16, 27), (23, len(SENTENCE))]
+
+
+def _words(i: int, j: int) -> str:
+    return " ".join(SENTENCE[i:j])
+
+
+def test_overlap_finds_repeated_words():
+    assert _overlap(["a", "b", "c", "d"], ["c", "d", "e"]) == (0, 2, 2)
+    # Tek ortak kelime tesadüf sayılır
+    assert _overlap(["a", "b", "ve"], ["ve", "c"]) == (0, 0, 0)
+
+
+def test_overlap_tolerates_cut_words_and_punctuation():
+    # prev'in son kelimesi sınırda yarım kalmış, nxt noktalama ve büyük harfle başlıyor
+    drop_prev, drop_next, matched = _overlap(["çay", "içtik", "sonra", "ev"], ["İçtik,", "sonra", "evde"])
+    assert matched == 2
+    assert (drop_prev, drop_next) == (1, 2)
+    # nxt'in ilk kelimesi yarım
+    assert _overlap(["bir", "iki", "üç"], ["ki", "iki", "üç", "dört"]) == (0, 3, 2)
+
+
+def test_stitch_removes_overlap():
+    parts = [_words(i, j) for i, j in SPANS]
+    assert stitch_transcripts(parts) == " ".join(SENTENCE)
+    assert stitch_transcripts(["", None, "tek parça"]) == "tek parça"
+
+
+def test_plan_cuts_in_longest_silence(monkeypatch):
+    monkeypatch.setattr(settings, "whisper_chunk_seconds", 10.0)
+    monkeypatch.setattr(settings, "whisper_chunk_overlap_seconds", 1.0)
+    # 0-30 sn konuşma; 7-8 sn arası uzun, 6 sn civarı kısa sessizlik
+    regions = [[0.0, 5.9], [6.1, 7.0], [8.0, 16.5], [17.5, 30.0]]
+    chunks = plan_transcript_chunks({"regions": regions, "duration": 30.0})
+    assert chunks[0] == (0.0, pytest.approx(8.5))
+    assert chunks[1][0] == pytest.approx(6.5)
+    assert chunks[-1][1] == 30.0
+    for (a0, a1), (b0, b1) in zip(chunks[:-1], chunks[1:]):
+        assert b0 < a1  # örtüşme
+        assert a1 - b0 == pytest.approx(2.0)
+
+
+class _WhisperStub:
+    """Gönderilen parça dosyasının içeriğine göre o parçanın metnini döndürür; eşzamanlılığı ölçer"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path, body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            index = int(re.search(rb"CHUNK-(\d+)", body).group(1))
+            assert path.endswith("/audio/transcriptions")
+            return 200, _words(*SPANS[index]).encode(), {"content-type": "text/plain"}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+def test_transcribe_chunks_against_stub(stub_server, tmp_path, monkeypatch, concurrency):
+    monkeypatch.setattr(settings, "openai_base_url", stub_server.url + "/v1")
+    monkeypatch.setattr(settings, "whisper_max_concurrency", concurrency)
+    stub = _WhisperStub(delay=0.15)
+    stub_server.responder = stub
+
+    paths = []
+    for i in range(len(SPANS)):
+        path = tmp_path / f"kayit.whisper.{i:03d}.flac"
+        path.write_bytes(b"fLaC" + f"CHUNK-{i}".encode())
+        paths.append(str(path))
+
+    async def run():
+        try:
+            return await OpenAIService().transcribe_audio(
+                str(tmp_path / "kayit.wav"), audio_sha256=None, chunk_paths=paths
+            )
+        finally:
+            await http_clients.aclose()
+
+    transcript = asyncio.run(run())
+
+    assert transcript == " ".join(SENTENCE)
+    assert len(stub_server.hits) == len(SPANS)
+    # Parçalar eşzamanlı gönderilir ama WHISPER_MAX_CONCURRENCY aşılmaz
+    assert stub.max_in_flight == min(concurrency, len(SPANS))
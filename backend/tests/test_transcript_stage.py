@@ -0,0 +1,73 @@
+"""Transkripsiyon stage'i: Whisper boyut sınırını aşan kırpılmış ses parçalı gönderilir"""
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("scipy")
+
+from app.core.config import settings
+from app.services import analysis_pipeline
+from app.services.audio_buffer import AudioBuffer
+from app.services.vad import detect_speech_regions
+
+SR = 16000
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "vad_enabled", True)
+    rng = np.random.default_rng(1)
+    silence = np.zeros(10 * SR, dtype=np.float32)
+    # Gürültü FLAC'ta iyi sıkışmaz: 80 sn ~ 2 MB
+    speech = (0.3 * rng.standard_normal(80 * SR)).astype(np.float32)
+    y = np.concatenate([silence, speech, silence])
+    audio_path = str(tmp_path / "kayit.canonical.wav")
+    sf.write(audio_path, y, SR, subtype="PCM_16")
+    audio = AudioBuffer(y, SR)
+    return audio_path, audio, detect_speech_regions(audio)
+
+
+def _fake_transcribe(calls, limit):
+    async def transcribe_audio(audio_path, language="tr", audio_sha256=None, chunk_paths=None):
+        sizes = [os.path.getsize(p) for p in (chunk_paths or [audio_path])]
+        calls.append({"audio_path": audio_path, "chunk_paths": list(chunk_paths or []), "sizes": sizes})
+        assert max(sizes) <= limit
+        return "metin"
+    return transcribe_audio
+
+
+def test_oversized_speech_clip_falls_back_to_chunks(recording, monkeypatch):
+    audio_path, audio, speech = recording
+    limit = 1_500_000
+    monkeypatch.setattr(settings, "max_file_size", limit)
+    calls = []
+    monkeypatch.setattr(analysis_pipeline.openai_service, "transcribe_audio", _fake_transcribe(calls, limit))
+    # Kanonik dosya sınırı aşsa da süre tek parçalık: ilk kontrol bölmez, kırpılmış ses yazılır
+    assert os.path.getsize(audio_path) > limit
+
+    result = asyncio.run(analysis_pipeline._transcript_stage(audio_path, None, audio, speech))
+
+    assert result == "metin"
+    assert len(calls) == 1
+    assert len(calls[0]["chunk_paths"]) > 1
+    # Geçici kırpma ve parça dosyaları temizlenir
+    assert not any(os.path.exists(p) for p in calls[0]["chunk_paths"])
+    assert not os.listdir(os.path.join(settings.upload_dir, "pcm"))
+
+
+def test_clip_under_limit_is_sent_whole(recording, monkeypatch):
+    audio_path, audio, speech = recording
+    monkeypatch.setattr(settings, "max_file_size", 25 * 1024 * 1024)
+    calls = []
+    monkeypatch.setattr(
+        analysis_pipeline.openai_service, "transcribe_audio", _fake_transcribe(calls, settings.max_file_size)
+    )
+
+    asyncio.run(analysis_pipeline._transcript_stage(audio_path, None, audio, speech))
+
+    assert len(calls) == 1 and not calls[0]["chunk_paths"]
+    assert calls[0]["audio_path"].endswith(".speech.flac")
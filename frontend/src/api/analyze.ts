@@ -14,7 +14,7 @@ export interface AnalysisResult {
       rolloff: number
       zero_crossing_rate: number
     }
-    tempo: number
+    tempo?: number
   }
   advanced_acoustic?: {
     jitter: { local: number; rap: number; ppq5: number }
@@ -22,13 +22,28 @@ export interface AnalysisResult {
     hnr: number
     formants: { F1: number; F2: number; F3: number; F4: number }
     speech_rate_audio: number
+    syllable_rate?: {
+      syllable_count: number
+      speech_rate: number
+      articulation_rate: number
+      phonation_time: number
+    }
     pause_analysis: {
       total_pause_time: number
       pause_count: number
       avg_pause_duration: number
       pause_percentage: number
+      longest_pause?: number
+      segments?: [number, number][]
     }
     voice_onset_time: number
+    voice_activity?: {
+      speech_seconds: number
+      skipped_seconds: number
+      leading_silence: number
+      trailing_silence: number
+      region_count: number
+    }
   }
   linguistic_analysis?: {
     word_count: number
@@ -52,6 +67,7 @@ export interface AnalysisResult {
     tone: string
     intensity: number
     emotions: string[]
+    error?: string
   }
   content_analysis: {
     word_count: number
@@ -64,11 +80,20 @@ export interface AnalysisResult {
   created_at: string
 }
 
+export interface AnalysisJob {
+  job_id: number
+  progress_id: string
+  participant_id: number
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  error?: string | null
+  analysis_id?: number | null
+}
+
 export const analyzeAudio = async (
   participantId: number,
   file: File,
   progressId?: string
-): Promise<AnalysisResult> => {
+): Promise<AnalysisJob> => {
   const formData = new FormData()
   formData.append('file', file)
   formData.append('participant_id', participantId.toString())
@@ -83,12 +108,71 @@ export const analyzeAudio = async (
       headers: {
         'Content-Type': 'multipart/form-data',
       },
-      timeout: 600000, // 10 dakika timeout (analiz uzun sürebilir)
+      timeout: 300000, // 5 dakika (sadece yükleme, analiz worker'da yapılır)
     }
   )
   return response.data
 }
 
+export const getAnalysisJob = async (
+  jobId: number,
+  signal?: AbortSignal
+): Promise<AnalysisJob> => {
+  const response = await client.get(`/api/analyze/jobs/${jobId}`, { signal })
+  return response.data
+}
+
+export interface WaitForAnalysisJobOptions {
+  intervalMs?: number
+  // Bu sureden sonra yoklama birakilir (is sunucuda devam edebilir)
+  timeoutMs?: number
+  signal?: AbortSignal
+}
+
+const abortError = () => Object.assign(new Error('Analiz takibi iptal edildi'), { name: 'AbortError' })
+
+// Yoklama araligi kadar bekle; sinyal iptal edilirse hemen birak
+const waitInterval = (ms: number, signal?: AbortSignal) =>
+  new Promise<void>((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(abortError())
+      return
+    }
+    const onAbort = () => {
+      clearTimeout(timer)
+      reject(abortError())
+    }
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort)
+      resolve()
+    }, ms)
+    signal?.addEventListener('abort', onAbort, { once: true })
+  })
+
+// Analiz işi bitene kadar durumunu yokla, analiz id'sini döndür
+export const waitForAnalysisJob = async (
+  jobId: number,
+  { intervalMs = 2000, timeoutMs = 60 * 60 * 1000, signal }: WaitForAnalysisJobOptions = {}
+): Promise<number> => {
+  const deadline = Date.now() + timeoutMs
+  for (;;) {
+    if (signal?.aborted) {
+      throw abortError()
+    }
+    const job = await getAnalysisJob(jobId, signal)
+    if (job.status === 'completed' && job.analysis_id) {
+      return job.analysis_id
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Analiz basarisiz oldu')
+    }
+    if (Date.now() + intervalMs > deadline) {
+      throw new Error('Analiz beklenenden uzun surdu. Sonucu daha sonra analizler listesinden kontrol edebilirsiniz.')
+    }
+    await waitInterval(intervalMs, signal)
+  }
+}
+
 export const getAnalysisResult = async (
   analysisId: number
 ): Promise<AnalysisResult> => {
@@ -104,6 +188,7 @@ export interface AnalysisListItem {
     tone: string
     intensity: number
     emotions: string[]
+    error?: string
   }
   content_analysis: {
     word_count: number
@@ -133,3 +218,25 @@ export const deleteAnalysis = async (analysisId: number): Promise<void> => {
   await client.delete(`/api/results/${analysisId}`)
 }
 
+
+export type FeatureTrackName = 'pitch' | 'intensity' | 'rms' | 'formants' | 'pauses' | 'syllable_nuclei'
+
+export interface FeatureTrackSlice {
+  analysis_id: number
+  name: FeatureTrackName
+  step: number
+  times: number[]
+  // formants: [F1[], F2[], F3[], F4[]]; pauses: bitiş zamanları; syllable_nuclei: yok
+  values?: number[] | number[][]
+}
+
+export const getAnalysisTrack = async (
+  analysisId: number,
+  name: FeatureTrackName,
+  options: { start?: number; end?: number; maxPoints?: number } = {}
+): Promise<FeatureTrackSlice> => {
+  const response = await client.get(`/api/results/${analysisId}/tracks/${name}`, {
+    params: { start: options.start, end: options.end, max_points: options.maxPoints },
+  })
+  return response.data
+}
@@ -13,6 +13,14 @@ interface ProgressData {
   message: string
   status: string
   steps: Step[]
+  // Paralel adımlar için adım bazlı durum (ör. Whisper akustik analizle aynı anda çalışır)
+  stage_states?: Record<string, 'pending' | 'running' | 'completed' | 'skipped' | 'error'>
+}
+
+// Klinik rapor akışı: offset'ten itibaren delta yazılır (offset 0 metni sıfırlar)
+interface ReportDelta {
+  offset: number
+  delta: string
 }
 
 interface AnalysisTimelineProps {
@@ -40,11 +48,13 @@ const DEFAULT_STEPS: Step[] = [
 export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }: AnalysisTimelineProps) {
   const [progress, setProgress] = useState<ProgressData | null>(null)
   const [currentStep, setCurrentStep] = useState(0)
+  const [reportText, setReportText] = useState('')
 
   useEffect(() => {
     if (!progressId || !isAnalyzing) {
       setCurrentStep(0)
       setProgress(null)
+      setReportText('')
       return
     }
 
@@ -68,6 +78,15 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
       }
     }
 
+    eventSource.addEventListener('report_delta', (event) => {
+      try {
+        const data: ReportDelta = JSON.parse((event as MessageEvent).data)
+        setReportText((text) => text.slice(0, data.offset) + data.delta)
+      } catch (e) {
+        console.error('Report delta parse error:', e)
+      }
+    })
+
     eventSource.onerror = () => {
       // Connection error - might be normal when analysis completes
       eventSource.close()
@@ -88,9 +107,11 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
         const response = await fetch(`${API_URL}/api/analyze/progress/${progressId}`)
         if (response.ok) {
           const data = await response.json()
-          if (data.current_step > 0 && data.current_step !== currentStep) {
-            console.log('[Timeline] Progress güncellendi:', data.current_step)
-            setCurrentStep(data.current_step)
+          if (data.current_step > 0) {
+            if (data.current_step !== currentStep) {
+              console.log('[Timeline] Progress güncellendi:', data.current_step)
+              setCurrentStep(data.current_step)
+            }
             setProgress(data)
           }
         }
@@ -108,8 +129,18 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
   }, [progressId, isAnalyzing, currentStep])
 
   const steps = progress?.steps || DEFAULT_STEPS
+  const completedCount = progress?.stage_states
+    ? Object.values(progress.stage_states).filter((s) => s === 'completed' || s === 'skipped').length
+    : currentStep
 
   const getStepStatus = (stepNumber: number): 'completed' | 'active' | 'pending' => {
+    if (progress?.status === 'completed') return 'completed'
+    const stageState = progress?.stage_states?.[String(stepNumber)]
+    if (stageState) {
+      if (stageState === 'running') return 'active'
+      if (stageState === 'pending') return 'pending'
+      return 'completed'
+    }
     if (stepNumber < currentStep) return 'completed'
     if (stepNumber === currentStep) return 'active'
     return 'pending'
@@ -123,7 +154,7 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
     <div className="analysis-timeline">
       <div className="timeline-header">
         <h3>Analiz İlerlemesi (Ekran donmuş gibi görünebilir. Lütfen bekleyiniz)</h3>
-        <span className="step-counter">Adım {currentStep} / {steps.length}</span>
+        <span className="step-counter">Adım {completedCount} / {steps.length}</span>
       </div>
 
       <div className="timeline-container">
@@ -149,7 +180,7 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
               <div className="step-content">
                 <div className="step-title">{step.title}</div>
                 <div className="step-description">
-                  {status === 'active' && progress?.message
+                  {status === 'active' && progress?.message && step.step === currentStep
                     ? progress.message
                     : step.description}
                 </div>
@@ -159,11 +190,18 @@ export default function AnalysisTimeline({ progressId, isAnalyzing, onComplete }
         })}
       </div>
 
+      {reportText && progress?.status !== 'completed' && (
+        <div className="timeline-report">
+          <div className="timeline-report-title">Klinik Rapor (oluşturuluyor)</div>
+          <div className="timeline-report-text">{reportText}</div>
+        </div>
+      )}
+
       <div className="timeline-footer">
         <div className="progress-bar">
           <div
             className="progress-fill"
-            style={{ width: `${(currentStep / steps.length) * 100}%` }}
+            style={{ width: `${(completedCount / steps.length) * 100}%` }}
           />
         </div>
         <p className="progress-text">
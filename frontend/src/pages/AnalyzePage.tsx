@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef } from 'react'
 import { useNavigate, useSearchParams, Link } from 'react-router-dom'
 import { getParticipants, Participant } from '../api/participants'
-import { analyzeAudio } from '../api/analyze'
+import { analyzeAudio, waitForAnalysisJob } from '../api/analyze'
 import AnalysisTimeline from '../components/AnalysisTimeline'
 import './AnalyzePage.css'
 
@@ -26,6 +26,10 @@ export default function AnalyzePage() {
   const [loadingParticipants, setLoadingParticipants] = useState(true)
   const [participantsError, setParticipantsError] = useState<string | null>(null)
   const fileInputRef = useRef<HTMLInputElement>(null)
+  const pollAbortRef = useRef<AbortController | null>(null)
+
+  // Sayfadan cikilinca is durumu yoklamasini durdur
+  useEffect(() => () => pollAbortRef.current?.abort(), [])
 
   useEffect(() => {
     loadParticipants()
@@ -115,13 +119,21 @@ export default function AnalyzePage() {
     setProgressId(newProgressId)
     setLoading(true)
 
+    pollAbortRef.current?.abort()
+    const pollAbort = new AbortController()
+    pollAbortRef.current = pollAbort
+
     try {
-      const result = await analyzeAudio(selectedParticipantId, file, newProgressId)
+      const job = await analyzeAudio(selectedParticipantId, file, newProgressId)
+      const analysisId = await waitForAnalysisJob(job.job_id, { signal: pollAbort.signal })
       // Kisa gecikme ile sonuc sayfasina yonlendir
       setTimeout(() => {
-        navigate(`/results/${result.id}`)
+        navigate(`/results/${analysisId}`)
       }, 1000)
     } catch (error: any) {
+      if (pollAbort.signal.aborted) {
+        return
+      }
       setProgressId(null)
       const errorMessage = error.code === 'ECONNABORTED'
         ? 'Analiz islemi zaman asimina ugradi. Lutfen tekrar deneyin.'
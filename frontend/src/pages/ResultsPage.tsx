@@ -133,6 +133,9 @@ export default function ResultsPage() {
             </div>
           </div>
           <div className="section-content">
+            {result.emotion_analysis.error && (
+              <p className="section-description" style={{ color: 'var(--warning)' }}>{result.emotion_analysis.error}</p>
+            )}
             <div className="analysis-grid">
               <div className="analysis-item">
                 <p className="analysis-label">
@@ -289,6 +292,18 @@ export default function ResultsPage() {
                   <p className="analysis-label">F2 Formant (Hz)</p>
                   <p className="analysis-value">{result.advanced_acoustic.formants.F2.toFixed(2)}</p>
                 </div>
+                {result.advanced_acoustic.syllable_rate && (
+                  <div className="analysis-item">
+                    <p className="analysis-label">Artikülasyon Hızı (hece/sn)</p>
+                    <p className="analysis-value">{result.advanced_acoustic.syllable_rate.articulation_rate.toFixed(2)}</p>
+                  </div>
+                )}
+                {result.advanced_acoustic.voice_activity && (
+                  <div className="analysis-item">
+                    <p className="analysis-label">Atlanan Sessizlik (sn)</p>
+                    <p className="analysis-value">{result.advanced_acoustic.voice_activity.skipped_seconds.toFixed(1)}</p>
+                  </div>
+                )}
                 <div className="analysis-item">
                   <p className="analysis-label">Duraklama Sayisi</p>
                   <p className="analysis-value">{result.advanced_acoustic.pause_analysis.pause_count}</p>
@@ -439,11 +454,23 @@ export default function ResultsPage() {
                   </svg>
                 </div>
                 <div className="acoustic-details">
-                  <p className="acoustic-label">Tempo</p>
-                  <p className="acoustic-value">
-                    {result.acoustic_features.tempo.toFixed(2)}
-                    <span className="acoustic-unit">BPM</span>
-                  </p>
+                  {result.advanced_acoustic?.syllable_rate ? (
+                    <>
+                      <p className="acoustic-label">Konuşma Hızı</p>
+                      <p className="acoustic-value">
+                        {result.advanced_acoustic.syllable_rate.speech_rate.toFixed(2)}
+                        <span className="acoustic-unit">hece/sn</span>
+                      </p>
+                    </>
+                  ) : (
+                    <>
+                      <p className="acoustic-label">Tempo</p>
+                      <p className="acoustic-value">
+                        {(result.acoustic_features.tempo ?? 0).toFixed(2)}
+                        <span className="acoustic-unit">BPM</span>
+                      </p>
+                    </>
+                  )}
                 </div>
               </div>
             </div>